@@ -29,7 +29,47 @@ class GameConfig:
             }
         },
         "time": {
-            "hour_duration": 0.2
+            "hour_duration": 0.2,
+            "catch_up_policy": "skip",
+            "max_catch_up_ticks": 5,
+            "broadcast_interval": 0.5,
+            "broadcast_send_timeout": 1.0
+        },
+        "simulation": {
+            "engine": "object",
+            "shards": 1,
+            "tick_mode": "inline",
+            "inventory": "object"
+        },
+        "labor": {
+            "allocation": "individual",
+            "targets": {
+                "wood": 100,
+                "stone": 100,
+                "berry": 150,
+                "wheat": 80
+            }
+        },
+        "production": {
+            "auto_deposit": False
+        },
+        "protocol": {
+            "item_catalog": "inline",
+            "game_updates": "full",
+            "keyframe_interval": 20,
+            "resume_history": 64,
+            "msgpack": True
+        },
+        "network": {
+            "send_queue_size": 16,
+            "ping_interval": 10.0,
+            "idle_timeout": 30.0
+        },
+        "logging": {
+            "level": "INFO",
+            "levels": {},
+            "buffer_size": 10000,
+            "sample_rate": 1
         }
     }
     
@@ -63,12 +103,67 @@ class GameConfig:
         
         # 时间配置
         self.HOUR_DURATION = config_data.get("time", {}).get("hour_duration", 0.2)
+        self.CATCH_UP_POLICY = config_data.get("time", {}).get("catch_up_policy", "skip")
+        self.MAX_CATCH_UP_TICKS = config_data.get("time", {}).get("max_catch_up_ticks", 5)
+        # 广播间隔（秒），与模拟 tick 频率无关
+        self.BROADCAST_INTERVAL = config_data.get("time", {}).get("broadcast_interval", 0.5)
+        # 单个客户端单次写入的超时（秒），写入超时的客户端被断开并移除（关闭连接也使用该超时）
+        self.BROADCAST_SEND_TIMEOUT = config_data.get("time", {}).get("broadcast_send_timeout", 1.0)
+        
+        # 模拟引擎配置（object=逐对象更新，numpy=数组化批量更新，event=事件驱动只唤醒到期角色）
+        self.SIMULATION_ENGINE = config_data.get("simulation", {}).get("engine", "object")
+        # 分片进程数（大于 1 时把角色划分到多个进程并行模拟）
+        self.SIMULATION_SHARDS = config_data.get("simulation", {}).get("shards", 1)
+        # tick 计算位置（inline=事件循环内，thread=专用工作线程）
+        self.TICK_MODE = config_data.get("simulation", {}).get("tick_mode", "inline")
+        # 背包存储后端（object=每格一个 ItemStack 对象，compact=类型化数组，适合大量角色）
+        self.SIMULATION_INVENTORY = config_data.get("simulation", {}).get("inventory", "object")
+        
+        # 劳动分配配置（individual=每个角色按自己的背包选择，colony=每个 tick 按全体资源缺口批量分配）
+        self.LABOR_ALLOCATION = config_data.get("labor", {}).get("allocation", "individual")
+        # 全体资源目标（物品ID → 数量，包括所有角色背包和公共仓库）
+        self.LABOR_TARGETS = config_data.get("labor", {}).get("targets", {})
+        
+        # 劳动产出配置（auto_deposit=产出在 tick 结束时直接放入公共仓库，仓库放不下时放入角色背包）
+        self.PRODUCTION_AUTO_DEPOSIT = config_data.get("production", {}).get("auto_deposit", False)
+        
+        # 通信协议配置（物品目录：inline=每个堆叠内嵌完整物品数据，normalized=目录单独发送，堆叠只含物品ID）
+        self.PROTOCOL_ITEM_CATALOG = config_data.get("protocol", {}).get("item_catalog", "inline")
+        # 状态广播（full=每次完整状态，delta=关键帧 + 字段级增量）和关键帧间隔（次广播）
+        self.PROTOCOL_GAME_UPDATES = config_data.get("protocol", {}).get("game_updates", "full")
+        self.PROTOCOL_KEYFRAME_INTERVAL = config_data.get("protocol", {}).get("keyframe_interval", 20)
+        self.PROTOCOL_RESUME_HISTORY = config_data.get("protocol", {}).get("resume_history", 64)
+        # 是否允许客户端通过 msgpack 子协议使用二进制编码（需要安装 msgpack）
+        self.PROTOCOL_MSGPACK = config_data.get("protocol", {}).get("msgpack", True)
+        
+        # 网络配置（每个客户端发送队列容量、心跳 ping 间隔、空闲超时，单位秒）
+        self.NETWORK_SEND_QUEUE_SIZE = config_data.get("network", {}).get("send_queue_size", 16)
+        self.NETWORK_PING_INTERVAL = config_data.get("network", {}).get("ping_interval", 10.0)
+        self.NETWORK_IDLE_TIMEOUT = config_data.get("network", {}).get("idle_timeout", 30.0)
+        
+        # 日志配置（默认级别、各子系统级别、环形缓冲区容量、INFO/DEBUG 采样率）
+        self.LOG_LEVEL = config_data.get("logging", {}).get("level", "INFO")
+        self.LOG_LEVELS = config_data.get("logging", {}).get("levels", {})
+        self.LOG_BUFFER_SIZE = config_data.get("logging", {}).get("buffer_size", 10000)
+        self.LOG_SAMPLE_RATE = config_data.get("logging", {}).get("sample_rate", 1)
         
         # 打印配置信息
         print(f"[配置] 角色数量: {self.CHARACTER_COUNT}")
         print(f"[配置] 背包大小: {self.CHARACTER_INVENTORY_SLOTS}")
         print(f"[配置] 公共仓库: {self.PUBLIC_STORAGE_SLOTS} 格")
         print(f"[配置] 时间速度: {self.HOUR_DURATION}s/小时")
+        print(f"[配置] 广播间隔: {self.BROADCAST_INTERVAL}s")
+        print(f"[配置] 模拟引擎: {self.SIMULATION_ENGINE}")
+        print(f"[配置] 分片进程: {self.SIMULATION_SHARDS}")
+        print(f"[配置] tick 模式: {self.TICK_MODE}")
+        print(f"[配置] 背包存储: {self.SIMULATION_INVENTORY}")
+        print(f"[配置] 劳动分配: {self.LABOR_ALLOCATION}")
+        print(f"[配置] 产出自动入库: {self.PRODUCTION_AUTO_DEPOSIT}")
+        print(f"[配置] 物品目录: {self.PROTOCOL_ITEM_CATALOG}")
+        print(f"[配置] 状态广播: {self.PROTOCOL_GAME_UPDATES} (关键帧间隔 {self.PROTOCOL_KEYFRAME_INTERVAL}, 重连补发 {self.PROTOCOL_RESUME_HISTORY} 次)")
+        print(f"[配置] 二进制协议: {'msgpack' if self.PROTOCOL_MSGPACK else '关闭'}")
+        print(f"[配置] 日志级别: {self.LOG_LEVEL} {self.LOG_LEVELS}")
+        print(f"[配置] 追赶策略: {self.CATCH_UP_POLICY} (最多补跑 {self.MAX_CATCH_UP_TICKS} 个tick)")
 
 
 # 创建全局配置实例
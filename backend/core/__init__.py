@@ -1,4 +1,12 @@
 from .game_time import GameTime
 from .connection_manager import ConnectionManager
+from .state_stream import StateStream
+from .wire_codec import MessagePackCodec
+from .subscriptions import Interest
+from .tick_scheduler import TickScheduler
+from .snapshot import SnapshotBuffer
+from .sharding import ShardedSimulation
+from .world import GameWorld, create_world
+from .tick_worker import TickWorker
 
-__all__ = ["GameTime", "ConnectionManager"]
+__all__ = ["GameTime", "ConnectionManager", "StateStream", "MessagePackCodec", "Interest", "TickScheduler", "SnapshotBuffer", "ShardedSimulation", "GameWorld", "create_world", "TickWorker"]
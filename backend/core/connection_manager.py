@@ -1,22 +1,324 @@
+import asyncio
+import itertools
+import json
+import time
+from collections import deque
 from fastapi import WebSocket
-from typing import List
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from game_logging import get_logger
+from .state_stream import StateStream
+from .subscriptions import EVERYTHING, Interest, InterestView
+from .wire_codec import SUBPROTOCOL_MSGPACK, MessagePackCodec, select_subprotocol
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
+
+logger = get_logger("network")
+
+
+def encode_message(message: dict) -> str:
+    """把消息编码为 JSON 文本（优先使用 orjson，输出与 send_json 相同的紧凑格式）"""
+    if orjson is not None:
+        return orjson.dumps(message).decode("utf-8")
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+class ClientConnection:
+    """单个客户端连接 - 有界发送队列、后台写入任务和连接统计"""
+
+    def __init__(self, websocket: WebSocket, client_id: int, max_queue: int, subprotocol: Optional[str] = None):
+        self.websocket = websocket
+        self.id = client_id
+        self.max_queue = max(1, max_queue)
+        self.subprotocol = subprotocol
+        self.binary = subprotocol == SUBPROTOCOL_MSGPACK  # 是否使用 MessagePack 二进制帧
+        self.interest: Interest = EVERYTHING  # 订阅的状态范围
+        self._queue: deque = deque()  # (消息类型, 已编码数据)
+        self._ready = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+
+        # 统计
+        self.sent = 0      # 已写出的消息数
+        self.dropped = 0   # 被新状态替换或因队列已满丢弃的消息数
+        self.connected_at = time.monotonic()
+        self.last_seen = self.connected_at  # 最近一次收到客户端消息的时间
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def touch(self):
+        """记录收到客户端消息（用于空闲超时判断）"""
+        self.last_seen = time.monotonic()
+
+    def enqueue(self, kind: str, payload: Union[str, bytes], supersedes: frozenset = frozenset()):
+        """
+        放入发送队列
+
+        参数:
+            kind: 消息类型
+            payload: 已编码的消息（JSON 文本或 MessagePack 二进制数据）
+            supersedes: 该消息使之失效的消息类型，队列中尚未发送的这些消息被替换（完整状态只需送达最新一份）
+        """
+        queue = self._queue
+        if supersedes and queue:
+            kept = deque(entry for entry in queue if entry[0] not in supersedes)
+            self.dropped += len(queue) - len(kept)
+            self._queue = queue = kept
+        if len(queue) >= self.max_queue:
+            queue.popleft()
+            self.dropped += 1
+        queue.append((kind, payload))
+        self._ready.set()
+
+    async def next_message(self) -> Union[str, bytes]:
+        """等待并取出下一条待发送的消息"""
+        while not self._queue:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._queue.popleft()[1]
+
+    def get_stats_dict(self) -> dict:
+        """获取连接统计数据"""
+        now = time.monotonic()
+        return {
+            "id": self.id,
+            "protocol": self.subprotocol or "json",
+            "interest": self.interest.get_dict(),
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "connected_seconds": round(now - self.connected_at, 1),
+            "idle_seconds": round(now - self.last_seen, 1),
+        }
 
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    """
+    连接管理器
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+    广播时消息只编码一次，放入每个客户端的有界发送队列，由各客户端的后台任务独立写出；
+    慢客户端只会积压自己的队列：完整状态消息（game_update）替换队列中尚未发送的状态和增量，
+    队列满时丢弃最旧的消息（客户端发现增量序号不连续时会请求完整状态）。
+    写入失败或超时、以及超过空闲超时未收到任何消息（包括对 ping 的 pong 回复）的连接会被自动移除。
+    游戏状态通过 StateStream 编码为带序号的完整状态或增量，重连的客户端可以只补发缺少的增量。
+    客户端通过 WebSocket 子协议 msgpack 请求二进制编码（需要配置 codec），否则使用 JSON 文本；
+    每条广播消息对每种编码最多编码一次。
+    客户端可以订阅部分状态（subscribe）：订阅范围相同的客户端共用一个状态视图和状态流，
+    每次广播每个订阅范围只生成和编码一次消息。
+    """
+
+    # 消息类型 → 该消息使之失效的消息类型
+    SUPERSEDES = {"game_update": frozenset({"game_update", "game_delta", "game_catch_up"})}
+
+    def __init__(
+        self,
+        send_timeout: float = 1.0,
+        max_queue: int = 16,
+        ping_interval: float = 10.0,
+        idle_timeout: float = 30.0,
+        state_stream: Optional[StateStream] = None,
+        codec: Optional[MessagePackCodec] = None
+    ):
+        self.state_stream = state_stream if state_stream is not None else StateStream()
+        self.codec = codec  # MessagePack 编码器（None 时只支持 JSON）
+        # 订阅范围 → (状态视图, 状态流)；默认订阅使用 state_stream，其余订阅在没有客户端时移除
+        self._views: Dict[Interest, Tuple[InterestView, StateStream]] = {
+            EVERYTHING: (InterestView(EVERYTHING), self.state_stream)
+        }
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        self.send_timeout = send_timeout    # 单个客户端单次写入的超时（秒）
+        self.max_queue = max_queue          # 每个客户端发送队列的容量（条）
+        self.ping_interval = ping_interval  # 心跳 ping 间隔（秒）
+        self.idle_timeout = idle_timeout    # 超过该时间未收到客户端消息则断开（秒）
+        self._client_ids = itertools.count(1)
+        self.evicted = 0  # 被自动移除的连接数
+
+    async def connect(self, websocket: WebSocket) -> ClientConnection:
+        """接受连接并协商子协议（二进制连接首先收到编码表）"""
+        subprotocol = select_subprotocol(websocket.scope.get("subprotocols", []), self.codec)
+        await websocket.accept(subprotocol=subprotocol)
+        client = ClientConnection(websocket, next(self._client_ids), self.max_queue, subprotocol)
+        self.active_connections[websocket] = client
+        client.writer = asyncio.create_task(self._write_loop(client))
+        if client.binary:
+            codes = self.codec.codes_message()
+            self._enqueue(client, codes, self.codec.encode(codes))
+        return client
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        """移除连接并停止其写入任务（重复调用无影响）"""
+        client = self.active_connections.pop(websocket, None)
+        if client is not None and client.writer is not None and client.writer is not asyncio.current_task():
+            client.writer.cancel()
 
-    async def broadcast(self, message: dict):
-        """广播消息给所有连接的客户端"""
-        for connection in self.active_connections:
+    def touch(self, websocket: WebSocket):
+        """记录收到客户端消息"""
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            client.touch()
+
+    async def _evict(self, client: ClientConnection, reason: str):
+        """自动移除失效的连接并尝试关闭"""
+        if self.active_connections.get(client.websocket) is not client:
+            return
+        self.disconnect(client.websocket)
+        self.evicted += 1
+        logger.warning("[连接管理] ⚠️ 移除客户端 #%s：%s", client.id, reason)
+        try:
+            await asyncio.wait_for(client.websocket.close(), self.send_timeout)
+        except Exception:
+            pass
+
+    async def _write_loop(self, client: ClientConnection):
+        """客户端写入任务：按顺序写出发送队列中的消息，失败或超时时移除连接"""
+        send = client.websocket.send_bytes if client.binary else client.websocket.send_text
+        while True:
+            payload = await client.next_message()
             try:
-                await connection.send_json(message)
-            except:
-                pass
+                await asyncio.wait_for(send(payload), self.send_timeout)
+            except asyncio.TimeoutError:
+                await self._evict(client, f"写入超时（{self.send_timeout}s）")
+                return
+            except Exception as e:
+                await self._evict(client, f"写入失败: {e}")
+                return
+            client.sent += 1
+
+    def _enqueue(self, client: ClientConnection, message: dict, payload: Union[str, bytes]):
+        kind = message.get("type")
+        client.enqueue(kind, payload, self.SUPERSEDES.get(kind, frozenset()))
+
+    def _encode(self, client: ClientConnection, message: dict) -> Union[str, bytes]:
+        """按客户端协商的协议编码消息"""
+        return self.codec.encode(message) if client.binary else encode_message(message)
+
+    def _fan_out(self, message: dict, clients: Iterable[ClientConnection], exclude: Optional[WebSocket] = None):
+        """
+        把消息放入各客户端的发送队列（每种编码只编码一次）
+
+        编码失败时记录错误并跳过使用该编码的客户端，不影响其他编码的客户端
+        """
+        payloads = {}
+        for client in clients:
+            if client.websocket is exclude:
+                continue
+            if client.binary not in payloads:
+                try:
+                    payloads[client.binary] = self._encode(client, message)
+                except Exception:
+                    logger.exception("[连接管理] ❌ %s 消息编码失败（%s）", message.get("type"),
+                                     SUBPROTOCOL_MSGPACK if client.binary else "json")
+                    payloads[client.binary] = None
+            payload = payloads[client.binary]
+            if payload is not None:
+                self._enqueue(client, message, payload)
+
+    async def send(self, websocket: WebSocket, message: dict):
+        """发送消息给单个客户端（经由该客户端的发送队列，保持与广播消息的顺序）"""
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            self._enqueue(client, message, self._encode(client, message))
+
+    async def broadcast(self, message: dict):
+        """广播消息给所有连接的客户端（编码一次，放入各客户端的发送队列）"""
+        self._fan_out(message, self.active_connections.values())
+
+    def _view_for(self, interest: Interest) -> Tuple[InterestView, StateStream]:
+        """订阅范围的状态视图和状态流（订阅的状态流不保留重连补发的增量）"""
+        entry = self._views.get(interest)
+        if entry is None:
+            stream = self.state_stream
+            entry = (InterestView(interest), StateStream(stream.mode, stream.keyframe_interval, history_size=0))
+            self._views[interest] = entry
+        return entry
+
+    def _group_by_interest(self) -> Dict[Interest, List[ClientConnection]]:
+        """按订阅范围对客户端分组，并移除已没有客户端的订阅"""
+        groups: Dict[Interest, List[ClientConnection]] = {}
+        for client in self.active_connections.values():
+            groups.setdefault(client.interest, []).append(client)
+        for interest in list(self._views):
+            if interest not in groups and interest != EVERYTHING:
+                del self._views[interest]
+        return groups
+
+    async def broadcast_state(self, snapshot: dict):
+        """广播游戏状态（按订阅范围分组，每组按状态流模式发送完整状态或相对上一次广播的增量）"""
+        groups = self._group_by_interest()
+        # 默认状态流即使没有客户端也继续编码，保持重连补发的增量连续
+        groups.setdefault(EVERYTHING, [])
+        for interest, clients in groups.items():
+            view, stream = self._view_for(interest)
+            self._fan_out(stream.encode(view.project(snapshot)), clients)
+
+    async def send_state(self, websocket: WebSocket, snapshot: dict):
+        """
+        发送订阅范围内的完整游戏状态给单个客户端（连接时、订阅时、客户端请求 get_state 时）
+
+        delta 模式下发送该订阅范围状态流最近一次广播的关键帧，之后的增量可以直接应用；
+        共享的状态流不推进，其他客户端不受影响。状态流尚未广播过时以 snapshot 作为它的第一个关键帧。
+        """
+        client = self.active_connections.get(websocket)
+        if client is None:
+            return
+        view, stream = self._view_for(client.interest)
+        if stream.mode == StateStream.MODE_FULL:
+            await self.send(websocket, {"type": "game_update", "seq": stream.seq, "data": view.project(snapshot)})
+        elif stream.seq > 0:
+            await self.send(websocket, stream.keyframe())
+        else:
+            await self.send(websocket, stream.encode(view.project(snapshot)))
+
+    def subscribe(self, websocket: WebSocket, interest: Interest):
+        """修改客户端的订阅范围（之后应调用 send_state 发送新范围的完整状态）"""
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            client.interest = interest
+
+    async def resume(self, websocket: WebSocket, stream_id: Optional[str], last_seq: int) -> bool:
+        """
+        为重连的客户端补发缺少的增量（game_catch_up，一条消息按顺序包含序号 last_seq 之后的所有增量）
+
+        返回:
+            bool: 是否已补发；False 时调用方应改为发送完整状态
+        """
+        deltas = self.state_stream.catch_up(stream_id, last_seq)
+        if deltas is None:
+            return False
+        await self.send(websocket, {
+            "type": "game_catch_up",
+            "seq": self.state_stream.seq,
+            "base_seq": last_seq,
+            "data": deltas
+        })
+        return True
+
+    async def heartbeat_loop(self):
+        """心跳任务：定期发送 ping，并移除超过空闲超时的连接"""
+        ping = {"type": "ping"}
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            now = time.monotonic()
+            for client in list(self.active_connections.values()):
+                if now - client.last_seen > self.idle_timeout:
+                    await self._evict(client, f"超过 {self.idle_timeout}s 未响应")
+            self._fan_out(ping, self.active_connections.values())
+
+    def get_stats(self) -> List[dict]:
+        """获取所有连接的统计数据"""
+        return [client.get_stats_dict() for client in self.active_connections.values()]
+
+    def get_subscription_stats(self) -> List[dict]:
+        """获取各订阅范围的客户端数和状态流统计"""
+        clients: Dict[Interest, int] = {}
+        for client in self.active_connections.values():
+            clients[client.interest] = clients.get(client.interest, 0) + 1
+        return [
+            {"interest": interest.get_dict(), "clients": clients.get(interest, 0), "state_stream": stream.get_stats_dict()}
+            for interest, (_, stream) in self._views.items()
+        ]
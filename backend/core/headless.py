@@ -0,0 +1,149 @@
+"""无头模拟模块 - 不依赖事件循环和网络，以 CPU 允许的最快速度推进游戏时间"""
+import contextlib
+import os
+import time
+from collections import Counter
+from typing import Optional
+
+from models import ActionType
+from .world import GameWorld, create_world
+
+
+class HeadlessRunner:
+    """
+    无头模拟器 - 快进推进 GameWorld
+
+    不等待、不广播、不序列化，仅在运行结束时汇总统计数据，用于离线平衡性调整和问题复现。
+    """
+
+    def __init__(self, world: GameWorld):
+        self.world = world
+        self.ticks_run = 0
+        self.elapsed = 0.0
+        # 各行动的累计角色小时数
+        self.action_hours: Counter = Counter()
+        # 饥饿度归零的累计角色小时数
+        self.starving_hours = 0
+
+    def run(self, hours: int):
+        """推进指定小时数"""
+        world = self.world
+        characters = world.characters
+        action_hours = self.action_hours
+
+        start = time.perf_counter()
+        if world.sharded is not None:
+            # 分片模式下统计由各分片在 tick 内汇总
+            for _ in range(hours):
+                world.tick()
+                for action, count in world.sharded.last_action_counts.items():
+                    action_hours[ActionType(action)] += count
+                self.starving_hours += world.sharded.last_starving
+        elif world.decision_scheduler is not None:
+            # 事件驱动调度下读取调度器维护的统计，避免补算休眠角色
+            scheduler = world.decision_scheduler
+            for _ in range(hours):
+                world.tick()
+                action_hours.update(scheduler.action_counts)
+                self.starving_hours += scheduler.last_starving
+        else:
+            for _ in range(hours):
+                world.tick()
+                for character in characters:
+                    action_hours[character.current_action] += 1
+                    if character.hunger <= 0:
+                        self.starving_hours += 1
+        self.elapsed += time.perf_counter() - start
+        self.ticks_run += hours
+
+    def get_summary_dict(self) -> dict:
+        """获取模拟汇总统计"""
+        world = self.world
+        world.sync_characters()
+        characters = world.characters
+        count = len(characters)
+
+        def describe(values: list) -> dict:
+            if not values:
+                return {"mean": 0, "min": 0, "max": 0}
+            return {
+                "mean": round(sum(values) / len(values), 2),
+                "min": round(min(values), 2),
+                "max": round(max(values), 2),
+            }
+
+        total_action_hours = sum(self.action_hours.values()) or 1
+        item_totals = Counter()
+        for character in characters:
+            for stack in character.inventory.items:
+                item_totals[stack.item.item_id] += stack.quantity
+        storage_totals = Counter()
+        for stack in world.public_storage.items:
+            storage_totals[stack.item.item_id] += stack.quantity
+
+        return {
+            "time": world.game_time.get_time_string(),
+            "characters": count,
+            "ticks": self.ticks_run,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "ticks_per_second": round(self.ticks_run / self.elapsed, 1) if self.elapsed > 0 else None,
+            "character_hours_per_second": round(self.ticks_run * count / self.elapsed, 1) if self.elapsed > 0 else None,
+            "fatigue": describe([c.fatigue for c in characters]),
+            "hunger": describe([c.hunger for c in characters]),
+            "mood": describe([c.mood for c in characters]),
+            "starving_character_hours": self.starving_hours,
+            "action_share": {
+                action.value: round(self.action_hours[action] / total_action_hours, 4)
+                for action in ActionType
+            },
+            "current_actions": dict(Counter(c.current_action.value for c in characters)),
+            "produced_items": dict(world.get_production_totals()),
+            "character_items": dict(item_totals),
+            "public_storage_items": dict(storage_totals),
+        }
+
+
+def run_headless(
+    config,
+    days: int = 0,
+    hours: int = 0,
+    character_count: Optional[int] = None,
+    engine: Optional[str] = None,
+    seed: Optional[int] = None,
+    shards: Optional[int] = None,
+    inventory: Optional[str] = None,
+    labor: Optional[str] = None,
+    quiet: bool = True
+) -> dict:
+    """
+    构建世界并快进模拟
+
+    参数:
+        config: 游戏配置（GameConfig 实例）
+        days: 模拟天数
+        hours: 额外模拟的小时数
+        character_count: 角色数量，None 时使用配置值
+        engine: 模拟引擎（object / numpy / event），None 时使用配置值
+        seed: 随机种子
+        shards: 分片进程数，None 时使用配置值
+        inventory: 背包存储后端（object / compact），None 时使用配置值
+        labor: 劳动分配方式（individual / colony），None 时使用配置值
+        quiet: 是否屏蔽模拟过程中的控制台输出
+
+    返回:
+        dict: 模拟汇总统计
+    """
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            devnull = stack.enter_context(open(os.devnull, "w", encoding="utf-8"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        world = create_world(
+            config, character_count=character_count, engine=engine, seed=seed, shards=shards, inventory=inventory, labor=labor
+        )
+        try:
+            runner = HeadlessRunner(world)
+            runner.run(days * 24 + hours)
+            summary = runner.get_summary_dict()
+        finally:
+            world.close()
+    return summary
@@ -0,0 +1,376 @@
+"""分片模拟模块 - 把角色划分到多个常驻进程中并行推进"""
+import multiprocessing
+import random
+from collections import Counter
+from typing import Dict, List, Optional
+
+from game_logging import get_logger, restart_logging_after_fork
+from models import (
+    Character, Inventory, Item, NeedsEngine, DecisionScheduler, LaborAllocator, ProductionBatch, ActionType
+)
+
+logger = get_logger("sharding")
+
+
+# ==================== 分片进程内逻辑 ====================
+
+def _apply_shard_command(
+    index: Dict[str, Character],
+    all_items: Dict[str, Item],
+    command: tuple,
+    storage_delta: Counter,
+    deposits: List[tuple]
+):
+    """
+    在分片进程内应用一条角色命令
+
+    与公共仓库相关的命令不直接访问仓库，而是把物品变化记录到 storage_delta（退回仓库的物品）
+    和 deposits（角色放入仓库的物品，(角色ID, 物品ID, 数量, 可部分入库)），由主进程在合并阶段统一处理
+    """
+    name, character_id, args = command
+    character = index.get(character_id)
+    if character is not None:
+        character.wake()
+
+    if name == "receive_items":
+        # 主进程已从公共仓库预扣物品，角色背包放不下时整批退回仓库
+        item_id, quantity = args
+        if character is None:
+            storage_delta[item_id] += quantity
+            return
+        before = character.inventory.get_item_count(item_id)
+        if not character.inventory.add_item(all_items[item_id], quantity):
+            character.inventory.remove_item(item_id, character.inventory.get_item_count(item_id) - before)
+            storage_delta[item_id] += quantity
+        return
+
+    if character is None:
+        return
+
+    if name == "deposit_items":
+        item_id, quantity = args
+        if character.inventory.has_item(item_id, quantity) and character.inventory.remove_item(item_id, quantity):
+            deposits.append((character_id, item_id, quantity, False))
+    elif name == "assign_action":
+        character.assign_action(ActionType(args[0]))
+    elif name == "use_item":
+        character.use_item(args[0])
+
+
+def _create_shard_engine(characters: List[Character], engine: str, batched_labor: bool, production: ProductionBatch):
+    """在分片进程内构建模拟引擎（object 模式返回 None）"""
+    for character in characters:
+        character.production_batch = production
+    if engine == "numpy":
+        try:
+            return NeedsEngine(characters, production=production)
+        except RuntimeError:
+            return None
+    if engine == "event":
+        return DecisionScheduler(characters, batched_labor=batched_labor, production=production)
+    return None
+
+
+def _return_items(index: Dict[str, Character], all_items: Dict[str, Item], returns: List[tuple], production: ProductionBatch):
+    """把主进程退回的物品（公共仓库放不下的存入）放回角色背包（自动入库的产出由产出批次处理并计入丢弃统计）"""
+    for character_id, item_id, quantity, partial in returns:
+        character = index.get(character_id)
+        if character is None:
+            continue
+        item = all_items[item_id]
+        if partial:
+            production.store_overflow(character, item, quantity)
+            continue
+        before = character.inventory.get_item_count(item_id)
+        character.inventory.add_item(item, quantity)
+        lost = quantity - (character.inventory.get_item_count(item_id) - before)
+        if lost > 0:
+            logger.warning("[分片模拟] ⚠️ %s 的背包已满，退回的 %s x%s 无法放回", character.name, item.name, lost)
+
+
+def _report_labor(conn, characters: List[Character], needs_engine, storage_delta: Counter, deposits: List[tuple]):
+    """
+    全局劳动分配的分片阶段：上报本分片的劳动候选和资源数量，等待主进程返回分配结果
+
+    资源数量包括本 tick 命令产生、尚未合并到公共仓库的物品变化
+    """
+    if needs_engine is not None:
+        candidates = needs_engine.labor_candidates()
+    else:
+        candidates = LaborAllocator.select_candidates(characters)
+    stock = LaborAllocator.count_resources(character.inventory for character in characters)
+    for item_id, quantity in storage_delta.items():
+        if item_id in stock:
+            stock[item_id] += quantity
+    for _, item_id, quantity, _ in deposits:
+        if item_id in stock:
+            stock[item_id] += quantity
+    conn.send((LaborAllocator.describe(candidates), dict(stock)))
+    LaborAllocator.apply(candidates, conn.recv())
+
+
+def _shard_worker(
+    conn,
+    characters: List[Character],
+    all_items: Dict[str, Item],
+    engine: str,
+    seed: Optional[int],
+    batched_labor: bool = False,
+    auto_deposit: bool = False
+):
+    """分片进程主循环"""
+    restart_logging_after_fork()
+    if seed is not None:
+        random.seed(seed)
+
+    production = ProductionBatch(random.Random(seed), auto_deposit=auto_deposit)
+    needs_engine = _create_shard_engine(characters, engine, batched_labor, production)
+    index = {character.id: character for character in characters}
+
+    while True:
+        message = conn.recv()
+        kind = message[0]
+
+        if kind == "tick":
+            _, new_day, commands = message
+            storage_delta = Counter()
+            deposits = []
+            production.shard_deposits = deposits
+            for command in commands:
+                _apply_shard_command(index, all_items, command, storage_delta, deposits)
+
+            if new_day:
+                for character in characters:
+                    character.age_one_day()
+
+            if batched_labor:
+                _report_labor(conn, characters, needs_engine, storage_delta, deposits)
+
+            if needs_engine is not None:
+                needs_engine.tick()
+            else:
+                for character in characters:
+                    character.auto_assign_action()
+                    character.update_status()
+                production.commit()
+
+            if isinstance(needs_engine, DecisionScheduler):
+                action_counts = Counter({action.value: count for action, count in needs_engine.action_counts.items()})
+                starving = needs_engine.last_starving
+            else:
+                action_counts = Counter(character.current_action.value for character in characters)
+                starving = sum(1 for character in characters if character.hunger <= 0)
+            conn.send((dict(storage_delta), deposits, dict(action_counts), starving, dict(production.last_produced)))
+
+        elif kind == "return_items":
+            # 主进程合并时公共仓库放不下的存入，在下一个 tick 之前放回角色背包
+            _return_items(index, all_items, message[1], production)
+
+        elif kind == "status":
+            normalized = message[1]
+            conn.send([character.get_status_dict(normalized) for character in characters])
+
+        elif kind == "characters":
+            # 解除引擎绑定后再序列化，避免把整个引擎一起发送
+            if needs_engine is not None:
+                needs_engine.detach()
+            conn.send(characters)
+            if needs_engine is not None:
+                needs_engine = _create_shard_engine(characters, engine, batched_labor, production)
+
+        elif kind == "stop":
+            conn.close()
+            break
+
+
+# ==================== 主进程侧调度 ====================
+
+class ShardedSimulation:
+    """
+    分片模拟 - 角色按顺序划分到多个常驻进程中，每个 tick 各分片并行执行决策和状态更新
+
+    分片之间唯一的共享状态是公共仓库：分片不直接访问仓库，只上报物品变化，
+    由主进程在每个 tick 结束时按分片顺序合并；仓库放不下的存入退回所属分片，放回角色背包。角色状态只在需要广播或读取时才从分片收集。
+    启用全局劳动分配时，每个 tick 决策前各分片先上报劳动候选和资源数量，由主进程统一分配后返回。
+    """
+
+    def __init__(
+        self,
+        characters: List[Character],
+        public_storage: Inventory,
+        all_items: Dict[str, Item],
+        shard_count: int,
+        engine: str = "object",
+        seed: Optional[int] = None,
+        labor_allocator: Optional[LaborAllocator] = None,
+        auto_deposit: bool = False
+    ):
+        self.public_storage = public_storage
+        self.labor_allocator = labor_allocator
+        self.all_items = all_items
+        self.shard_count = max(1, min(shard_count, len(characters) or 1))
+
+        # 连续划分，收集结果时按分片顺序拼接即可还原原始顺序
+        size = -(-len(characters) // self.shard_count)
+        self._shard_of: Dict[str, int] = {}
+        self._pending: List[List[tuple]] = [[] for _ in range(self.shard_count)]
+        self._connections = []
+        self._processes = []
+
+        context = multiprocessing.get_context()
+        for shard in range(self.shard_count):
+            members = characters[shard * size:(shard + 1) * size]
+            for character in members:
+                self._shard_of[character.id] = shard
+            parent_conn, child_conn = context.Pipe()
+            shard_seed = None if seed is None else seed + shard
+            process = context.Process(
+                target=_shard_worker,
+                args=(child_conn, members, all_items, engine, shard_seed, labor_allocator is not None, auto_deposit),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+        # 最近一个 tick 的统计
+        self.last_action_counts: Counter = Counter()
+        self.last_starving = 0
+        self.last_produced: Counter = Counter()
+        # 累计劳动产出
+        self.total_produced: Counter = Counter()
+
+    def has_character(self, character_id: str) -> bool:
+        """角色是否属于某个分片"""
+        return character_id in self._shard_of
+
+    def submit(self, character_id: str, name: str, *args):
+        """提交角色命令，在下一个 tick 开始时由所属分片执行"""
+        shard = self._shard_of.get(character_id)
+        if shard is None:
+            raise KeyError(character_id)
+        self._pending[shard].append((name, character_id, args))
+
+    def take_from_storage(self, character_id: str, item_id: str, quantity: int) -> bool:
+        """从公共仓库预扣物品并交给角色（放不下的部分在合并阶段退回仓库）"""
+        if not self.public_storage.remove_item(item_id, quantity):
+            return False
+        self.submit(character_id, "receive_items", item_id, quantity)
+        return True
+
+    def put_to_storage(self, character_id: str, item_id: str, quantity: int):
+        """角色把物品放入公共仓库（在合并阶段入库）"""
+        self.submit(character_id, "deposit_items", item_id, quantity)
+
+    def tick(self, new_day: bool):
+        """并行推进所有分片一个小时，并合并公共仓库变化"""
+        pending, self._pending = self._pending, [[] for _ in range(self.shard_count)]
+        for shard, conn in enumerate(self._connections):
+            conn.send(("tick", new_day, pending[shard]))
+        if self.labor_allocator is not None:
+            self._allocate_labor()
+
+        action_counts = Counter()
+        starving = 0
+        produced = Counter()
+        returns = []
+        for conn in self._connections:
+            storage_delta, deposits, shard_actions, shard_starving, shard_produced = conn.recv()
+            self._merge_storage_delta(storage_delta)
+            returns.append(self._merge_deposits(deposits))
+            action_counts.update(shard_actions)
+            starving += shard_starving
+            produced.update(shard_produced)
+        for conn, rejected in zip(self._connections, returns):
+            if rejected:
+                conn.send(("return_items", rejected))
+
+        self.last_action_counts = action_counts
+        self.last_starving = starving
+        self.last_produced = produced
+        self.total_produced.update(produced)
+
+    def _allocate_labor(self):
+        """收集各分片的劳动候选（按原始角色顺序拼接），统一分配后按分片拆分返回"""
+        profiles = []
+        sizes = []
+        stock = LaborAllocator.count_resources([self.public_storage])
+        for conn in self._connections:
+            shard_profiles, shard_stock = conn.recv()
+            profiles.extend(shard_profiles)
+            sizes.append(len(shard_profiles))
+            stock.update(shard_stock)
+
+        assignments = self.labor_allocator.allocate(profiles, stock)
+        start = 0
+        for conn, size in zip(self._connections, sizes):
+            conn.send(assignments[start:start + size])
+            start += size
+
+    def _merge_storage_delta(self, storage_delta: Dict[str, int]):
+        """合并单个分片上报的公共仓库变化（仓库放不下的物品丢弃并给出警告）"""
+        for item_id, quantity in storage_delta.items():
+            if quantity <= 0 or item_id not in self.all_items:
+                continue
+            item = self.all_items[item_id]
+            before = self.public_storage.get_item_count(item_id)
+            if not self.public_storage.add_item(item, quantity):
+                rejected = quantity - (self.public_storage.get_item_count(item_id) - before)
+                logger.warning("[分片模拟] ⚠️ 公共仓库已满，%s x%s 无法入库", item.name, rejected)
+
+    def _merge_deposits(self, deposits: List[tuple]) -> List[tuple]:
+        """
+        合并单个分片上报的角色存入
+
+        角色命令的存入整体入库，仓库放不下时整体拒绝（与非分片模式相同）；
+        自动入库的产出可以部分入库，放不下的部分退回（与非分片模式放入角色背包相同）。
+
+        返回:
+            List[tuple]: 需要退回角色的存入 (角色ID, 物品ID, 数量, 可部分入库)
+        """
+        rejected = []
+        for character_id, item_id, quantity, partial in deposits:
+            item = self.all_items[item_id]
+            before = self.public_storage.get_item_count(item_id)
+            if self.public_storage.add_item(item, quantity):
+                continue
+            added = self.public_storage.get_item_count(item_id) - before
+            if partial:
+                rejected.append((character_id, item_id, quantity - added, partial))
+                continue
+            # 撤销部分放入的物品，整批退回角色
+            self.public_storage.remove_item(item_id, added)
+            rejected.append((character_id, item_id, quantity, partial))
+            logger.warning("[分片模拟] ⚠️ 公共仓库已满，%s x%s 退回角色", item.name, quantity)
+        return rejected
+
+    def gather_status_dicts(self, normalized: bool = False) -> List[dict]:
+        """从所有分片收集角色状态数据（按原始角色顺序）"""
+        for conn in self._connections:
+            conn.send(("status", normalized))
+        status_dicts = []
+        for conn in self._connections:
+            status_dicts.extend(conn.recv())
+        return status_dicts
+
+    def gather_characters(self) -> List[Character]:
+        """从所有分片收集完整角色对象（按原始角色顺序），用于结束时汇总"""
+        for conn in self._connections:
+            conn.send(("characters",))
+        characters = []
+        for conn in self._connections:
+            characters.extend(conn.recv())
+        return characters
+
+    def close(self):
+        """停止所有分片进程"""
+        for conn in self._connections:
+            try:
+                conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+        self._connections = []
+        self._processes = []
@@ -0,0 +1,55 @@
+"""快照缓冲模块 - 模拟与广播之间的双缓冲状态快照"""
+import time
+from typing import Callable, Optional, Tuple
+
+
+class SnapshotBuffer:
+    """
+    双缓冲快照
+
+    模拟侧把新快照写入后缓冲区，广播侧读取时若有新快照则交换前后缓冲区，总是读到最近完成的状态，两者互不等待。
+    广播侧登记下一次读取的时刻，模拟侧只在读取前的最后一批 tick（以及读取延后时之后的各批）结束时构建快照，
+    因此快照的构建频率跟随广播节奏，而不是每个 tick 都构建。
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._buffers = [None, None]
+        self._front = 0
+        self._fresh = False   # 后缓冲区是否有尚未读取的新快照
+        self.version = 0      # 已发布的快照版本号
+        self._next_read: Optional[float] = None  # 广播侧下一次读取的预计时刻（单调时钟）
+        self._clock = clock
+
+    def schedule_read(self, delay: float):
+        """广播侧登记下一次读取的时刻（delay 秒后）"""
+        self._next_read = self._clock() + delay
+
+    def wants_snapshot(self, next_tick: Optional[float] = None) -> bool:
+        """
+        本批 tick 结束后是否需要构建快照
+
+        参数:
+            next_tick: 下一批 tick 的截止时间（单调时钟）；它不早于广播侧下一次读取时，
+                       本批就是读取前的最后一批。未知截止时间或未登记读取时刻时总是构建
+        """
+        if next_tick is None or self._next_read is None:
+            return True
+        return next_tick >= self._next_read
+
+    def publish(self, data: dict):
+        """发布新快照：写入后缓冲区（广播侧读取时交换）"""
+        self._buffers[1 - self._front] = data
+        self._fresh = True
+        self.version += 1
+
+    def read(self) -> Tuple[int, Optional[dict]]:
+        """
+        读取最近完成的快照（有新快照时先交换前后缓冲区）
+
+        返回:
+            (版本号, 快照数据)，尚未发布过快照时数据为 None
+        """
+        if self._fresh:
+            self._front = 1 - self._front
+            self._fresh = False
+        return self.version, self._buffers[self._front]
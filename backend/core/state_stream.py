@@ -0,0 +1,189 @@
+"""状态流模块 - 为广播的游戏状态分配序号，并按上一次广播的状态生成增量"""
+import uuid
+from collections import deque
+from typing import Dict, List, Optional
+
+
+def diff_inventory(old: dict, new: dict) -> dict:
+    """
+    背包/仓库的增量
+
+    除 items 外的字段只包含变化的值；堆叠列表变化时给出新长度 items_length
+    和按位置变化的堆叠 items_set（[[位置, 堆叠], ...]）
+    """
+    diff = {key: value for key, value in new.items() if key != "items" and old.get(key) != value}
+    old_items, new_items = old["items"], new["items"]
+    if new_items is not old_items and new_items != old_items:
+        old_length = len(old_items)
+        diff["items_length"] = len(new_items)
+        diff["items_set"] = [
+            [index, stack] for index, stack in enumerate(new_items)
+            if index >= old_length or old_items[index] != stack
+        ]
+    return diff
+
+
+def diff_character(old: dict, new: dict) -> Optional[dict]:
+    """角色状态的字段级增量（没有变化时返回 None；未变化的角色状态通常是同一个缓存字典）"""
+    if new is old:
+        return None
+    diff = {}
+    for key, value in new.items():
+        old_value = old.get(key)
+        if value is old_value or value == old_value:
+            continue
+        if key == "inventory" and old_value is not None:
+            diff[key] = diff_inventory(old_value, value)
+        else:
+            diff[key] = value
+    if not diff:
+        return None
+    diff["id"] = new["id"]
+    return diff
+
+
+class StateStream:
+    """
+    game_update 状态流
+
+    每次广播的状态分配一个递增序号。full 模式下每次都发送完整状态（game_update）；
+    delta 模式下只有第一次广播和每隔 keyframe_interval 次广播发送完整状态（关键帧），
+    其余发送相对上一次广播的增量（game_delta，带 base_seq），只包含变化角色的变化字段和背包堆叠变化。
+    客户端连接或请求 get_state 时只把最近一次广播的状态作为关键帧发给该客户端（不推进序号），
+    之后的增量可以直接应用。
+
+    delta 模式下最近 history_size 次广播的增量（包括关键帧广播相对上一次广播的增量）保存在环形缓冲区中，
+    断线重连的客户端带上状态流ID和最后收到的序号时只需补发缺少的增量（catch_up），
+    落后太多或状态流已变化（服务器重启）时才重新发送完整状态。
+    """
+
+    MODE_FULL = "full"    # 每次广播完整状态
+    MODE_DELTA = "delta"  # 关键帧 + 增量
+
+    def __init__(self, mode: str = MODE_FULL, keyframe_interval: int = 20, history_size: int = 64):
+        if mode not in (self.MODE_FULL, self.MODE_DELTA):
+            raise ValueError(f"未知的状态广播模式: {mode}")
+        self.mode = mode
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.stream_id = uuid.uuid4().hex[:12]  # 状态流ID（服务器重启后序号重新开始，客户端据此判断能否续传）
+        self.seq = 0  # 最近一次广播的序号
+        self.history: deque = deque(maxlen=max(0, history_size))  # 最近几次广播的增量消息（按序号排列）
+        self._state: Optional[dict] = None         # 最近一次广播的完整状态
+        self._characters: Dict[str, dict] = {}     # 最近一次广播的角色状态（角色ID → 状态）
+        self._since_keyframe = 0
+
+        # 统计
+        self.keyframes = 0
+        self.deltas = 0
+        self.resumes = 0          # 通过补发增量完成的重连次数
+        self.resume_fallbacks = 0  # 无法补发、需要完整状态的重连次数
+
+    def _advance(self, snapshot: dict):
+        """把 snapshot 记为最新广播的状态"""
+        self.seq += 1
+        self._state = snapshot
+        self._characters = {status["id"]: status for status in snapshot["characters"]}
+
+    def keyframe(self) -> dict:
+        """最近一次广播的状态（完整状态消息）"""
+        return {"type": "game_update", "seq": self.seq, "stream": self.stream_id, "data": self._state}
+
+    def encode(self, snapshot: dict) -> dict:
+        """
+        为一次广播编码状态
+
+        返回:
+            dict: game_update（关键帧）或 game_delta（增量）消息
+        """
+        previous = self._state
+        previous_characters = self._characters
+        self._advance(snapshot)
+
+        if self.mode == self.MODE_FULL or previous is None:
+            self.keyframes += 1
+            return self.keyframe()
+
+        # 关键帧广播也计算增量，保持重连补发用的增量链连续
+        delta = {
+            "type": "game_delta",
+            "seq": self.seq,
+            "base_seq": self.seq - 1,
+            "data": self._diff(previous, previous_characters, snapshot)
+        }
+        self.history.append(delta)
+
+        if self._since_keyframe + 1 >= self.keyframe_interval:
+            self._since_keyframe = 0
+            self.keyframes += 1
+            return self.keyframe()
+
+        self._since_keyframe += 1
+        self.deltas += 1
+        return delta
+
+    def catch_up(self, stream_id: Optional[str], last_seq: int) -> Optional[List[dict]]:
+        """
+        重连客户端需要补发的增量
+
+        参数:
+            stream_id: 客户端记录的状态流ID
+            last_seq: 客户端最后应用的状态序号
+
+        返回:
+            Optional[List[dict]]: 序号 last_seq 之后的增量消息（已是最新时为空列表）；
+                                  无法续传（full 模式、状态流已变化、落后超过缓冲区）时返回 None
+        """
+        missing = self.seq - last_seq
+        if (self.mode == self.MODE_FULL or stream_id != self.stream_id
+                or missing < 0 or missing > len(self.history)):
+            self.resume_fallbacks += 1
+            return None
+        self.resumes += 1
+        if missing == 0:
+            return []
+        return list(self.history)[-missing:]
+
+    @staticmethod
+    def _diff(previous: dict, previous_characters: Dict[str, dict], snapshot: dict) -> dict:
+        """计算两次广播之间的增量"""
+        characters: List[dict] = []
+        seen = set()
+        for status in snapshot["characters"]:
+            character_id = status["id"]
+            seen.add(character_id)
+            old_status = previous_characters.get(character_id)
+            if old_status is None:
+                # 新角色发送完整状态
+                characters.append(status)
+                continue
+            diff = diff_character(old_status, status)
+            if diff is not None:
+                characters.append(diff)
+
+        data = {"time": snapshot["time"], "characters": characters}
+        removed = [character_id for character_id in previous_characters if character_id not in seen]
+        if removed:
+            data["removed_characters"] = removed
+
+        # 订阅视图可以不包含公共仓库
+        old_storage, storage = previous.get("public_storage"), snapshot.get("public_storage")
+        if storage is not None and old_storage is not None and storage is not old_storage and storage != old_storage:
+            data["public_storage"] = diff_inventory(old_storage, storage)
+        if "catalog_version" in snapshot:
+            data["catalog_version"] = snapshot["catalog_version"]
+        return data
+
+    def get_stats_dict(self) -> dict:
+        """获取状态流统计"""
+        return {
+            "mode": self.mode,
+            "stream": self.stream_id,
+            "seq": self.seq,
+            "keyframe_interval": self.keyframe_interval,
+            "keyframes": self.keyframes,
+            "deltas": self.deltas,
+            "history": len(self.history),
+            "history_size": self.history.maxlen,
+            "resumes": self.resumes,
+            "resume_fallbacks": self.resume_fallbacks,
+        }
@@ -0,0 +1,114 @@
+"""订阅模块 - 客户端关注的状态范围（时间、指定角色、公共仓库、角色字段）及其状态视图"""
+from typing import Dict, Iterable, Optional
+
+
+class Interest:
+    """
+    客户端订阅的状态范围（不可变，相同范围的订阅相等，可作为字典键）
+
+    characters 为 None 时包含所有角色，fields 为 None 时包含角色的所有字段（角色ID总是包含），
+    时间总是包含。例如只看时间：Interest(characters=[], public_storage=False)。
+    """
+
+    __slots__ = ("characters", "fields", "public_storage", "_key")
+
+    def __init__(
+        self,
+        characters: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None,
+        public_storage: bool = True
+    ):
+        self.characters = frozenset(characters) if characters is not None else None
+        self.fields = frozenset(fields) | {"id"} if fields is not None else None
+        self.public_storage = public_storage
+        self._key = (self.characters, self.fields, self.public_storage)
+
+    @classmethod
+    def from_message(cls, message: dict) -> "Interest":
+        """
+        从客户端的 subscribe 消息创建订阅范围
+
+        消息格式: {"type": "subscribe", "characters": [角色ID, ...], "fields": [字段名, ...], "public_storage": bool}，
+        省略的项表示全部（public_storage 默认 true）
+
+        异常:
+            ValueError: 消息格式错误
+        """
+        characters = message.get("characters")
+        fields = message.get("fields")
+        public_storage = message.get("public_storage", True)
+        for name, value in (("characters", characters), ("fields", fields)):
+            if value is not None and (not isinstance(value, list) or not all(isinstance(v, str) for v in value)):
+                raise ValueError(f"{name} 必须是字符串列表")
+        if not isinstance(public_storage, bool):
+            raise ValueError("public_storage 必须是布尔值")
+        return cls(characters, fields, public_storage)
+
+    @property
+    def is_everything(self) -> bool:
+        """是否订阅全部状态（默认订阅）"""
+        return self.characters is None and self.fields is None and self.public_storage
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Interest) and self._key == other._key
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
+    def get_dict(self) -> dict:
+        """获取订阅范围数据"""
+        return {
+            "characters": sorted(self.characters) if self.characters is not None else None,
+            "fields": sorted(self.fields) if self.fields is not None else None,
+            "public_storage": self.public_storage,
+        }
+
+
+# 默认订阅（全部状态）
+EVERYTHING = Interest()
+
+
+class InterestView:
+    """
+    按订阅范围从完整状态中取出客户端关注的部分
+
+    只取部分字段时，角色状态字典不变（缓存的同一个字典）则返回上一次的同一个视图字典，
+    StateStream 可以继续按对象身份跳过未变化的角色。
+    """
+
+    def __init__(self, interest: Interest):
+        self.interest = interest
+        self._projections: Dict[str, tuple] = {}  # 角色ID → (状态字典, 视图字典)
+
+    def project(self, snapshot: dict) -> dict:
+        """取出订阅范围内的状态"""
+        interest = self.interest
+        if interest.is_everything:
+            return snapshot
+
+        characters = snapshot["characters"]
+        if interest.characters is not None:
+            characters = [status for status in characters if status["id"] in interest.characters]
+        if interest.fields is not None:
+            characters = self._project_fields(characters)
+
+        view = {"time": snapshot["time"], "characters": characters}
+        if interest.public_storage:
+            view["public_storage"] = snapshot["public_storage"]
+        if "catalog_version" in snapshot:
+            view["catalog_version"] = snapshot["catalog_version"]
+        return view
+
+    def _project_fields(self, characters: list) -> list:
+        fields = self.interest.fields
+        previous = self._projections
+        cache = self._projections = {}
+        projected = []
+        for status in characters:
+            character_id = status["id"]
+            cached = previous.get(character_id)
+            if cached is None or cached[0] is not status:
+                cached = (status, {key: value for key, value in status.items() if key in fields})
+            cache[character_id] = cached
+            projected.append(cached[1])
+        return projected
@@ -0,0 +1,111 @@
+"""Tick 调度器模块 - 基于单调时钟的固定步长调度"""
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class TickScheduler:
+    """
+    固定步长 Tick 调度器
+
+    以单调时钟上的绝对截止时间推进游戏时间，每个 tick 的计算耗时不会累积到下一次等待中。
+    当计算落后于墙钟时，根据追赶策略决定是补跑错过的 tick 还是跳过并记录。
+    """
+
+    POLICY_CATCH_UP = "catch_up"  # 补跑错过的 tick（受 max_catch_up_ticks 限制）
+    POLICY_SKIP = "skip"          # 跳过错过的 tick，只记录数量
+
+    def __init__(
+        self,
+        get_interval: Callable[[], float],
+        policy: str = POLICY_SKIP,
+        max_catch_up_ticks: int = 5,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        参数:
+            get_interval: 返回当前每个 tick 时长（秒）的函数，每次调度时读取，以便速度切换立即生效
+            policy: 追赶策略（catch_up / skip）
+            max_catch_up_ticks: catch_up 策略下单次最多补跑的 tick 数量
+            clock: 单调时钟函数
+        """
+        if policy not in (self.POLICY_CATCH_UP, self.POLICY_SKIP):
+            raise ValueError(f"未知的追赶策略: {policy}")
+        self.get_interval = get_interval
+        self.policy = policy
+        self.max_catch_up_ticks = max(0, max_catch_up_ticks)
+        self._clock = clock
+        self._next_deadline = None
+
+        # 统计数据
+        self.ticks_scheduled = 0   # 已调度执行的 tick 数
+        self.ticks_skipped = 0     # 被跳过的 tick 数
+        self.last_lag = 0.0        # 最近一次唤醒相对截止时间的延迟（秒）
+        self.max_lag = 0.0         # 最大延迟（秒）
+
+    @property
+    def next_deadline(self) -> Optional[float]:
+        """下一个 tick 的截止时间（单调时钟），尚未开始计时时为 None"""
+        return self._next_deadline
+
+    def reset(self):
+        """
+        重置截止时间（时间恢复运行、速度变化后调用），已累积的延迟被丢弃而不是作为追赶 tick 补跑，不清除统计数据
+
+        在等待截止时间期间调用时，本次等待结束后执行一个 tick，并从该时刻重新计时
+        """
+        self._next_deadline = None
+
+    async def wait_for_next_tick(self) -> int:
+        """
+        等待下一个截止时间
+
+        返回:
+            int: 本次应执行的 tick 数量（至少为 1）
+        """
+        interval = self.get_interval()
+        now = self._clock()
+        if self._next_deadline is None:
+            self._next_deadline = now + interval
+
+        delay = self._next_deadline - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+            now = self._clock()
+            if self._next_deadline is None:
+                # 等待期间被 reset
+                self._next_deadline = now
+
+        return self._advance(now, interval)
+
+    def _advance(self, now: float, interval: float) -> int:
+        """根据当前时间推进截止时间并计算需要执行的 tick 数"""
+        lag = max(0.0, now - self._next_deadline)
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+
+        # 除当前截止时间外，已经错过的截止时间数量
+        missed = int(lag // interval) if interval > 0 else 0
+
+        if self.policy == self.POLICY_CATCH_UP:
+            catch_up = min(missed, self.max_catch_up_ticks)
+        else:
+            catch_up = 0
+        self.ticks_skipped += missed - catch_up
+
+        ticks = 1 + catch_up
+        self.ticks_scheduled += ticks
+        # 截止时间始终按固定步长推进，不受执行耗时影响
+        self._next_deadline += (missed + 1) * interval
+        return ticks
+
+    def get_stats_dict(self) -> dict:
+        """获取调度统计数据"""
+        return {
+            "policy": self.policy,
+            "interval": self.get_interval(),
+            "ticks_scheduled": self.ticks_scheduled,
+            "ticks_skipped": self.ticks_skipped,
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+        }
@@ -0,0 +1,63 @@
+"""Tick 工作线程模块 - 把模拟计算移出事件循环"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .world import GameWorld
+
+
+class TickWorker:
+    """
+    Tick 工作线程
+
+    threaded 模式下，tick 的计算阶段和所有读写世界状态的命令都提交到同一个单线程执行器，
+    执行器的先进先出队列保证命令只在 tick 之间（tick 边界）执行，事件循环只负责 I/O。
+    inline 模式下直接在事件循环中执行，与原有行为一致。
+    """
+
+    MODE_INLINE = "inline"  # 在事件循环中直接计算
+    MODE_THREAD = "thread"  # 在专用工作线程中计算
+
+    def __init__(self, world: GameWorld, mode: str = MODE_INLINE):
+        if mode not in (self.MODE_INLINE, self.MODE_THREAD):
+            raise ValueError(f"未知的 tick 模式: {mode}")
+        self.world = world
+        self.mode = mode
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if mode == self.MODE_THREAD:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tick-worker")
+
+    def _run_ticks(self, ticks: int, build_snapshot: bool) -> Optional[dict]:
+        """执行若干 tick，按需构建状态快照（在工作线程中运行）"""
+        for _ in range(ticks):
+            self.world.tick()
+        if build_snapshot:
+            return self.world.get_snapshot_dict()
+        return None
+
+    async def run_ticks(self, ticks: int, build_snapshot: bool = False) -> Optional[dict]:
+        """
+        执行若干 tick
+
+        参数:
+            ticks: tick 数量
+            build_snapshot: 是否在 tick 结束后构建世界快照
+
+        返回:
+            dict: 世界快照（build_snapshot 为 False 时返回 None）
+        """
+        return await self.call(self._run_ticks, ticks, build_snapshot)
+
+    async def call(self, fn: Callable, *args):
+        """在 tick 边界执行命令并返回结果（命令抛出的异常原样传递）"""
+        if self._executor is None:
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+
+    def close(self):
+        """等待已提交的命令完成并停止工作线程"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,149 @@
+"""二进制协议模块 - 通过 WebSocket 子协议协商的 MessagePack 编码（枚举值和物品ID编码为小整数）"""
+from typing import Dict, Iterable, List, Optional
+
+from models import ActionType, TraitType
+
+try:
+    import msgpack
+except ImportError:  # msgpack 为可选依赖，未安装时只提供 JSON 协议
+    msgpack = None
+
+# WebSocket 子协议名称
+SUBPROTOCOL_MSGPACK = "msgpack"
+SUBPROTOCOL_JSON = "json"
+
+
+class MessagePackCodec:
+    """
+    MessagePack 消息编码器
+
+    消息类型和结构与 JSON 协议相同，只是角色的 current_action、traits 和背包堆叠中的物品ID
+    换成编码表中的序号。编码表在连接建立时以 wire_codes 消息发送一次。
+    角色状态和背包数据不变时（缓存的同一个字典）复用上一次的编码结果。
+    """
+
+    def __init__(self, item_ids: Iterable[str]):
+        self.actions: List[str] = [action.value for action in ActionType]
+        self.traits: List[str] = [trait.value for trait in TraitType]
+        self.items: List[str] = list(item_ids)
+        self._action_codes = {value: code for code, value in enumerate(self.actions)}
+        self._trait_codes = {value: code for code, value in enumerate(self.traits)}
+        self._item_codes = {value: code for code, value in enumerate(self.items)}
+        self._characters: Dict[str, tuple] = {}   # 角色ID → (状态字典, 编码后的字典)
+        self._inventories: Dict[int, tuple] = {}  # id(背包数据) → (背包数据, 编码后的背包数据)
+        self._item_dicts: Dict[str, tuple] = {}   # 物品ID → (物品数据, 编码后的物品数据)
+        self._packer = msgpack.Packer(use_bin_type=True) if msgpack is not None else None
+
+    @staticmethod
+    def available() -> bool:
+        """是否已安装 msgpack"""
+        return msgpack is not None
+
+    def codes_message(self) -> dict:
+        """编码表消息（序号 → 原始值）"""
+        return {
+            "type": "wire_codes",
+            "data": {"actions": self.actions, "traits": self.traits, "items": self.items}
+        }
+
+    def encode(self, message: dict) -> bytes:
+        """把消息编码为 MessagePack 二进制数据"""
+        return self._packer.pack(self._code_message(message))
+
+    def _code_message(self, message: dict) -> dict:
+        kind = message.get("type")
+        if kind == "game_update":
+            return {**message, "data": self._code_state(message["data"])}
+        if kind == "game_delta":
+            return {**message, "data": self._code_delta(message["data"])}
+        if kind == "game_catch_up":
+            return {**message, "data": [
+                {**delta, "data": self._code_delta(delta["data"])} for delta in message["data"]
+            ]}
+        return message
+
+    def _code_state(self, state: dict) -> dict:
+        """完整状态（编码结果按角色ID和背包数据缓存，只保留当前状态中出现的）"""
+        previous = self._characters
+        cache = self._characters = {}
+        previous_inventories, self._inventories = self._inventories, {}
+        characters = []
+        for status in state["characters"]:
+            character_id = status["id"]
+            cached = previous.get(character_id)
+            if cached is None or cached[0] is not status:
+                cached = (status, self._code_character(status, previous_inventories))
+            elif "inventory" in status:  # 只订阅部分字段时可以不包含背包
+                inventory = status["inventory"]
+                self._inventories[id(inventory)] = (inventory, cached[1]["inventory"])
+            cache[character_id] = cached
+            characters.append(cached[1])
+        coded = {**state, "characters": characters}
+        if "public_storage" in state:  # 订阅视图可以不包含公共仓库
+            coded["public_storage"] = self._code_inventory(state["public_storage"], previous_inventories)
+        return coded
+
+    def _code_delta(self, delta: dict) -> dict:
+        """增量（角色字段增量和背包增量只编码其中出现的字段）"""
+        coded = {**delta, "characters": [self._code_character(status) for status in delta["characters"]]}
+        if "public_storage" in delta:
+            coded["public_storage"] = self._code_inventory(delta["public_storage"])
+        return coded
+
+    def _code_character(self, status: dict, inventories: Optional[Dict[int, tuple]] = None) -> dict:
+        coded = dict(status)
+        if "current_action" in coded:
+            coded["current_action"] = self._action_codes.get(coded["current_action"], coded["current_action"])
+        if "traits" in coded:
+            coded["traits"] = [self._trait_codes.get(trait, trait) for trait in coded["traits"]]
+        if "inventory" in coded:
+            coded["inventory"] = self._code_inventory(coded["inventory"], inventories)
+        return coded
+
+    def _code_inventory(self, inventory: dict, inventories: Optional[Dict[int, tuple]] = None) -> dict:
+        """
+        背包数据或背包增量
+
+        inventories 为上一次完整状态的背包编码缓存（只用于完整状态；增量每次都是新字典，不缓存）
+        """
+        if inventories is not None:
+            cached = inventories.get(id(inventory))
+            if cached is None or cached[0] is not inventory:
+                cached = (inventory, self._code_inventory(inventory))
+            self._inventories[id(inventory)] = cached
+            return cached[1]
+        coded = dict(inventory)
+        if "items" in coded:
+            coded["items"] = [self._code_stack(stack) for stack in coded["items"]]
+        if "items_set" in coded:
+            coded["items_set"] = [[index, self._code_stack(stack)] for index, stack in coded["items_set"]]
+        return coded
+
+    def _code_stack(self, stack: dict) -> dict:
+        """物品堆叠（normalized 堆叠只含物品ID，inline 堆叠内嵌物品数据）"""
+        if "item_id" in stack:
+            return {**stack, "item_id": self._item_codes.get(stack["item_id"], stack["item_id"])}
+        return {**stack, "item": self._code_item(stack["item"])}
+
+    def _code_item(self, item: dict) -> dict:
+        item_id = item["item_id"]
+        cached = self._item_dicts.get(item_id)
+        if cached is None or cached[0] is not item:
+            cached = (item, {**item, "item_id": self._item_codes.get(item_id, item_id)})
+            self._item_dicts[item_id] = cached
+        return cached[1]
+
+
+def select_subprotocol(requested: Iterable[str], codec: Optional[MessagePackCodec]) -> Optional[str]:
+    """
+    按客户端给出的顺序选择第一个支持的子协议
+
+    未请求子协议时返回 None（JSON 文本）；请求了 msgpack 但服务器不支持时，
+    只要客户端同时请求了 json 就回退到 json。
+    """
+    for subprotocol in requested:
+        if subprotocol == SUBPROTOCOL_MSGPACK and codec is not None:
+            return subprotocol
+        if subprotocol == SUBPROTOCOL_JSON:
+            return subprotocol
+    return None
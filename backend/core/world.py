@@ -0,0 +1,264 @@
+"""游戏世界模块 - 负责构建游戏世界并推进模拟"""
+import random
+from collections import Counter
+from typing import Dict, List, Optional
+
+from models import (
+    Character, Inventory, Item, NeedsEngine, DecisionScheduler, LaborAllocator, ProductionBatch,
+    create_default_items, create_inventory, build_item_catalog
+)
+from utils.character_generator import CharacterGenerator
+from .game_time import GameTime
+from .sharding import ShardedSimulation
+
+
+class GameWorld:
+    """游戏世界 - 持有时间、物品库、角色和公共仓库，提供与驱动方式无关的 tick 推进"""
+
+    def __init__(
+        self,
+        game_time: GameTime,
+        all_items: Dict[str, Item],
+        characters: List[Character],
+        public_storage: Inventory,
+        needs_engine: Optional[NeedsEngine] = None,
+        sharded: Optional[ShardedSimulation] = None,
+        decision_scheduler: Optional[DecisionScheduler] = None,
+        normalized_items: bool = False,
+        labor_allocator: Optional[LaborAllocator] = None,
+        production: Optional[ProductionBatch] = None
+    ):
+        self.game_time = game_time
+        self.all_items = all_items
+        # 物品目录（物品定义只随目录发送一次）；normalized_items 时状态数据中的堆叠只包含物品ID和数量
+        self.item_catalog = build_item_catalog(all_items)
+        self.normalized_items = normalized_items
+        self.characters = characters
+        self.public_storage = public_storage
+        self.needs_engine = needs_engine
+        # 分片模拟（启用后角色状态保存在分片进程中，本进程的 characters 仅在 sync_characters 后更新）
+        self.sharded = sharded
+        # 事件驱动决策调度器（只唤醒到达决策阈值或产出时刻的角色）
+        self.decision_scheduler = decision_scheduler
+        # 全局劳动分配器（启用后每个 tick 决策前按全体资源缺口统一分配劳动类型）
+        self.labor_allocator = labor_allocator
+        # 劳动产出批次（tick 内只记录产出，tick 结束时统一入库；模拟引擎存在时由引擎提交）
+        self.production = production
+
+    def tick(self):
+        """执行一个游戏小时的模拟"""
+        self.game_time.tick()
+
+        if self.sharded is not None:
+            self.sharded.tick(new_day=self.game_time.hour == 0)
+            return
+
+        # 如果是新的一天（0时），所有角色年龄增长
+        if self.game_time.hour == 0:
+            for character in self.characters:
+                character.age_one_day()
+
+        if self.labor_allocator is not None:
+            self._allocate_labor()
+
+        # 更新所有角色状态
+        if self.needs_engine is not None:
+            self.needs_engine.tick()
+        elif self.decision_scheduler is not None:
+            self.decision_scheduler.tick()
+        else:
+            for character in self.characters:
+                # 自动分配行动
+                character.auto_assign_action()
+                # 更新状态
+                character.update_status()
+            if self.production is not None:
+                self.production.commit()
+
+    def _allocate_labor(self):
+        """为本小时会劳动的角色统一分配劳动类型（资源总量包括所有角色背包和公共仓库）"""
+        engine = self.needs_engine or self.decision_scheduler
+        if engine is not None:
+            candidates = engine.labor_candidates()
+        else:
+            candidates = LaborAllocator.select_candidates(self.characters)
+        inventories = [character.inventory for character in self.characters]
+        inventories.append(self.public_storage)
+        self.labor_allocator.assign(candidates, LaborAllocator.count_resources(inventories))
+
+    def get_production_totals(self) -> Counter:
+        """累计劳动产出（物品ID → 数量，分片模式下由各分片汇总）"""
+        if self.sharded is not None:
+            return Counter(self.sharded.total_produced)
+        if self.production is not None:
+            return Counter(self.production.total_produced)
+        return Counter()
+
+    def get_character_status_dicts(self) -> List[dict]:
+        """获取所有角色状态数据（分片模式下从各分片收集）"""
+        normalized = self.normalized_items
+        if self.sharded is not None:
+            return self.sharded.gather_status_dicts(normalized)
+        return [character.get_status_dict(normalized) for character in self.characters]
+
+    def get_snapshot_dict(self) -> dict:
+        """获取完整世界状态快照（时间、角色、公共仓库；物品目录模式下附带目录版本）"""
+        snapshot = {
+            "time": self.game_time.get_time_dict(),
+            "characters": self.get_character_status_dicts(),
+            "public_storage": self.public_storage.get_dict(self.normalized_items)
+        }
+        if self.normalized_items:
+            snapshot["catalog_version"] = self.item_catalog["version"]
+        return snapshot
+
+    def sync_characters(self):
+        """分片模式下把分片中的完整角色对象取回本进程（原地替换 characters 列表内容）"""
+        if self.sharded is not None:
+            self.characters[:] = self.sharded.gather_characters()
+
+    def close(self):
+        """释放模拟资源（停止分片进程）"""
+        if self.sharded is not None:
+            self.sharded.close()
+            self.sharded = None
+
+
+def create_world(
+    config,
+    character_count: Optional[int] = None,
+    engine: Optional[str] = None,
+    seed: Optional[int] = None,
+    shards: Optional[int] = None,
+    inventory: Optional[str] = None,
+    labor: Optional[str] = None
+) -> GameWorld:
+    """
+    根据配置构建游戏世界
+
+    参数:
+        config: 游戏配置（GameConfig 实例）
+        character_count: 角色数量，None 时使用配置值
+        engine: 模拟引擎（object / numpy / event），None 时使用配置值
+        seed: 随机种子，None 时不设置
+        shards: 分片进程数，None 时使用配置值，小于等于 1 时不分片
+        inventory: 背包存储后端（object / compact），None 时使用配置值
+        labor: 劳动分配方式（individual / colony），None 时使用配置值
+
+    返回:
+        GameWorld: 构建好的游戏世界
+    """
+    if seed is not None:
+        random.seed(seed)
+    if character_count is None:
+        character_count = config.CHARACTER_COUNT
+    if engine is None:
+        engine = config.SIMULATION_ENGINE
+    if shards is None:
+        shards = config.SIMULATION_SHARDS
+    if inventory is None:
+        inventory = config.SIMULATION_INVENTORY
+    if labor is None:
+        labor = config.LABOR_ALLOCATION
+    if labor not in (LaborAllocator.MODE_INDIVIDUAL, LaborAllocator.MODE_COLONY):
+        raise ValueError(f"未知的劳动分配方式: {labor}")
+
+    # 全局游戏时间实例
+    game_time = GameTime()
+    game_time.hour_duration = config.HOUR_DURATION
+
+    print(f"\n{'='*50}")
+    print(f"游戏初始化")
+    print(f"{'='*50}\n")
+
+    # 物品系统
+    all_items = create_default_items()  # 所有可用物品的字典
+
+    # 使用配置生成角色
+    print(f"[初始化] 生成 {character_count} 个角色...")
+    characters = CharacterGenerator.generate_characters(
+        count=character_count,
+        inventory_slots=config.CHARACTER_INVENTORY_SLOTS,
+        inventory_backend=inventory
+    )
+
+    # 为角色分配初始物品
+    print(f"\n[初始化] 分配初始物品...")
+    for character in characters:
+        for item_id, quantity in config.INITIAL_CHARACTER_ITEMS.items():
+            if item_id in all_items:
+                character.inventory.add_item(all_items[item_id], quantity)
+                print(f"  {character.name} 获得: {all_items[item_id].name} x{quantity}")
+
+        # 设置物品字典引用
+        character.all_items_ref = all_items
+
+    # 随机给角色分配工具
+    print(f"\n[初始化] 随机分配工具...")
+    for tool in config.INITIAL_TOOLS:
+        if tool in all_items and characters:
+            lucky_character = random.choice(characters)
+            lucky_character.inventory.add_item(all_items[tool], 1)
+            print(f"  {lucky_character.name} 获得工具: {all_items[tool].name}")
+
+    # 创建公共仓库
+    public_storage = create_inventory(config.PUBLIC_STORAGE_SLOTS, inventory)
+
+    # 初始化公共仓库的物品
+    print(f"\n[初始化] 初始化公共仓库...")
+    for item_id, quantity in config.PUBLIC_STORAGE_INITIAL_ITEMS.items():
+        if item_id in all_items:
+            public_storage.add_item(all_items[item_id], quantity)
+            print(f"  公共仓库: {all_items[item_id].name} x{quantity}")
+
+    # 全局劳动分配
+    labor_allocator = None
+    if labor == LaborAllocator.MODE_COLONY:
+        labor_allocator = LaborAllocator(config.LABOR_TARGETS)
+        print(f"\n[初始化] 使用全局劳动分配，资源目标: {config.LABOR_TARGETS}")
+
+    # 多进程分片模拟（各分片在自己的进程内构建模拟引擎）
+    sharded = None
+    if shards > 1:
+        sharded = ShardedSimulation(
+            characters, public_storage, all_items, shards, engine=engine, seed=seed,
+            labor_allocator=labor_allocator, auto_deposit=config.PRODUCTION_AUTO_DEPOSIT
+        )
+        print(f"\n[初始化] 使用 {sharded.shard_count} 个分片进程并行模拟")
+
+    # 劳动产出批次（产出数量使用独立的随机数生成器；分片模式下各分片进程自行创建）
+    production = None
+    if sharded is None:
+        production = ProductionBatch(
+            random.Random(seed), auto_deposit=config.PRODUCTION_AUTO_DEPOSIT, public_storage=public_storage
+        )
+        for character in characters:
+            character.production_batch = production
+
+    # 数组化模拟引擎（可选，需要 numpy）
+    needs_engine = None
+    if engine == "numpy" and sharded is None:
+        try:
+            needs_engine = NeedsEngine(characters, production=production)
+            print(f"\n[初始化] 使用 NumPy 数组化模拟引擎")
+        except RuntimeError as e:
+            print(f"\n[初始化] ⚠️ {e}，使用逐对象模拟")
+
+    # 事件驱动决策调度
+    decision_scheduler = None
+    if engine == "event" and sharded is None:
+        decision_scheduler = DecisionScheduler(
+            characters, batched_labor=labor_allocator is not None, production=production
+        )
+        print(f"\n[初始化] 使用事件驱动决策调度")
+
+    print(f"\n{'='*50}")
+    print(f"初始化完成! 游戏即将开始...")
+    print(f"{'='*50}\n")
+
+    return GameWorld(
+        game_time, all_items, characters, public_storage, needs_engine, sharded, decision_scheduler,
+        normalized_items=config.PROTOCOL_ITEM_CATALOG == "normalized",
+        labor_allocator=labor_allocator,
+        production=production
+    )
@@ -0,0 +1,143 @@
+"""日志模块 - 按子系统分级、延迟格式化、后台环形缓冲输出的日志层"""
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Dict, Optional
+
+# 所有游戏日志记录器的根名称
+ROOT_LOGGER_NAME = "game"
+
+# 子系统名称（日志记录器为 game.<子系统>）
+SUBSYSTEMS = ("action", "work", "food", "world", "sharding", "scheduler", "network")
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """获取子系统日志记录器"""
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{subsystem}")
+
+
+class RingBufferQueue(queue.Queue):
+    """环形缓冲队列 - 队列满时丢弃最旧的记录而不是阻塞写入方"""
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize=maxsize)
+        self.dropped = 0  # 被丢弃的记录数
+
+    def put(self, item, block: bool = True, timeout: Optional[float] = None):
+        """写入记录，队列满时先丢弃最旧的一条"""
+        with self.mutex:
+            if 0 < self.maxsize <= self._qsize():
+                self._get()
+                self.dropped += 1
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+
+class SamplingFilter(logging.Filter):
+    """采样过滤器 - 低于 WARNING 的记录每 rate 条只保留一条，WARNING 及以上全部保留"""
+
+    def __init__(self, rate: int = 1):
+        super().__init__()
+        self.rate = max(1, rate)
+        self._counter = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate == 1 or record.levelno >= logging.WARNING:
+            return True
+        self._counter += 1
+        return self._counter % self.rate == 0
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """只把原始记录放入队列，消息格式化推迟到后台输出线程"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _GameLogging:
+    """日志后台输出状态"""
+    listener: Optional[logging.handlers.QueueListener] = None
+    queue: Optional[RingBufferQueue] = None
+    output_handler: Optional[logging.Handler] = None
+
+
+def setup_logging(
+    level: str = "INFO",
+    levels: Optional[Dict[str, str]] = None,
+    buffer_size: int = 10000,
+    sample_rate: int = 1,
+    stream=None
+) -> RingBufferQueue:
+    """
+    配置游戏日志
+
+    参数:
+        level: 默认日志级别
+        levels: 各子系统的日志级别（如 {"action": "WARNING"}），未列出的子系统使用默认级别
+        buffer_size: 环形缓冲区容量（条）
+        sample_rate: 低于 WARNING 的记录采样率（每 N 条保留 1 条）
+        stream: 输出流，默认 sys.stdout
+
+    返回:
+        RingBufferQueue: 日志缓冲队列（可读取 dropped 统计）
+    """
+    shutdown_logging()
+
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.setLevel(level)
+    root.propagate = False
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    for subsystem in SUBSYSTEMS:
+        get_logger(subsystem).setLevel(logging.NOTSET)
+    for subsystem, subsystem_level in (levels or {}).items():
+        get_logger(subsystem).setLevel(subsystem_level)
+
+    # tick 线程只把记录放入环形缓冲区，格式化和写出在后台线程中完成
+    log_queue = RingBufferQueue(buffer_size)
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+    root.addHandler(queue_handler)
+
+    output_handler = logging.StreamHandler(stream if stream is not None else sys.stdout)
+    output_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, output_handler)
+    listener.start()
+
+    _GameLogging.listener = listener
+    _GameLogging.queue = log_queue
+    _GameLogging.output_handler = output_handler
+    return log_queue
+
+
+def setup_logging_from_config(config, stream=None) -> RingBufferQueue:
+    """根据游戏配置（GameConfig 实例）配置日志（stream 为输出流，默认 sys.stdout）"""
+    return setup_logging(
+        level=config.LOG_LEVEL,
+        levels=config.LOG_LEVELS,
+        buffer_size=config.LOG_BUFFER_SIZE,
+        sample_rate=config.LOG_SAMPLE_RATE,
+        stream=stream
+    )
+
+
+def restart_logging_after_fork():
+    """在 fork 出的子进程中重新启动后台输出线程（线程不会随 fork 复制）"""
+    if _GameLogging.queue is None:
+        return
+    listener = logging.handlers.QueueListener(_GameLogging.queue, _GameLogging.output_handler)
+    listener.start()
+    _GameLogging.listener = listener
+
+
+def shutdown_logging():
+    """停止后台输出线程（写出缓冲区中剩余的记录）"""
+    if _GameLogging.listener is not None:
+        _GameLogging.listener.stop()
+        _GameLogging.listener = None
+        _GameLogging.queue = None
+        _GameLogging.output_handler = None
@@ -1,16 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
-import random
-from typing import List
 
-from models import Character, Gender, Inventory, create_default_items
-from core import GameTime, ConnectionManager
+from core import ConnectionManager, StateStream, MessagePackCodec, TickScheduler, SnapshotBuffer, TickWorker, create_world
 from routers import api_router, websocket_router
 from routers.api import init_game_state
 from routers.websocket import init_websocket_state
-from utils.character_generator import CharacterGenerator
 from config import GameConfig
+from game_logging import get_logger, setup_logging_from_config, shutdown_logging
 
 app = FastAPI()
 
@@ -23,94 +20,94 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 全局游戏时间实例
-game_time = GameTime()
-game_time.hour_duration = GameConfig.HOUR_DURATION
+# 日志（按子系统分级，后台线程输出）
+setup_logging_from_config(GameConfig)
+logger = get_logger("scheduler")
+
+# 构建游戏世界
+world = create_world(GameConfig)
+game_time = world.game_time
+all_items = world.all_items  # 所有可用物品的字典
+characters = world.characters
+public_storage = world.public_storage
+
+# MessagePack 编码器（客户端通过 msgpack 子协议请求；未安装 msgpack 时只提供 JSON）
+codec = None
+if GameConfig.PROTOCOL_MSGPACK:
+    if MessagePackCodec.available():
+        codec = MessagePackCodec(all_items)
+    else:
+        get_logger("network").warning("[连接管理] ⚠️ 未安装 msgpack，二进制协议不可用，客户端将使用 JSON")
 
-print(f"\n{'='*50}")
-print(f"游戏初始化")
-print(f"{'='*50}\n")
-
-# 物品系统
-all_items = create_default_items()  # 所有可用物品的字典
+# 连接管理器
+manager = ConnectionManager(
+    send_timeout=GameConfig.BROADCAST_SEND_TIMEOUT,
+    max_queue=GameConfig.NETWORK_SEND_QUEUE_SIZE,
+    ping_interval=GameConfig.NETWORK_PING_INTERVAL,
+    idle_timeout=GameConfig.NETWORK_IDLE_TIMEOUT,
+    state_stream=StateStream(
+        GameConfig.PROTOCOL_GAME_UPDATES,
+        GameConfig.PROTOCOL_KEYFRAME_INTERVAL,
+        GameConfig.PROTOCOL_RESUME_HISTORY
+    ),
+    codec=codec
+)
 
-# 使用配置生成角色
-print(f"[初始化] 生成 {GameConfig.CHARACTER_COUNT} 个角色...")
-characters = CharacterGenerator.generate_characters(
-    count=GameConfig.CHARACTER_COUNT,
-    inventory_slots=GameConfig.CHARACTER_INVENTORY_SLOTS
+# Tick 调度器（基于单调时钟的绝对截止时间，避免计算耗时导致时间漂移）
+scheduler = TickScheduler(
+    get_interval=lambda: game_time.hour_duration,
+    policy=GameConfig.CATCH_UP_POLICY,
+    max_catch_up_ticks=GameConfig.MAX_CATCH_UP_TICKS
 )
 
-# 为角色分配初始物品
-print(f"\n[初始化] 分配初始物品...")
-for character in characters:
-    for item_id, quantity in GameConfig.INITIAL_CHARACTER_ITEMS.items():
-        if item_id in all_items:
-            character.inventory.add_item(all_items[item_id], quantity)
-            print(f"  {character.name} 获得: {all_items[item_id].name} x{quantity}")
-    
-    # 设置物品字典引用
-    character.all_items_ref = all_items
-
-# 随机给角色分配工具
-print(f"\n[初始化] 随机分配工具...")
-for tool in GameConfig.INITIAL_TOOLS:
-    if tool in all_items:
-        lucky_character = random.choice(characters)
-        lucky_character.inventory.add_item(all_items[tool], 1)
-        print(f"  {lucky_character.name} 获得工具: {all_items[tool].name}")
-
-# 创建公共仓库
-public_storage = Inventory(max_slots=GameConfig.PUBLIC_STORAGE_SLOTS)
-
-# 初始化公共仓库的物品
-print(f"\n[初始化] 初始化公共仓库...")
-for item_id, quantity in GameConfig.PUBLIC_STORAGE_INITIAL_ITEMS.items():
-    if item_id in all_items:
-        public_storage.add_item(all_items[item_id], quantity)
-        print(f"  公共仓库: {all_items[item_id].name} x{quantity}")
-
-print(f"\n{'='*50}")
-print(f"初始化完成! 游戏即将开始...")
-print(f"{'='*50}\n")
+# Tick 工作线程（thread 模式下 tick 计算和读写世界状态的命令在专用线程中执行，事件循环只处理 I/O）
+tick_worker = TickWorker(world, mode=GameConfig.TICK_MODE)
 
-# 连接管理器
-manager = ConnectionManager()
+# 模拟与广播之间的双缓冲快照
+snapshots = SnapshotBuffer()
 
 
 async def time_loop():
     """时间循环任务"""
     while True:
-        if game_time.running:
-            game_time.tick()
-
-            # 如果是新的一天（0时），所有角色年龄增长
-            if game_time.hour == 0:
-                for character in characters:
-                    character.age_one_day()
-
-            # 更新所有角色状态
-            for character in characters:
-                # 自动分配行动
-                character.auto_assign_action()
-                # 更新状态
-                character.update_status()
-
-            # 广播时间和角色状态更新给所有客户端
-            await manager.broadcast({
-                "type": "game_update",
-                "data": {
-                    "time": game_time.get_time_dict(),
-                    "characters": [char.get_status_dict() for char in characters],
-                    "public_storage": public_storage.get_dict()
-                }
-            })
-        await asyncio.sleep(game_time.hour_duration)
+        ticks = await scheduler.wait_for_next_tick()
+        if not game_time.running:
+            continue
+
+        # 只在广播侧下一次读取前的最后一批 tick 结束时构建快照
+        snapshot = await tick_worker.run_ticks(ticks, build_snapshot=snapshots.wants_snapshot(scheduler.next_deadline))
+        if snapshot is not None:
+            snapshots.publish(snapshot)
+
+        if scheduler.last_lag > game_time.hour_duration:
+            logger.warning("[调度器] ⚠️ tick 落后 %.1fms，累计跳过 %s 个tick",
+                           scheduler.last_lag * 1000, scheduler.ticks_skipped)
+
+
+async def broadcast_loop():
+    """广播循环任务 - 按固定间隔把最新快照广播给所有客户端"""
+    last_version = 0
+    while True:
+        snapshots.schedule_read(GameConfig.BROADCAST_INTERVAL)
+        await asyncio.sleep(GameConfig.BROADCAST_INTERVAL)
+        if not manager.active_connections:
+            continue
+
+        version, snapshot = snapshots.read()
+        if snapshot is None or version == last_version:
+            continue
+        last_version = version
+
+        # 广播时间和角色状态更新给所有客户端（单次广播失败不终止广播循环）
+        try:
+            await manager.broadcast_state(snapshot)
+        except Exception:
+            get_logger("network").exception("[连接管理] ❌ 广播游戏状态失败")
 
 
 # 初始化路由模块的游戏状态
-init_game_state(game_time, manager, characters, all_items, public_storage)
-init_websocket_state(game_time, manager, characters, all_items, public_storage)
+init_game_state(game_time, manager, characters, all_items, public_storage, scheduler, world, tick_worker)
+init_websocket_state(game_time, manager, characters, all_items, public_storage, world, tick_worker)
 
 # 注册路由
 app.include_router(api_router)
@@ -122,6 +119,16 @@ async def startup_event():
     """启动时自动开始时间系统"""
     game_time.running = False
     asyncio.create_task(time_loop())
+    asyncio.create_task(broadcast_loop())
+    asyncio.create_task(manager.heartbeat_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """关闭时停止 tick 工作线程、分片进程和日志输出线程"""
+    tick_worker.close()
+    world.close()
+    shutdown_logging()
 
 
 @app.get("/")
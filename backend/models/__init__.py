@@ -4,9 +4,14 @@ from .action_system import ActionSystem
 from .work_system import WorkSystem
 from .food_system import FoodSystem
 from .trait_system import TraitSystem
+from .needs_engine import NeedsEngine
+from .decision_scheduler import DecisionScheduler
+from .labor_allocator import LaborAllocator
+from .production import ProductionBatch
 from .item import (
-    Item, ItemStack, Inventory, ItemCategory, ItemRarity,
-    create_default_items
+    Item, ItemStack, Inventory, CompactInventory, ItemCategory, ItemRarity,
+    TransferMove, TransferError, create_default_items, create_inventory, transfer_items,
+    build_item_catalog, get_item_bit
 )
 
 __all__ = [
@@ -18,10 +23,21 @@ __all__ = [
     "WorkSystem",
     "FoodSystem",
     "TraitSystem",
+    "NeedsEngine",
+    "DecisionScheduler",
+    "LaborAllocator",
+    "ProductionBatch",
     "Item",
     "ItemStack",
     "Inventory",
+    "CompactInventory",
     "ItemCategory",
     "ItemRarity",
     "create_default_items",
+    "create_inventory",
+    "TransferMove",
+    "TransferError",
+    "transfer_items",
+    "build_item_catalog",
+    "get_item_bit",
 ]
@@ -1,14 +1,119 @@
 """行动系统模块 - 负责角色行动相关逻辑"""
-from typing import TYPE_CHECKING
+import logging
+from typing import TYPE_CHECKING, Dict
+from game_logging import get_logger
 from .enums import ActionType
+from .trait_system import TraitSystem
+from .food_system import FoodSystem
+from .work_system import WorkSystem
 
 if TYPE_CHECKING:
     from .character import Character
 
+logger = get_logger("action")
+
 
 class ActionSystem:
     """行动系统 - 处理角色的行动分配和效果应用"""
 
+    # 行动效果声明：
+    #   deltas: 每小时状态变化 (属性, 基础值, 特质钩子)，基础值为正时上限 100，为负时下限 0
+    #   handler: 状态变化之后执行的处理函数名（消耗背包、劳动进度等）
+    # 新增行动类型只需在此添加一项
+    ACTION_EFFECTS = {
+        ActionType.REST: {
+            # 休息恢复疲劳（高效睡眠），也会饿（坚韧）
+            "deltas": [("fatigue", 10, "fatigue_recovery"), ("hunger", -1, "hunger_consumption")],
+        },
+        ActionType.EAT: {
+            # 进食消耗背包中的食物
+            "deltas": [],
+            "handler": "apply_eat_effects",
+        },
+        ActionType.ENTERTAINMENT: {
+            # 娱乐恢复心情（开朗），消耗精力和饥饿（强壮、坚韧）
+            "deltas": [("mood", 8, "mood_entertainment"), ("fatigue", -2, "fatigue_consumption"), ("hunger", -2, "hunger_consumption")],
+        },
+        ActionType.LUMBERING: {
+            # 劳动消耗疲劳和饥饿（强壮、坚韧），推进劳动进度
+            "deltas": [("fatigue", -5, "fatigue_consumption"), ("hunger", -4, "hunger_consumption")],
+            "handler": "advance_work_progress",
+        },
+        ActionType.MINING: {
+            "deltas": [("fatigue", -5, "fatigue_consumption"), ("hunger", -4, "hunger_consumption")],
+            "handler": "advance_work_progress",
+        },
+        ActionType.GATHERING: {
+            "deltas": [("fatigue", -5, "fatigue_consumption"), ("hunger", -4, "hunger_consumption")],
+            "handler": "advance_work_progress",
+        },
+        ActionType.FARMING: {
+            "deltas": [("fatigue", -5, "fatigue_consumption"), ("hunger", -4, "hunger_consumption")],
+            "handler": "advance_work_progress",
+        },
+    }
+
+    # 特质钩子：根据角色特质修正基础变化值
+    TRAIT_HOOKS = {
+        "fatigue_recovery": lambda character, base: TraitSystem.apply_fatigue_change(character, base, is_consumption=False),
+        "fatigue_consumption": lambda character, base: TraitSystem.apply_fatigue_change(character, base, is_consumption=True),
+        "hunger_recovery": lambda character, base: TraitSystem.apply_hunger_change(character, base, is_consumption=False),
+        "hunger_consumption": lambda character, base: TraitSystem.apply_hunger_change(character, base, is_consumption=True),
+        "mood_entertainment": lambda character, base: TraitSystem.apply_mood_change(character, base, is_entertainment=True),
+        "mood_consumption": lambda character, base: TraitSystem.apply_mood_change(character, base, is_consumption=True),
+    }
+
+    # 编译后的分派表：行动类型 → (handler, 状态变化声明)
+    _dispatch: Dict[ActionType, tuple] = {}
+    # (特质档案, 行动类型) → 修正后的状态变化 ((属性, 变化值, 是否为恢复), ...)
+    _compiled_deltas: Dict[tuple, tuple] = {}
+
+    @staticmethod
+    def compile_action_effects():
+        """把行动效果声明编译为分派表（模块加载时执行一次，修改 ACTION_EFFECTS 后需重新调用）"""
+        ActionSystem._dispatch = {
+            action: (
+                getattr(ActionSystem, effect["handler"]) if effect.get("handler") else None,
+                tuple((stat, base, ActionSystem.TRAIT_HOOKS[hook]) for stat, base, hook in effect["deltas"]),
+            )
+            for action, effect in ActionSystem.ACTION_EFFECTS.items()
+        }
+        ActionSystem._compiled_deltas = {}
+
+    @staticmethod
+    def get_action_deltas(character: "Character", action: ActionType) -> tuple:
+        """获取角色执行某行动时每小时的状态变化 ((属性, 变化值, 是否为恢复), ...)，相同特质组合共享结果"""
+        key = (character.trait_profile, action)
+        deltas = ActionSystem._compiled_deltas.get(key)
+        if deltas is None:
+            entry = ActionSystem._dispatch.get(action)
+            declared = entry[1] if entry is not None else ()
+            deltas = tuple((stat, hook(character, base), base > 0) for stat, base, hook in declared)
+            ActionSystem._compiled_deltas[key] = deltas
+        return deltas
+
+    @staticmethod
+    def has_handler(action: ActionType) -> bool:
+        """行动是否带有逐角色处理函数（消耗背包、劳动进度等）"""
+        entry = ActionSystem._dispatch.get(action)
+        return entry is not None and entry[0] is not None
+
+    @staticmethod
+    def apply_action_handler(character: "Character", action: ActionType):
+        """只执行行动的处理函数（不应用状态变化）"""
+        entry = ActionSystem._dispatch.get(action)
+        if entry is not None and entry[0] is not None:
+            entry[0](character)
+
+    @staticmethod
+    def apply_action_deltas(character: "Character", action: ActionType):
+        """只应用行动的状态变化（不执行处理函数）"""
+        for stat, delta, recovery in ActionSystem.get_action_deltas(character, action):
+            if recovery:
+                setattr(character, stat, min(100, getattr(character, stat) + delta))
+            else:
+                setattr(character, stat, max(0, getattr(character, stat) + delta))
+
     @staticmethod
     def assign_action(character: "Character", action: ActionType):
         """分配行动"""
@@ -16,156 +121,137 @@ class ActionSystem:
         
         # 只在行动真正改变时才重置持续时间
         if character.current_action != action:
-            print(f"[行动系统] {character.name} - 行动变更: {old_action} → {action.value}")
+            logger.debug("[行动系统] %s - 行动变更: %s → %s", character.name, old_action, action.value)
             character.current_action = action
             character.action_duration = 0
             # work_progress 不再重置，各工作类型的进度独立保持
         else:
-            print(f"[行动系统] {character.name} - 继续当前行动: {action.value}")
+            logger.debug("[行动系统] %s - 继续当前行动: %s", character.name, action.value)
 
     @staticmethod
     def apply_action_effects(character: "Character"):
-        """应用行动效果"""
-        from .trait_system import TraitSystem
-        
-        if character.current_action == ActionType.REST:
-            # 休息恢复疲劳 - 应用高效睡眠特质
-            base_fatigue_recovery = 10
-            fatigue_recovery = TraitSystem.apply_fatigue_change(character, base_fatigue_recovery, is_consumption=False)
-            character.fatigue = min(100, character.fatigue + fatigue_recovery)
-            
-            # 休息时也会饿 - 应用坚韧特质
-            base_hunger_consumption = -1
-            hunger_consumption = TraitSystem.apply_hunger_change(character, base_hunger_consumption, is_consumption=True)
-            character.hunger = max(0, character.hunger + hunger_consumption)
-
-        elif character.current_action == ActionType.EAT:
-            # 进食需要消耗食物
-            from .food_system import FoodSystem
-            
-            # 计算饥饿缺口
-            hunger_gap = 100 - character.hunger
-            
-            if hunger_gap <= 0:
-                print(f"[行动系统] {character.name} - 已经饱了 (饥饿度: {character.hunger:.1f})")
-                character.fatigue = max(0, character.fatigue - 1)
-                return
-            
-            # 选择食物
-            selected_foods = FoodSystem.select_food_to_eat(character, hunger_gap)
-            
-            if not selected_foods:
-                print(f"[行动系统] ❌ {character.name} - 没有食物可吃！切换到休息")
-                character.fatigue = max(0, character.fatigue - 1)
-                # 立即切换到休息状态
-                ActionSystem.assign_action(character, ActionType.REST)
-                return
-            
-            # 消耗食物并恢复饥饿 - 应用好胃口和美食家特质
-            total_recovery = 0
-            for item_id, quantity, recovery in selected_foods:
-                character.inventory.remove_item(item_id, quantity)
-                total_recovery += recovery
-            
-            # 应用好胃口特质修正
-            total_recovery = TraitSystem.apply_hunger_change(character, total_recovery, is_consumption=False)
-            character.hunger = min(100, character.hunger + total_recovery)
-            
-            # 应用美食家特质的心情加成
-            mood_bonus = TraitSystem.apply_mood_change(character, 0, is_eating=True)
-            if mood_bonus > 0:
-                character.mood = min(100, character.mood + mood_bonus)
-            
+        """应用行动效果（查分派表：状态变化 + 处理函数）"""
+        action = character.current_action
+        entry = ActionSystem._dispatch.get(action)
+        if entry is None:
+            return
+        ActionSystem.apply_action_deltas(character, action)
+        if entry[0] is not None:
+            entry[0](character)
+
+    @staticmethod
+    def apply_eat_effects(character: "Character"):
+        """应用进食效果（进食需要消耗背包中的食物）"""
+
+        # 计算饥饿缺口
+        hunger_gap = 100 - character.hunger
+
+        if hunger_gap <= 0:
+            logger.debug("[行动系统] %s - 已经饱了 (饥饿度: %.1f)", character.name, character.hunger)
             character.fatigue = max(0, character.fatigue - 1)
-            print(f"[行动系统] ✅ {character.name} - 进食完成，恢复 {total_recovery:.1f}，饥饿度: {character.hunger:.1f}")
-            
-            # 检查吃完后是否还有食物，且饥饿度仍低于阈值
-            if character.hunger < 40:
-                has_more_food = FoodSystem.has_any_food(character)
-                if not has_more_food:
-                    print(f"[行动系统] ⚠️ {character.name} - 食物吃完但仍然饥饿 (饥饿度: {character.hunger:.1f})，切换到休息")
-                    ActionSystem.assign_action(character, ActionType.REST)
-
-        elif character.current_action == ActionType.ENTERTAINMENT:
-            # 娱乐恢复心情 - 应用开朗特质
-            base_mood_recovery = 8
-            mood_recovery = TraitSystem.apply_mood_change(character, base_mood_recovery, is_entertainment=True)
-            character.mood = min(100, character.mood + mood_recovery)
-            
-            # 娱乐会消耗精力和饥饿 - 应用坚韧特质
-            base_fatigue_consumption = -2
-            base_hunger_consumption = -2
-            fatigue_consumption = TraitSystem.apply_fatigue_change(character, base_fatigue_consumption, is_consumption=True)
-            hunger_consumption = TraitSystem.apply_hunger_change(character, base_hunger_consumption, is_consumption=True)
-            character.fatigue = max(0, character.fatigue + fatigue_consumption)
-            character.hunger = max(0, character.hunger + hunger_consumption)
-
-        elif character.current_action in [ActionType.LUMBERING, ActionType.MINING, ActionType.GATHERING, ActionType.FARMING]:
-            # 劳动消耗疲劳和饥饿 - 应用强壮和坚韧特质
-            base_fatigue_consumption = -5
-            base_hunger_consumption = -4
-            fatigue_consumption = TraitSystem.apply_fatigue_change(character, base_fatigue_consumption, is_consumption=True)
-            hunger_consumption = TraitSystem.apply_hunger_change(character, base_hunger_consumption, is_consumption=True)
-            character.fatigue = max(0, character.fatigue + fatigue_consumption)
-            character.hunger = max(0, character.hunger + hunger_consumption)
-            
-            # 增加当前劳动类型的进度 - 应用手巧特质
-            base_progress = 1
-            progress_modifier = TraitSystem.get_trait_modifier(character, "work_progress_modifier", 1.0)
-            progress_increment = base_progress * progress_modifier
-            character.work_progress[character.current_action] += progress_increment
-            current_progress = character.work_progress[character.current_action]
-            print(f"[行动系统] {character.name} - {character.current_action.value} 进度 +{progress_increment:.2f} → {current_progress:.2f}/4")
-            
-            # 检查是否到达产出时间（4小时）
-            from .work_system import WorkSystem
-            WorkSystem.try_produce_items(character)
+            return
+
+        # 选择食物
+        selected_foods = FoodSystem.select_food_to_eat(character, hunger_gap)
+
+        if selected_foods is None:
+            logger.info("[行动系统] ❌ %s - 没有食物可吃！切换到休息", character.name)
+            character.fatigue = max(0, character.fatigue - 1)
+            # 立即切换到休息状态
+            ActionSystem.assign_action(character, ActionType.REST)
+            return
+
+        if not selected_foods:
+            # 有食物，但吃任何食物都比不吃更偏离缺口：本小时不进食，也不切换行动
+            logger.debug("[行动系统] %s - 食物恢复量都远超饥饿缺口，暂不进食 (饥饿度: %.1f)", character.name, character.hunger)
+            character.fatigue = max(0, character.fatigue - 1)
+            return
+
+        # 消耗食物并恢复饥饿 - 应用好胃口和美食家特质
+        total_recovery = 0
+        for item_id, quantity, recovery in selected_foods:
+            character.inventory.remove_item(item_id, quantity)
+            total_recovery += recovery
+
+        # 应用好胃口特质修正
+        total_recovery = TraitSystem.apply_hunger_change(character, total_recovery, is_consumption=False)
+        character.hunger = min(100, character.hunger + total_recovery)
+
+        # 应用美食家特质的心情加成
+        mood_bonus = TraitSystem.apply_mood_change(character, 0, is_eating=True)
+        if mood_bonus > 0:
+            character.mood = min(100, character.mood + mood_bonus)
+
+        character.fatigue = max(0, character.fatigue - 1)
+        logger.debug("[行动系统] ✅ %s - 进食完成，恢复 %.1f，饥饿度: %.1f", character.name, total_recovery, character.hunger)
+
+        # 检查吃完后是否还有食物，且饥饿度仍低于阈值
+        if character.hunger < 40:
+            has_more_food = FoodSystem.has_any_food(character)
+            if not has_more_food:
+                logger.info("[行动系统] ⚠️ %s - 食物吃完但仍然饥饿 (饥饿度: %.1f)，切换到休息", character.name, character.hunger)
+                ActionSystem.assign_action(character, ActionType.REST)
+
+    @staticmethod
+    def advance_work_progress(character: "Character"):
+        """推进当前劳动类型的进度，并检查产出"""
+        # 增加当前劳动类型的进度 - 应用手巧特质
+        base_progress = 1
+        progress_increment = base_progress * character.trait_profile.work_progress
+        character.work_progress[character.current_action] += progress_increment
+        current_progress = character.work_progress[character.current_action]
+        logger.debug("[行动系统] %s - %s 进度 +%.2f → %.2f/4", character.name, character.current_action.value, progress_increment, current_progress)
+
+        # 检查是否到达产出时间（4小时）
+        WorkSystem.try_produce_items(character)
 
     @staticmethod
     def auto_assign_action(character: "Character"):
         """根据角色状态自动分配行动"""
         # 优先级：饥饿 > 疲劳 > 心情
-        print(f"[行动系统] {character.name} - 自动分配行动 (疲劳:{character.fatigue:.1f}, 饥饿:{character.hunger:.1f}, 心情:{character.mood:.1f})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[行动系统] %s - 自动分配行动 (疲劳:%.1f, 饥饿:%.1f, 心情:%.1f)",
+                         character.name, character.fatigue, character.hunger, character.mood)
 
         # 如果当前正在休息，持续到疲劳值90以上再切换
         if character.current_action == ActionType.REST and character.fatigue < 90:
-            print(f"[行动系统] {character.name} - 继续休息（疲劳未恢复到90）")
+            logger.debug("[行动系统] %s - 继续休息（疲劳未恢复到90）", character.name)
             return  # 继续休息，不切换状态
         
         # 如果饥饿度低于40，去进食（前提是有食物）
         if character.hunger < 40:
-            from .food_system import FoodSystem
             has_food = FoodSystem.has_any_food(character)
             
             if has_food:
-                print(f"[行动系统] {character.name} - 决策：进食（饥饿度 {character.hunger:.1f} < 40）")
+                logger.debug("[行动系统] %s - 决策：进食（饥饿度 %.1f < 40）", character.name, character.hunger)
                 ActionSystem.assign_action(character, ActionType.EAT)
             else:
-                print(f"[行动系统] ⚠️ {character.name} - 警告：饥饿但没有食物！优先休息（饥饿度 {character.hunger:.1f}）")
+                logger.info("[行动系统] ⚠️ %s - 警告：饥饿但没有食物！优先休息（饥饿度 %.1f）", character.name, character.hunger)
                 ActionSystem.assign_action(character, ActionType.REST)
         # 如果疲劳度低于40，去休息
         elif character.fatigue < 40:
-            print(f"[行动系统] {character.name} - 决策：休息（疲劳度 {character.fatigue:.1f} < 40）")
+            logger.debug("[行动系统] %s - 决策：休息（疲劳度 %.1f < 40）", character.name, character.fatigue)
             ActionSystem.assign_action(character, ActionType.REST)
         # 如果心情低于50，去娱乐
         elif character.mood < 50:
-            print(f"[行动系统] {character.name} - 决策：娱乐（心情 {character.mood:.1f} < 50）")
+            logger.debug("[行动系统] %s - 决策：娱乐（心情 %.1f < 50）", character.name, character.mood)
             ActionSystem.assign_action(character, ActionType.ENTERTAINMENT)
         # 如果状态良好（疲劳>60且饥饿>60），可以劳动
         elif character.fatigue > 60 and character.hunger > 60:
-            print(f"[行动系统] {character.name} - 决策：劳动（状态良好）")
-            from .work_system import WorkSystem
+            logger.debug("[行动系统] %s - 决策：劳动（状态良好）", character.name)
             WorkSystem.choose_work_action(character)
         # 状态不足以劳动，但也不紧急，优先恢复最低的状态
         else:
             # 找出最需要恢复的状态
             if character.hunger <= character.fatigue and character.hunger <= character.mood:
-                print(f"[行动系统] {character.name} - 决策：进食（饥饿度最低: {character.hunger:.1f}）")
+                logger.debug("[行动系统] %s - 决策：进食（饥饿度最低: %.1f）", character.name, character.hunger)
                 ActionSystem.assign_action(character, ActionType.EAT)
             elif character.fatigue <= character.mood:
-                print(f"[行动系统] {character.name} - 决策：休息（疲劳度最低: {character.fatigue:.1f}）")
+                logger.debug("[行动系统] %s - 决策：休息（疲劳度最低: %.1f）", character.name, character.fatigue)
                 ActionSystem.assign_action(character, ActionType.REST)
             else:
-                print(f"[行动系统] {character.name} - 决策：娱乐（心情最低: {character.mood:.1f}）")
+                logger.debug("[行动系统] %s - 决策：娱乐（心情最低: %.1f）", character.name, character.mood)
                 ActionSystem.assign_action(character, ActionType.ENTERTAINMENT)
 
+
+ActionSystem.compile_action_effects()
@@ -1,49 +1,208 @@
 """角色模块 - 核心角色类"""
 import uuid
-from typing import TYPE_CHECKING, List
+from typing import List, Optional, Union
 from .enums import Gender, ActionType, TraitType
-
-if TYPE_CHECKING:
-    from .item import Inventory
+from .trait_system import TraitSystem
+from .action_system import ActionSystem
+from .item import Inventory, CompactInventory, create_inventory
 
 
 class Character:
     """角色类 - 负责角色基础属性和状态管理"""
     
-    def __init__(self, name: str, gender: Gender, inventory_slots: int = 20, age_years: int = 25, age_days: int = 0, traits: List[TraitType] = None):
+    def __init__(self, name: str, gender: Gender, inventory_slots: int = 20, age_years: int = 25, age_days: int = 0, traits: List[TraitType] = None, inventory_backend: str = "object"):
         self.id = str(uuid.uuid4())  # 生成唯一UUID
+        # 状态版本号（状态、年龄、特质变化时递增）和按版本缓存的状态数据
+        self._version = 0
+        self._status_cache = {}  # 序列化模式 → (版本, 状态数据)
         self.name = name
         self.gender = gender
         # 年龄系统
         self.age_years = age_years  # 年龄（岁）
         self.age_days = age_days    # 年龄的天数部分（0-364）
+        # 数组化模拟引擎绑定（绑定后状态值读写引擎数组中的对应行）
+        self._engine = None
+        self._row = -1
+        # 事件驱动决策调度器绑定（绑定后状态值在读取时按需补算休眠期间的变化）
+        self._scheduler = None
         # 特质系统
-        self.traits: List[TraitType] = traits if traits is not None else []
+        self.traits = traits if traits is not None else []  # 赋值时编译特质档案
         # 状态值（0-100）
-        self.fatigue = 100  # 疲劳度，100=精力充沛，0=极度疲劳
-        self.hunger = 100   # 饥饿度，100=饱腹，0=极度饥饿
-        self.mood = 100     # 心情，100=极好，0=极度糟糕
+        self._fatigue = 100  # 疲劳度，100=精力充沛，0=极度疲劳
+        self._hunger = 100   # 饥饿度，100=饱腹，0=极度饥饿
+        self._mood = 100     # 心情，100=极好，0=极度糟糕
         # 行动相关
-        self.current_action: ActionType = ActionType.REST  # 当前行动（初始为休息）
-        self.action_duration = 0  # 行动持续时间（小时）
+        self._current_action: ActionType = ActionType.REST  # 当前行动（初始为休息）
+        self._action_duration = 0  # 行动持续时间（小时）
         # 劳动进度计数器（每种工作类型独立记录）
-        self.work_progress = {
+        self._work_progress = {
             ActionType.LUMBERING: 0,
             ActionType.MINING: 0,
             ActionType.GATHERING: 0,
             ActionType.FARMING: 0
         }
         # 背包系统
-        from .item import Inventory
-        self.inventory: Inventory = Inventory(max_slots=inventory_slots)
+        self.inventory: Union[Inventory, CompactInventory] = create_inventory(inventory_slots, inventory_backend)
         # 物品字典引用（用于劳动产出）
         self.all_items_ref = None
+        # 全局劳动分配器本小时分配的劳动类型（劳动决策时使用一次，None 时自行选择）
+        self.labor_assignment: Optional[ActionType] = None
+        # 劳动产出批次（设置后产出在 tick 结束时统一入库，None 时立即放入背包）
+        self.production_batch = None
+
+    # ==================== 特质 ====================
+
+    @property
+    def traits(self) -> List[TraitType]:
+        return self._traits
+
+    @traits.setter
+    def traits(self, value: List[TraitType]):
+        """设置特质并重新编译特质档案（相同组合共享同一档案），绑定引擎或调度器时同步更新其修正值"""
+        if self._scheduler is not None:
+            # 休眠期间的变化按原特质补算
+            self._scheduler.sync(self._row)
+        self._traits = value
+        self.trait_profile = TraitSystem.compile_traits(value)
+        self._version += 1
+        if self._engine is not None:
+            self._engine.refresh_modifiers(self)
+        if self._scheduler is not None:
+            self._scheduler.refresh_rates(self)
+
+    # ==================== 状态值访问 ====================
+    # 未绑定引擎时读写对象自身属性；绑定 NeedsEngine 后成为引擎数组行的视图；
+    # 绑定 DecisionScheduler 后读写前先补算休眠期间的状态变化
+
+    @property
+    def fatigue(self) -> float:
+        if self._engine is None:
+            if self._scheduler is not None:
+                self._scheduler.sync(self._row)
+            return self._fatigue
+        return self._engine.fatigue[self._row].item()
+
+    @fatigue.setter
+    def fatigue(self, value: float):
+        self._version += 1
+        if self._engine is None:
+            if self._scheduler is not None:
+                self._scheduler.sync(self._row)
+            self._fatigue = value
+        else:
+            self._engine.fatigue[self._row] = value
+
+    @property
+    def hunger(self) -> float:
+        if self._engine is None:
+            if self._scheduler is not None:
+                self._scheduler.sync(self._row)
+            return self._hunger
+        return self._engine.hunger[self._row].item()
+
+    @hunger.setter
+    def hunger(self, value: float):
+        self._version += 1
+        if self._engine is None:
+            if self._scheduler is not None:
+                self._scheduler.sync(self._row)
+            self._hunger = value
+        else:
+            self._engine.hunger[self._row] = value
+
+    @property
+    def mood(self) -> float:
+        if self._engine is None:
+            if self._scheduler is not None:
+                self._scheduler.sync(self._row)
+            return self._mood
+        return self._engine.mood[self._row].item()
+
+    @mood.setter
+    def mood(self, value: float):
+        self._version += 1
+        if self._engine is None:
+            if self._scheduler is not None:
+                self._scheduler.sync(self._row)
+            self._mood = value
+        else:
+            self._engine.mood[self._row] = value
+
+    @property
+    def current_action(self) -> ActionType:
+        if self._engine is None:
+            if self._scheduler is not None:
+                self._scheduler.sync(self._row)
+            return self._current_action
+        return self._engine.ACTIONS[self._engine.action[self._row]]
+
+    @current_action.setter
+    def current_action(self, value: ActionType):
+        self._version += 1
+        if self._engine is None:
+            if self._scheduler is not None:
+                self._scheduler.sync(self._row)
+            self._current_action = value
+        else:
+            self._engine.action[self._row] = self._engine.ACTION_CODES[value]
+
+    @property
+    def action_duration(self) -> int:
+        if self._engine is None:
+            if self._scheduler is not None:
+                self._scheduler.sync(self._row)
+            return self._action_duration
+        return self._engine.action_duration[self._row].item()
+
+    @action_duration.setter
+    def action_duration(self, value: int):
+        self._version += 1
+        if self._engine is None:
+            if self._scheduler is not None:
+                self._scheduler.sync(self._row)
+            self._action_duration = value
+        else:
+            self._engine.action_duration[self._row] = value
+
+    @property
+    def work_progress(self) -> dict:
+        if self._scheduler is not None:
+            self._scheduler.sync(self._row)
+        return self._work_progress
+
+    def bind_engine(self, engine, row: int):
+        """绑定到数组化模拟引擎的指定行（由 NeedsEngine 调用）"""
+        self._engine = engine
+        self._row = row
+
+    def unbind_engine(self):
+        """解除引擎绑定，把当前状态值复制回对象自身"""
+        if self._engine is None:
+            return
+        fatigue, hunger, mood = self.fatigue, self.hunger, self.mood
+        current_action, action_duration = self.current_action, self.action_duration
+        self._engine = None
+        self._row = -1
+        self._fatigue, self._hunger, self._mood = fatigue, hunger, mood
+        self._current_action, self._action_duration = current_action, action_duration
+
+    def bind_scheduler(self, scheduler, row: int):
+        """绑定到事件驱动决策调度器的指定行（由 DecisionScheduler 调用）"""
+        self._scheduler = scheduler
+        self._row = row
+
+    def unbind_scheduler(self):
+        """解除调度器绑定（调用前状态需已补算到当前时刻）"""
+        self._scheduler = None
+        self._row = -1
+
+    def wake(self):
+        """通知调度器角色可能被外部修改（背包、行动等），下一个 tick 重新决策"""
+        if self._scheduler is not None:
+            self._scheduler.wake(self._row)
 
     def update_status(self):
         """每小时更新状态"""
-        from .action_system import ActionSystem
-        from .trait_system import TraitSystem
-        
         # 执行当前行动的效果
         ActionSystem.apply_action_effects(self)
 
@@ -64,16 +223,15 @@ class Character:
 
     def assign_action(self, action: ActionType):
         """分配行动 - 委托给 ActionSystem"""
-        from .action_system import ActionSystem
         ActionSystem.assign_action(self, action)
 
     def auto_assign_action(self):
         """根据角色状态自动分配行动 - 委托给 ActionSystem"""
-        from .action_system import ActionSystem
         ActionSystem.auto_assign_action(self)
 
     def age_one_day(self):
         """年龄增长一天"""
+        self._version += 1
         self.age_days += 1
         if self.age_days >= 365:
             self.age_years += 1
@@ -85,8 +243,7 @@ class Character:
 
     def get_trait_names(self) -> List[str]:
         """获取特质的中文名称列表"""
-        from .trait_system import TraitSystem
-        return [TraitSystem.get_trait_name(trait) for trait in self.traits]
+        return list(self.trait_profile.trait_names)
 
     def use_item(self, item_id: str) -> bool:
         """使用物品"""
@@ -95,43 +252,59 @@ class Character:
             return False
 
         # 获取物品效果
-        for stack in self.inventory.items:
-            if stack.item.item_id == item_id:
-                effects = stack.item.effects
-                
-                # 应用效果
-                if "fatigue" in effects:
-                    self.fatigue = min(100, self.fatigue + effects["fatigue"])
-                if "hunger" in effects:
-                    self.hunger = min(100, self.hunger + effects["hunger"])
-                if "mood" in effects:
-                    self.mood = min(100, self.mood + effects["mood"])
-                
-                # 移除使用的物品
-                self.inventory.remove_item(item_id, 1)
-                return True
-
-        return False
-
-    def get_status_dict(self) -> dict:
-        """获取角色状态数据"""
-        return {
+        effects = self.inventory.get_stacks(item_id)[0].item.effects
+
+        # 应用效果
+        if "fatigue" in effects:
+            self.fatigue = min(100, self.fatigue + effects["fatigue"])
+        if "hunger" in effects:
+            self.hunger = min(100, self.hunger + effects["hunger"])
+        if "mood" in effects:
+            self.mood = min(100, self.mood + effects["mood"])
+
+        # 移除使用的物品
+        self.inventory.remove_item(item_id, 1)
+        return True
+
+    @property
+    def version(self) -> tuple:
+        """状态版本（角色自身版本、背包版本和绑定引擎中该行的版本），任何影响状态数据的修改都会使其变化"""
+        if self._scheduler is not None:
+            self._scheduler.sync(self._row)
+        engine_version = self._engine.row_version[self._row].item() if self._engine is not None else 0
+        return self._version, self.inventory.version, engine_version
+
+    def get_status_dict(self, normalized: bool = False) -> dict:
+        """
+        获取角色状态数据（版本不变时返回缓存的同一个字典，调用方不应修改）
+
+        normalized 为 True 时背包堆叠只包含物品ID和数量，物品定义见物品目录
+        """
+        version = self.version
+        cached = self._status_cache.get(normalized)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        profile = self.trait_profile
+        status = {
             "id": self.id,
             "name": self.name,
             "gender": self.gender.value,
             "age_years": self.age_years,
             "age_days": self.age_days,
             "age_string": f"{self.age_years}岁+{self.age_days}天",
-            "traits": [trait.value for trait in self.traits],
-            "trait_names": self.get_trait_names(),
+            "traits": profile.trait_values,
+            "trait_names": profile.trait_names,
             "fatigue": round(self.fatigue, 1),
             "hunger": round(self.hunger, 1),
             "mood": round(self.mood, 1),
             "current_action": self.current_action.value,
             "action_duration": self.action_duration,
             "status_text": self._get_status_text(),
-            "inventory": self.inventory.get_dict()
+            "inventory": self.inventory.get_dict(normalized)
         }
+        self._status_cache[normalized] = (version, status)
+        return status
 
     def _get_status_text(self) -> str:
         """获取状态描述"""
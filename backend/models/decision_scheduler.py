@@ -0,0 +1,269 @@
+"""事件驱动决策调度模块 - 只唤醒到达决策阈值或产出时刻的角色"""
+import heapq
+from collections import Counter
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from .enums import ActionType
+from .action_system import ActionSystem
+from .trait_system import TraitSystem
+from .work_system import WorkSystem
+from .labor_allocator import LaborAllocator
+
+if TYPE_CHECKING:
+    from .character import Character
+    from .production import ProductionBatch
+
+
+class DecisionScheduler:
+    """
+    事件驱动决策调度器
+
+    休息、娱乐、劳动期间的状态按 ActionSystem 分派表中的固定速率变化，因此可以预先算出角色下一次触发
+    ActionSystem.auto_assign_action 中阈值（疲劳≥90、饥饿<40 等）或劳动产出的小时。
+    调度器用优先队列只在这些小时唤醒角色执行完整的决策和状态更新；休眠期间的状态不逐小时写回，
+    而是在读取角色属性时按相同的算术逐小时补算，结果与逐对象路径完全一致。
+    进食（消耗背包）和劳动产出（随机数）总是唤醒执行，且按角色原始顺序处理以保持随机数序列。
+    启用全局劳动分配（batched_labor）时劳动类型每小时由分配器决定，劳动中的角色每个 tick 都被唤醒。
+    """
+
+    # 推进劳动进度的行动（分派表中处理函数为 advance_work_progress）
+    LABOR_ACTIONS = tuple(
+        action for action, effect in ActionSystem.ACTION_EFFECTS.items()
+        if effect.get("handler") == "advance_work_progress"
+    )
+    STATS = ("fatigue", "hunger", "mood")  # 推算状态中属性的顺序
+    MAX_LOOKAHEAD = 72  # 单次最多向前预测的小时数，超过后到期唤醒重新预测
+
+    def __init__(
+        self,
+        characters: List["Character"],
+        batched_labor: bool = False,
+        production: Optional["ProductionBatch"] = None
+    ):
+        self.characters = list(characters)
+        self.batched_labor = batched_labor
+        self.production = production  # 劳动产出批次（在重新预测唤醒时刻前提交）
+        count = len(self.characters)
+
+        self.hour = 0  # 已执行的 tick 数
+        self._synced = [0] * count  # 每个角色状态已补算到的 tick
+        self._wake = [0] * count    # 每个角色的下一次唤醒 tick
+        self._wake_state: List[Optional[tuple]] = [None] * count  # 唤醒时刻的预测状态
+        self._rates = [self._compile_rates(character) for character in self.characters]
+        self._queue: List[Tuple[int, int]] = [(0, row) for row in range(count)]
+        self._due: Optional[List[int]] = None  # 本 tick 已出队的到期角色（prepare_tick 之后）
+
+        # 统计数据（当前行动分布、最近一个 tick 唤醒和饥饿归零的角色数）
+        self.action_counts: Counter = Counter(character.current_action for character in self.characters)
+        self.last_woken = 0
+        self.last_starving = 0
+
+        for row, character in enumerate(self.characters):
+            character.bind_scheduler(self, row)
+
+    @classmethod
+    def _compile_rates(cls, character: "Character") -> tuple:
+        """
+        预计算角色每小时的状态变化量
+
+        返回: (行动类型 → ((属性序号, 变化值, 是否为恢复), ...), 低需求心情惩罚, 劳动进度增量)，
+        行动的状态变化来自 ActionSystem.get_action_deltas，与逐对象路径和 NeedsEngine 使用同一张分派表
+        """
+        deltas = {
+            action: tuple((cls.STATS.index(stat), delta, recovery)
+                          for stat, delta, recovery in ActionSystem.get_action_deltas(character, action))
+            for action in ActionSystem.ACTION_EFFECTS
+        }
+        return (
+            deltas,
+            TraitSystem.apply_mood_change(character, -2, is_consumption=True),
+            1 * character.trait_profile.work_progress,
+        )
+
+    def refresh_rates(self, character: "Character"):
+        """角色特质变化后重新计算其变化量（休眠期间的变化先按原变化量补算），并在下一个 tick 唤醒"""
+        row = character._row
+        self.sync(row)
+        self._rates[row] = self._compile_rates(character)
+        self.wake(row)
+
+    # ==================== 休眠期推算 ====================
+
+    def _advance(self, rates: tuple, action: ActionType, state: tuple) -> tuple:
+        """
+        按 ActionSystem.apply_action_effects 和 Character.update_status 的算术推进一小时（不产出、不进食）
+
+        state: (疲劳, 饥饿, 心情, 行动持续时间, 当前劳动进度)
+        """
+        deltas, mood_penalty, progress_increment = rates
+        values = list(state[:3])
+        duration, progress = state[3], state[4]
+
+        for index, delta, recovery in deltas.get(action, ()):
+            if recovery:
+                values[index] = min(100, values[index] + delta)
+            else:
+                values[index] = max(0, values[index] + delta)
+        fatigue, hunger, mood = values
+        if action in self.LABOR_ACTIONS:
+            progress = progress + progress_increment
+
+        if hunger < 30:
+            mood = max(0, mood + mood_penalty)
+        if fatigue < 30:
+            mood = max(0, mood + mood_penalty)
+        return fatigue, hunger, mood, duration + 1, progress
+
+    def _quiet_step(self, rates: tuple, action: ActionType, preferred: Optional[ActionType], state: tuple) -> Optional[tuple]:
+        """如果从 state 开始的这一小时决策不变且没有副作用，返回一小时后的状态，否则返回 None"""
+        fatigue, hunger, mood, _, progress = state
+
+        if action == ActionType.REST:
+            # 休息持续到疲劳恢复到 90
+            if fatigue >= 90:
+                return None
+        elif action == ActionType.ENTERTAINMENT:
+            # 不饿、不累且心情仍低于 50 时继续娱乐
+            if hunger < 40 or fatigue < 40 or mood >= 50:
+                return None
+        elif action in self.LABOR_ACTIONS:
+            # 状态良好、劳动选择不变且本小时不会产出时继续劳动
+            if hunger <= 60 or fatigue <= 60 or mood < 50 or preferred != action:
+                return None
+            if progress + rates[2] >= 4:
+                return None
+        else:
+            return None
+
+        next_state = self._advance(rates, action, state)
+        # 饥饿归零的小时需要唤醒，以便统计
+        if next_state[1] <= 0:
+            return None
+        return next_state
+
+    def _get_state(self, character: "Character") -> tuple:
+        """读取角色当前状态（不触发补算）"""
+        action = character._current_action
+        progress = character._work_progress[action] if action in self.LABOR_ACTIONS else 0
+        return character._fatigue, character._hunger, character._mood, character._action_duration, progress
+
+    def _set_state(self, character: "Character", state: tuple):
+        """写回角色状态（不触发补算）"""
+        character._fatigue, character._hunger, character._mood, character._action_duration, progress = state
+        character._version += 1
+        action = character._current_action
+        if action in self.LABOR_ACTIONS:
+            character._work_progress[action] = progress
+
+    def sync(self, row: int):
+        """把角色状态补算到当前 tick（休眠期间的每小时变化）"""
+        target = self.hour
+        synced = self._synced[row]
+        if synced >= target:
+            return
+
+        character = self.characters[row]
+        if target == self._wake[row] and self._wake_state[row] is not None:
+            state = self._wake_state[row]
+        else:
+            action = character._current_action
+            rates = self._rates[row]
+            state = self._get_state(character)
+            for _ in range(target - synced):
+                state = self._advance(rates, action, state)
+        self._set_state(character, state)
+        self._synced[row] = target
+
+    def _schedule(self, row: int):
+        """预测角色下一次需要唤醒的 tick 并加入队列"""
+        character = self.characters[row]
+        action = character._current_action
+        preferred = None
+        if action in self.LABOR_ACTIONS and not self.batched_labor:
+            preferred = WorkSystem.get_preferred_work_action(character)
+        rates = self._rates[row]
+        state = self._get_state(character)
+
+        start = self._synced[row]
+        wake = start
+        while wake < start + self.MAX_LOOKAHEAD:
+            next_state = self._quiet_step(rates, action, preferred, state)
+            if next_state is None:
+                break
+            state = next_state
+            wake += 1
+
+        self._wake[row] = wake
+        self._wake_state[row] = state if wake > start else None
+        heapq.heappush(self._queue, (wake, row))
+
+    def wake(self, row: int):
+        """在下一个 tick 唤醒角色（角色被外部修改时调用）"""
+        self.sync(row)
+        if self._wake[row] > self.hour:
+            self._wake[row] = self.hour
+            self._wake_state[row] = None
+            heapq.heappush(self._queue, (self.hour, row))
+
+    # ==================== 推进 ====================
+
+    def prepare_tick(self) -> List[int]:
+        """取出本 tick 到期的角色（按角色顺序）并把它们的状态补算到当前 tick"""
+        if self._due is not None:
+            return self._due
+        hour = self.hour
+        queue = self._queue
+        due = []
+        while queue and queue[0][0] <= hour:
+            wake, row = heapq.heappop(queue)
+            # 跳过已被重新调度的过期条目
+            if self._wake[row] == wake:
+                self._wake[row] = -1
+                due.append(row)
+        due.sort()
+        for row in due:
+            self.sync(row)
+        self._due = due
+        return due
+
+    def labor_candidates(self) -> List["Character"]:
+        """本小时会劳动的角色（休眠中的角色处于休息或娱乐，不会进入劳动分支）"""
+        return LaborAllocator.select_candidates(self.characters[row] for row in self.prepare_tick())
+
+    def tick(self):
+        """执行一个小时：按角色顺序唤醒到期角色执行决策和状态更新"""
+        hour = self.hour
+        due = self.prepare_tick()
+        self._due = None
+
+        starving = 0
+        for row in due:
+            character = self.characters[row]
+            old_action = character._current_action
+            character.auto_assign_action()
+            character.update_status()
+            self._synced[row] = hour + 1
+
+            new_action = character._current_action
+            if new_action != old_action:
+                self.action_counts[old_action] -= 1
+                self.action_counts[new_action] += 1
+            if character._hunger <= 0:
+                starving += 1
+
+        # 产出入库会改变背包和劳动选择，必须在预测下一次唤醒前提交
+        if self.production is not None:
+            self.production.commit()
+
+        self.hour = hour + 1
+        for row in due:
+            self._schedule(row)
+
+        self.last_woken = len(due)
+        self.last_starving = starving
+
+    def detach(self):
+        """把所有角色状态补算到当前 tick 并解除绑定"""
+        for row, character in enumerate(self.characters):
+            self.sync(row)
+            character.unbind_scheduler()
+        self.characters = []
@@ -1,143 +1,135 @@
 """食物系统模块 - 负责角色进食相关逻辑"""
+import logging
+from functools import lru_cache
 from typing import TYPE_CHECKING, List, Tuple, Optional
+from game_logging import get_logger
 from .item import ItemCategory
 
 if TYPE_CHECKING:
     from .character import Character
 
+logger = get_logger("food")
+
 
 class FoodSystem:
     """食物系统 - 处理角色的进食和食物选择"""
 
+    # 饥饿缺口量化精度（每单位 0.1）和选择结果缓存容量（LRU）
+    GAP_QUANTUM = 10
+    SELECTION_CACHE_SIZE = 4096
+
     @staticmethod
     def has_any_food(character: "Character") -> bool:
         """检查角色是否有任何食物"""
-        for stack in character.inventory.items:
-            if stack.item.category == ItemCategory.FOOD:
-                hunger_recovery = stack.item.effects.get("hunger", 0)
-                if hunger_recovery > 0:
-                    return True
+        for item in character.inventory.get_category_items(ItemCategory.FOOD):
+            if item.effects.get("hunger", 0) > 0:
+                return True
         return False
 
     @staticmethod
     def get_all_foods(character: "Character") -> List[dict]:
         """获取背包中所有食物及其恢复值"""
         foods = []
-        for stack in character.inventory.items:
-            if stack.item.category == ItemCategory.FOOD:
-                hunger_recovery = stack.item.effects.get("hunger", 0)
-                if hunger_recovery > 0:
-                    foods.append({
-                        "item_id": stack.item.item_id,
-                        "name": stack.item.name,
-                        "quantity": stack.quantity,
-                        "recovery_per_unit": hunger_recovery,
-                        "total_recovery": hunger_recovery * stack.quantity
-                    })
+        for stack in character.inventory.get_category_stacks(ItemCategory.FOOD):
+            hunger_recovery = stack.item.effects.get("hunger", 0)
+            if hunger_recovery > 0:
+                foods.append({
+                    "item_id": stack.item.item_id,
+                    "name": stack.item.name,
+                    "quantity": stack.quantity,
+                    "recovery_per_unit": hunger_recovery,
+                    "total_recovery": hunger_recovery * stack.quantity
+                })
         return foods
 
+    @staticmethod
+    def get_food_signature(character: "Character") -> Tuple[Tuple[str, int, int], ...]:
+        """获取背包食物组合签名 ((物品ID, 每个恢复值, 总数量), ...)，按物品ID排序"""
+        inventory = character.inventory
+        foods = []
+        for item in inventory.get_category_items(ItemCategory.FOOD):
+            hunger_recovery = item.effects.get("hunger", 0)
+            if hunger_recovery > 0:
+                foods.append((item.item_id, hunger_recovery, inventory.get_item_count(item.item_id)))
+        foods.sort()
+        return tuple(foods)
+
     @staticmethod
     def select_food_to_eat(character: "Character", hunger_gap: float) -> Optional[List[Tuple[str, int, float]]]:
         """
-        智能选择食物来恢复饥饿度
+        选择食物来恢复饥饿度（使恢复量最接近饥饿缺口）
         
         参数:
             character: 角色对象
             hunger_gap: 饥饿缺口 (100 - current_hunger)
         
         返回:
-            list[(item_id, quantity, recovery)]: 选中的食物列表
+            list[(item_id, quantity, recovery)]: 选中的食物列表（recovery 为特质修正前的恢复值），
+            吃任何食物都比不吃更偏离缺口时为空列表
             或 None: 如果没有食物
         """
-        # 获取所有食物
-        foods = FoodSystem.get_all_foods(character)
-        
+        foods = FoodSystem.get_food_signature(character)
         if not foods:
             return None
-        
-        print(f"[食物系统] {character.name} - 饥饿缺口: {hunger_gap:.1f}")
-        print(f"[食物系统] {character.name} - 背包食物:")
-        for food in foods:
-            print(f"  - {food['name']} x{food['quantity']} (每个恢复{food['recovery_per_unit']})")
-        
-        # 使用贪心算法选择食物
-        selected = FoodSystem._greedy_select(foods, hunger_gap)
-        
-        if selected:
-            total_recovery = sum(recovery for _, _, recovery in selected)
-            print(f"[食物系统] {character.name} - 选择策略: 总恢复 {total_recovery:.1f} (缺口 {hunger_gap:.1f})")
-            for item_id, quantity, recovery in selected:
-                food_name = next(f['name'] for f in foods if f['item_id'] == item_id)
-                print(f"  → {food_name} x{quantity} (恢复 {recovery:.1f})")
-        
-        return selected
+
+        # 缺口量化到 0.1，相同的食物组合、缺口和好胃口修正共享缓存结果
+        gap_key = round(hunger_gap * FoodSystem.GAP_QUANTUM)
+        appetite = character.trait_profile.hunger_recovery
+        # 超出搜索上限的数量用不到，截断后作为签名可提高缓存命中率
+        limit = FoodSystem._search_limit(foods, gap_key, appetite)
+        capped = tuple((item_id, per_unit, min(quantity, limit // per_unit)) for item_id, per_unit, quantity in foods)
+        selected = FoodSystem._solve_selection(capped, gap_key, appetite)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[食物系统] %s - 饥饿缺口: %.1f", character.name, hunger_gap)
+            logger.debug("[食物系统] %s - 背包食物:", character.name)
+            for item_id, per_unit, quantity in foods:
+                logger.debug("  - %s x%s (每个恢复%s)", item_id, quantity, per_unit)
+            if selected:
+                total_recovery = sum(recovery for _, _, recovery in selected) * appetite
+                logger.debug("[食物系统] %s - 选择策略: 总恢复 %.1f (缺口 %.1f)", character.name, total_recovery, hunger_gap)
+                for item_id, quantity, recovery in selected:
+                    logger.debug("  → %s x%s (恢复 %.1f)", item_id, quantity, recovery)
+
+        return list(selected)
+
+    @staticmethod
+    def _search_limit(foods: Tuple[Tuple[str, int, int], ...], gap_key: int, appetite: float) -> int:
+        """最优组合总恢复值（修正前）的上限：目标加一个最大单位恢复值"""
+        return int(gap_key / FoodSystem.GAP_QUANTUM / appetite) + max(per_unit for _, per_unit, _ in foods)
 
     @staticmethod
-    def _greedy_select(foods: List[dict], hunger_gap: float) -> List[Tuple[str, int, float]]:
+    @lru_cache(maxsize=SELECTION_CACHE_SIZE)
+    def _solve_selection(foods: Tuple[Tuple[str, int, int], ...], gap_key: int, appetite: float) -> Tuple[Tuple[str, int, float], ...]:
         """
-        贪心算法选择食物
-        
-        策略:
-        1. 优先找单个食物恢复值接近缺口的（±20%容差）
-        2. 如果没有接近的，尝试多个食物组合
-        3. 如果所有食物总和不足，全部消耗
+        有界背包精确求解：在数量限制内选择食物，使修正后的总恢复最接近饥饿缺口
+
+        偏差相同时优先少吃（不超出缺口），再优先吃更少的个数。
+        超出缺口一个最大单位恢复值以上的组合去掉任意一个食物都更接近缺口，因此只需搜索到该上限。
         """
-        # 按单位恢复值排序（从大到小）
-        foods_sorted = sorted(foods, key=lambda x: x['recovery_per_unit'], reverse=True)
-        
-        # 策略1: 找单个食物接近缺口的
-        for food in foods_sorted:
-            per_unit = food['recovery_per_unit']
-            # 计算需要多少个才能接近缺口
-            needed = hunger_gap / per_unit
-            
-            # 如果1个就足够或接近（80%-120%范围内）
-            if 0.8 <= needed <= 1.2:
-                quantity = 1
-                recovery = per_unit * quantity
-                return [(food['item_id'], quantity, recovery)]
-            
-            # 如果需要多个，选择最接近的数量
-            if needed <= food['quantity']:
-                # 可以选择 floor(needed) 或 ceil(needed)，选择更接近的
-                import math
-                quantity_floor = math.floor(needed)
-                quantity_ceil = math.ceil(needed)
-                
-                # 选择恢复值更接近缺口的数量
-                if quantity_floor > 0:
-                    diff_floor = abs(per_unit * quantity_floor - hunger_gap)
-                    diff_ceil = abs(per_unit * quantity_ceil - hunger_gap)
-                    quantity = quantity_floor if diff_floor <= diff_ceil else quantity_ceil
-                else:
-                    quantity = quantity_ceil
-                
-                # 确保不超过拥有数量
-                quantity = min(quantity, food['quantity'])
-                recovery = per_unit * quantity
-                
-                # 如果这个选择能满足至少70%的缺口，接受它
-                if recovery >= hunger_gap * 0.7:
-                    return [(food['item_id'], quantity, recovery)]
-        
-        # 策略2: 组合多种食物
-        selected = []
-        remaining_gap = hunger_gap
-        
-        for food in foods_sorted:
-            if remaining_gap <= 0:
-                break
-            
-            per_unit = food['recovery_per_unit']
-            # 计算需要多少个
-            import math
-            needed = math.ceil(remaining_gap / per_unit)
-            quantity = min(needed, food['quantity'])
-            
-            if quantity > 0:
-                recovery = per_unit * quantity
-                selected.append((food['item_id'], quantity, recovery))
-                remaining_gap -= recovery
-        
-        return selected if selected else None
+        target = gap_key / FoodSystem.GAP_QUANTUM / appetite  # 以修正前恢复值计的目标
+        limit = FoodSystem._search_limit(foods, gap_key, appetite)
+
+        # best[总恢复] = (食物个数, 各食物数量)
+        best = {0: (0, (0,) * len(foods))}
+        for index, (_, per_unit, quantity) in enumerate(foods):
+            max_count = min(quantity, limit // per_unit)
+            for total, (count, counts) in list(best.items()):
+                for extra in range(1, max_count + 1):
+                    new_total = total + per_unit * extra
+                    if new_total > limit:
+                        break
+                    current = best.get(new_total)
+                    if current is None or count + extra < current[0]:
+                        new_counts = counts[:index] + (extra,) + counts[index + 1:]
+                        best[new_total] = (count + extra, new_counts)
 
+        total = min(best, key=lambda t: (abs(t - target), t > target, best[t][0]))
+        counts = best[total][1]
+        # 按单位恢复值从大到小输出
+        selected = [
+            (item_id, quantity, per_unit * quantity)
+            for (item_id, per_unit, _), quantity in zip(foods, counts) if quantity > 0
+        ]
+        selected.sort(key=lambda food: food[2] / food[1], reverse=True)
+        return tuple(selected)
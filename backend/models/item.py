@@ -1,5 +1,8 @@
+import hashlib
+import json
+from array import array
 from enum import Enum
-from typing import Optional
+from typing import Optional, Union
 
 
 class ItemCategory(str, Enum):
@@ -46,9 +49,16 @@ class Item:
         self.weight = weight           # 重量
         self.value = value             # 价值
         self.effects = effects or {}   # 物品效果（如恢复值等）
+        self._dict = None              # 缓存的物品数据字典（物品定义创建后不再修改）
 
     def get_dict(self) -> dict:
-        """获取物品数据字典"""
+        """获取物品数据字典（缓存，调用方不应修改）"""
+        if self._dict is None:
+            self._dict = self._build_dict()
+        return self._dict
+
+    def _build_dict(self) -> dict:
+        """构建物品数据字典"""
         return {
             "item_id": self.item_id,
             "name": self.name,
@@ -68,6 +78,7 @@ class ItemStack:
     def __init__(self, item: Item, quantity: int = 1):
         self.item = item
         self.quantity = min(quantity, item.max_stack if item.stackable else 1)
+        self.order = 0  # 在所属背包中的放入序号（背包内堆叠按序号排列）
 
     def add(self, amount: int) -> int:
         """添加数量，返回无法添加的剩余数量"""
@@ -82,82 +93,460 @@ class ItemStack:
         self.quantity -= actual_remove
         return actual_remove
 
-    def get_dict(self) -> dict:
-        """获取物品堆叠数据"""
+    def get_dict(self, normalized: bool = False) -> dict:
+        """获取物品堆叠数据（normalized 时只包含物品ID，物品定义见物品目录）"""
+        if normalized:
+            return {"item_id": self.item.item_id, "quantity": self.quantity}
         return {
             "item": self.item.get_dict(),
             "quantity": self.quantity
         }
 
 
+# 物品序号登记表（按物品ID登记，进程内全局共享；紧凑背包只存储物品序号，背包的物品位掩码按序号置位）
+_ITEM_ORDINALS: dict[str, int] = {}
+_ITEMS_BY_ORDINAL: list[Optional[Item]] = []
+
+
+def get_item_id_ordinal(item_id: str) -> int:
+    """获取物品ID的序号（首次出现时登记）"""
+    ordinal = _ITEM_ORDINALS.get(item_id)
+    if ordinal is None:
+        ordinal = len(_ITEMS_BY_ORDINAL)
+        _ITEM_ORDINALS[item_id] = ordinal
+        _ITEMS_BY_ORDINAL.append(None)
+    return ordinal
+
+
+def get_item_ordinal(item: Item) -> int:
+    """获取物品的序号（首次出现时登记）"""
+    ordinal = get_item_id_ordinal(item.item_id)
+    if _ITEMS_BY_ORDINAL[ordinal] is None:
+        _ITEMS_BY_ORDINAL[ordinal] = item
+    return ordinal
+
+
+def get_item_bit(item_id: str) -> int:
+    """获取物品在背包物品位掩码中的位"""
+    return 1 << get_item_id_ordinal(item_id)
+
+
 class Inventory:
-    """背包/仓库类"""
+    """
+    背包/仓库类
+
+    除有序的堆叠列表 items 外，还维护 物品ID → 堆叠列表/总数量 和 类别 → 物品ID 两个索引，
+    以及按物品序号置位的物品位掩码 item_mask（如是否持有斧头、镐子），
+    数量查询、类别查询和持有检查与背包大小无关。堆叠只能通过 Inventory 的方法修改，以保持索引一致。
+    """
     def __init__(self, max_slots: int = 30):
         self.max_slots = max_slots
         self.items: list[ItemStack] = []
+        self._stacks: dict[str, list[ItemStack]] = {}           # 物品ID → 堆叠（按背包顺序）
+        self._counts: dict[str, int] = {}                       # 物品ID → 总数量
+        self._categories: dict[ItemCategory, dict[str, None]] = {}  # 类别 → 物品ID（按首次放入顺序）
+        self._next_order = 0                                    # 下一个堆叠的放入序号
+        self.item_mask = 0                                      # 持有物品的位掩码（见 get_item_bit）
+        self.version = 0          # 内容版本号（每次添加/移除递增）
+        self._dict_cache = {}     # 序列化模式 → (版本, 背包数据)
+
+    def __setstate__(self, state):
+        # 物品序号只在本进程有效，反序列化后重新计算物品位掩码
+        self.__dict__.update(state)
+        self.item_mask = 0
+        for item_id in self._stacks:
+            self.item_mask |= get_item_bit(item_id)
+
+    def _add_stack(self, stack: ItemStack):
+        """追加新堆叠并登记索引"""
+        item = stack.item
+        stack.order = self._next_order
+        self._next_order += 1
+        self.items.append(stack)
+        stacks = self._stacks.get(item.item_id)
+        if stacks is None:
+            self._stacks[item.item_id] = [stack]
+            self._counts[item.item_id] = 0
+            self._categories.setdefault(item.category, {})[item.item_id] = None
+            self.item_mask |= get_item_bit(item.item_id)
+        else:
+            stacks.append(stack)
+        self._counts[item.item_id] += stack.quantity
+
+    def _remove_stack(self, stack: ItemStack):
+        """移除空堆叠并更新索引"""
+        item = stack.item
+        self.items.remove(stack)
+        stacks = self._stacks[item.item_id]
+        stacks.remove(stack)
+        if not stacks:
+            del self._stacks[item.item_id]
+            del self._counts[item.item_id]
+            item_ids = self._categories[item.category]
+            del item_ids[item.item_id]
+            if not item_ids:
+                del self._categories[item.category]
+            self.item_mask &= ~get_item_bit(item.item_id)
 
     def add_item(self, item: Item, quantity: int = 1) -> bool:
         """添加物品到背包"""
+        self.version += 1
         remaining = quantity
 
         # 如果物品可堆叠，先尝试添加到已有的堆叠中
         if item.stackable:
-            for stack in self.items:
-                if stack.item.item_id == item.item_id:
-                    remaining = stack.add(remaining)
+            for stack in self._stacks.get(item.item_id, ()):
+                before = remaining
+                remaining = stack.add(remaining)
+                self._counts[item.item_id] += before - remaining
+                if remaining == 0:
+                    return True
+
+        # 如果还有剩余，创建新的堆叠
+        while remaining > 0 and len(self.items) < self.max_slots:
+            new_stack_amount = min(remaining, item.max_stack)
+            self._add_stack(ItemStack(item, new_stack_amount))
+            remaining -= new_stack_amount
+
+        return remaining == 0
+
+    def remove_item(self, item_id: str, quantity: int = 1) -> bool:
+        """从背包移除物品"""
+        self.version += 1
+        remaining = quantity
+
+        # 从后往前遍历，方便删除空堆叠
+        for stack in reversed(list(self._stacks.get(item_id, ()))):
+            removed = stack.remove(remaining)
+            remaining -= removed
+            self._counts[item_id] -= removed
+
+            # 如果堆叠为空，移除它
+            if stack.quantity == 0:
+                self._remove_stack(stack)
+
+            if remaining == 0:
+                return True
+
+        return remaining == 0
+
+    def get_item_count(self, item_id: str) -> int:
+        """获取指定物品的总数量"""
+        return self._counts.get(item_id, 0)
+
+    def has_item(self, item_id: str, quantity: int = 1) -> bool:
+        """检查是否拥有足够数量的物品"""
+        return self._counts.get(item_id, 0) >= quantity
+
+    def get_stacks(self, item_id: str) -> list[ItemStack]:
+        """获取指定物品的所有堆叠（按背包顺序，只读）"""
+        return self._stacks.get(item_id, [])
+
+    def get_category_stacks(self, category: ItemCategory) -> list[ItemStack]:
+        """获取某类别物品的所有堆叠（按背包顺序）"""
+        item_ids = self._categories.get(category)
+        if not item_ids:
+            return []
+        stacks = [stack for item_id in item_ids for stack in self._stacks[item_id]]
+        if len(item_ids) > 1:
+            stacks.sort(key=lambda stack: stack.order)
+        return stacks
+
+    def get_category_items(self, category: ItemCategory) -> list[Item]:
+        """获取背包中某类别的所有物品种类"""
+        return [self._stacks[item_id][0].item for item_id in self._categories.get(category, ())]
+
+    def get_slots(self) -> list[list]:
+        """获取各格子内容的副本 [[物品, 数量], ...]（按背包顺序，用于转移前的容量校验）"""
+        return [[stack.item, stack.quantity] for stack in self.items]
+
+    def get_all_items(self, normalized: bool = False) -> list[dict]:
+        """获取所有物品数据"""
+        return [stack.get_dict(normalized) for stack in self.items]
+
+    def get_dict(self, normalized: bool = False) -> dict:
+        """获取背包数据（版本不变时返回缓存的同一个字典，调用方不应修改）"""
+        cached = self._dict_cache.get(normalized)
+        if cached is None or cached[0] != self.version:
+            cached = (self.version, {
+                "max_slots": self.max_slots,
+                "used_slots": len(self.items),
+                "items": self.get_all_items(normalized)
+            })
+            self._dict_cache[normalized] = cached
+        return cached[1]
+
+
+class CompactInventory:
+    """
+    紧凑背包/仓库类 - 与 Inventory 接口和堆叠规则相同
+
+    每个格子只以 (物品序号, 数量) 存放在两个类型化数组中，不为格子创建 ItemStack 对象，
+    大量角色时显著减少对象数量和 GC 压力。items / get_stacks 等返回的堆叠是按需生成的只读快照。
+    """
+    __slots__ = ("max_slots", "_ordinals", "_quantities", "_counts", "item_mask", "version", "_dict_cache")
+
+    def __init__(self, max_slots: int = 30):
+        self.max_slots = max_slots
+        self._ordinals = array("H")    # 每格的物品序号
+        self._quantities = array("I")  # 每格的数量
+        self._counts: dict[int, int] = {}  # 物品序号 → 总数量
+        self.item_mask = 0                 # 持有物品的位掩码（见 get_item_bit）
+        self.version = 0          # 内容版本号（每次添加/移除递增）
+        self._dict_cache = {}     # 序列化模式 → (版本, 背包数据)
+
+    def __getstate__(self):
+        # 序号只在本进程有效，序列化时换成物品对象
+        items = [_ITEMS_BY_ORDINAL[ordinal] for ordinal in self._ordinals]
+        return self.max_slots, items, list(self._quantities), self.version
+
+    def __setstate__(self, state):
+        max_slots, items, quantities, version = state
+        self.__init__(max_slots)
+        self.version = version
+        for item, quantity in zip(items, quantities):
+            ordinal = get_item_ordinal(item)
+            self._ordinals.append(ordinal)
+            self._quantities.append(quantity)
+            self._counts[ordinal] = self._counts.get(ordinal, 0) + quantity
+            self.item_mask |= 1 << ordinal
+
+    @property
+    def items(self) -> list[ItemStack]:
+        """所有格子的堆叠快照（按背包顺序）"""
+        return [self._make_stack(slot) for slot in range(len(self._ordinals))]
+
+    def _make_stack(self, slot: int) -> ItemStack:
+        """生成格子的堆叠快照"""
+        stack = ItemStack(_ITEMS_BY_ORDINAL[self._ordinals[slot]], self._quantities[slot])
+        stack.order = slot
+        return stack
+
+    def add_item(self, item: Item, quantity: int = 1) -> bool:
+        """添加物品到背包"""
+        self.version += 1
+        ordinal = get_item_ordinal(item)
+        ordinals, quantities = self._ordinals, self._quantities
+        remaining = quantity
+
+        # 如果物品可堆叠，先尝试添加到已有的堆叠中
+        if item.stackable and ordinal in self._counts:
+            for slot in range(len(ordinals)):
+                if ordinals[slot] == ordinal:
+                    actual_add = min(remaining, item.max_stack - quantities[slot])
+                    quantities[slot] += actual_add
+                    self._counts[ordinal] += actual_add
+                    remaining -= actual_add
                     if remaining == 0:
                         return True
 
         # 如果还有剩余，创建新的堆叠
-        while remaining > 0 and len(self.items) < self.max_slots:
+        while remaining > 0 and len(ordinals) < self.max_slots:
             new_stack_amount = min(remaining, item.max_stack)
-            self.items.append(ItemStack(item, new_stack_amount))
+            stored = min(new_stack_amount, item.max_stack if item.stackable else 1)
+            ordinals.append(ordinal)
+            quantities.append(stored)
+            self._counts[ordinal] = self._counts.get(ordinal, 0) + stored
+            self.item_mask |= 1 << ordinal
             remaining -= new_stack_amount
 
         return remaining == 0
 
     def remove_item(self, item_id: str, quantity: int = 1) -> bool:
         """从背包移除物品"""
+        self.version += 1
         remaining = quantity
+        ordinal = _ITEM_ORDINALS.get(item_id)
+        if ordinal is None or ordinal not in self._counts:
+            return remaining == 0
 
+        ordinals, quantities = self._ordinals, self._quantities
         # 从后往前遍历，方便删除空堆叠
-        for i in range(len(self.items) - 1, -1, -1):
-            if self.items[i].item.item_id == item_id:
-                removed = self.items[i].remove(remaining)
+        for slot in range(len(ordinals) - 1, -1, -1):
+            if ordinals[slot] == ordinal:
+                removed = min(remaining, quantities[slot])
+                quantities[slot] -= removed
                 remaining -= removed
+                self._counts[ordinal] -= removed
 
                 # 如果堆叠为空，移除它
-                if self.items[i].quantity == 0:
-                    self.items.pop(i)
+                if quantities[slot] == 0:
+                    del ordinals[slot]
+                    del quantities[slot]
 
                 if remaining == 0:
-                    return True
+                    break
 
+        if self._counts[ordinal] == 0:
+            del self._counts[ordinal]
+            self.item_mask &= ~(1 << ordinal)
         return remaining == 0
 
     def get_item_count(self, item_id: str) -> int:
         """获取指定物品的总数量"""
-        total = 0
-        for stack in self.items:
-            if stack.item.item_id == item_id:
-                total += stack.quantity
-        return total
+        ordinal = _ITEM_ORDINALS.get(item_id)
+        if ordinal is None:
+            return 0
+        return self._counts.get(ordinal, 0)
 
     def has_item(self, item_id: str, quantity: int = 1) -> bool:
         """检查是否拥有足够数量的物品"""
         return self.get_item_count(item_id) >= quantity
 
-    def get_all_items(self) -> list[dict]:
+    def get_stacks(self, item_id: str) -> list[ItemStack]:
+        """获取指定物品的所有堆叠快照（按背包顺序）"""
+        ordinal = _ITEM_ORDINALS.get(item_id)
+        if ordinal is None or ordinal not in self._counts:
+            return []
+        return [self._make_stack(slot) for slot, value in enumerate(self._ordinals) if value == ordinal]
+
+    def get_category_stacks(self, category: ItemCategory) -> list[ItemStack]:
+        """获取某类别物品的所有堆叠快照（按背包顺序）"""
+        wanted = {ordinal for ordinal in self._counts if _ITEMS_BY_ORDINAL[ordinal].category == category}
+        if not wanted:
+            return []
+        return [self._make_stack(slot) for slot, value in enumerate(self._ordinals) if value in wanted]
+
+    def get_category_items(self, category: ItemCategory) -> list[Item]:
+        """获取背包中某类别的所有物品种类"""
+        items = [_ITEMS_BY_ORDINAL[ordinal] for ordinal in self._counts]
+        return [item for item in items if item.category == category]
+
+    def get_slots(self) -> list[list]:
+        """获取各格子内容的副本 [[物品, 数量], ...]（按背包顺序，用于转移前的容量校验）"""
+        return [[_ITEMS_BY_ORDINAL[ordinal], quantity] for ordinal, quantity in zip(self._ordinals, self._quantities)]
+
+    def get_all_items(self, normalized: bool = False) -> list[dict]:
         """获取所有物品数据"""
-        return [stack.get_dict() for stack in self.items]
-
-    def get_dict(self) -> dict:
-        """获取背包数据"""
-        return {
-            "max_slots": self.max_slots,
-            "used_slots": len(self.items),
-            "items": self.get_all_items()
-        }
+        if normalized:
+            return [
+                {"item_id": _ITEMS_BY_ORDINAL[ordinal].item_id, "quantity": quantity}
+                for ordinal, quantity in zip(self._ordinals, self._quantities)
+            ]
+        return [
+            {"item": _ITEMS_BY_ORDINAL[ordinal].get_dict(), "quantity": quantity}
+            for ordinal, quantity in zip(self._ordinals, self._quantities)
+        ]
+
+    def get_dict(self, normalized: bool = False) -> dict:
+        """获取背包数据（版本不变时返回缓存的同一个字典，调用方不应修改）"""
+        cached = self._dict_cache.get(normalized)
+        if cached is None or cached[0] != self.version:
+            cached = (self.version, {
+                "max_slots": self.max_slots,
+                "used_slots": len(self._ordinals),
+                "items": self.get_all_items(normalized)
+            })
+            self._dict_cache[normalized] = cached
+        return cached[1]
+
+
+class TransferError(Exception):
+    """批量转移校验失败（index 为失败的转移序号，reason 为 invalid、not_enough 或 full）"""
+
+    INVALID = "invalid"        # 数量为负
+    NOT_ENOUGH = "not_enough"  # 来源物品不足
+    FULL = "full"              # 目标空间不足
+
+    def __init__(self, index: int, reason: str):
+        super().__init__(f"转移 #{index} 失败: {reason}")
+        self.index = index
+        self.reason = reason
+
+
+class TransferMove:
+    """一次物品转移：从 source 移动 quantity 个 item 到 destination"""
+
+    def __init__(self, item: Item, quantity: int, source, destination):
+        self.item = item
+        self.quantity = quantity
+        self.source = source
+        self.destination = destination
+
+
+def _plan_remove(slots: list[list], item_id: str, quantity: int) -> bool:
+    """在格子副本上按 remove_item 的规则移除物品"""
+    remaining = quantity
+    for i in range(len(slots) - 1, -1, -1):
+        if slots[i][0].item_id == item_id:
+            removed = min(remaining, slots[i][1])
+            slots[i][1] -= removed
+            remaining -= removed
+            if slots[i][1] == 0:
+                slots.pop(i)
+            if remaining == 0:
+                return True
+    return remaining == 0
+
+
+def _plan_add(slots: list[list], max_slots: int, item: Item, quantity: int) -> bool:
+    """在格子副本上按 add_item 的规则添加物品"""
+    remaining = quantity
+    if item.stackable:
+        for slot in slots:
+            if slot[0].item_id == item.item_id:
+                actual_add = min(remaining, slot[0].max_stack - slot[1] if slot[0].stackable else 0)
+                slot[1] += actual_add
+                remaining -= actual_add
+                if remaining == 0:
+                    return True
+    while remaining > 0 and len(slots) < max_slots:
+        new_stack_amount = min(remaining, item.max_stack)
+        slots.append([item, min(new_stack_amount, item.max_stack if item.stackable else 1)])
+        remaining -= new_stack_amount
+    return remaining == 0
+
+
+def transfer_items(moves: list[TransferMove]):
+    """
+    事务性批量转移物品
+
+    先在所有相关背包的格子副本上按顺序模拟全部转移（与 remove_item/add_item 规则相同），
+    任何一步物品不足或空间不足时抛出 TransferError 且不修改任何背包；全部通过后再实际执行。
+    """
+    plans = {}
+    for index, move in enumerate(moves):
+        for inventory in (move.source, move.destination):
+            if id(inventory) not in plans:
+                plans[id(inventory)] = inventory.get_slots()
+        if move.quantity < 0:
+            raise TransferError(index, TransferError.INVALID)
+        if not _plan_remove(plans[id(move.source)], move.item.item_id, move.quantity):
+            raise TransferError(index, TransferError.NOT_ENOUGH)
+        if not _plan_add(plans[id(move.destination)], move.destination.max_slots, move.item, move.quantity):
+            raise TransferError(index, TransferError.FULL)
+
+    for move in moves:
+        move.source.remove_item(move.item.item_id, move.quantity)
+        move.destination.add_item(move.item, move.quantity)
+
+
+def build_item_catalog(all_items: dict[str, Item]) -> dict:
+    """
+    构建物品目录 {"version": 目录版本, "items": {物品ID: 物品数据}}
+
+    版本由目录内容计算，内容不变时版本不变，客户端可据此判断缓存的目录是否可用。
+    """
+    items = {item_id: item.get_dict() for item_id, item in all_items.items()}
+    encoded = json.dumps(items, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return {
+        "version": hashlib.sha1(encoded).hexdigest()[:12],
+        "items": items
+    }
+
+
+# 背包存储后端（object=每格一个 ItemStack 对象，compact=类型化数组）
+INVENTORY_BACKENDS = {
+    "object": Inventory,
+    "compact": CompactInventory,
+}
+
+
+def create_inventory(max_slots: int, backend: str = "object") -> Union[Inventory, CompactInventory]:
+    """按存储后端创建背包"""
+    if backend not in INVENTORY_BACKENDS:
+        raise ValueError(f"未知的背包存储后端: {backend}")
+    return INVENTORY_BACKENDS[backend](max_slots=max_slots)
 
 
 # 预定义一些物品
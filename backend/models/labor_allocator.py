@@ -0,0 +1,155 @@
+"""劳动分配模块 - 每个 tick 按全体角色的资源缺口批量分配劳动类型"""
+import logging
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+from game_logging import get_logger
+from .enums import ActionType
+from .work_system import WorkSystem
+
+if TYPE_CHECKING:
+    from .character import Character
+    from .item import Inventory
+
+logger = get_logger("work")
+
+
+class LaborAllocator:
+    """
+    全局劳动分配器
+
+    每个 tick 在决策前对所有将要劳动的角色（与 ActionSystem.auto_assign_action 的劳动分支条件相同）
+    统一分配一次劳动类型：先按全体角色背包和公共仓库的资源总量计算各资源与目标的缺口，
+    按缺口比例（最大余数法，受持有对应工具的人数限制）算出各劳动的名额，
+    再先保留已在从事该劳动的角色、后按角色顺序填满名额（需要工具的劳动先填充）。整体为 O(n log n)。
+    没有缺口或未分到名额的角色仍按 WorkSystem.choose_work_action 自行选择。
+    """
+
+    MODE_INDIVIDUAL = "individual"  # 每个角色按自己的背包独立选择劳动
+    MODE_COLONY = "colony"          # 按全体资源缺口批量分配劳动
+
+    # 进入劳动分支的条件（与 ActionSystem.auto_assign_action 一致）
+    REST_UNTIL = 90        # 休息中的角色疲劳恢复到该值前继续休息
+    MOOD_THRESHOLD = 50    # 心情低于该值时去娱乐
+    LABOR_THRESHOLD = 60   # 疲劳和饥饿都高于该值时可以劳动
+
+    def __init__(self, targets: Dict[str, int]):
+        self.targets = dict(targets)
+        # 最近一次分配的各劳动名额（统计用）
+        self.last_quotas: Dict[ActionType, int] = {}
+
+    @staticmethod
+    def is_eligible(character: "Character") -> bool:
+        """角色本小时的决策是否会进入劳动分支"""
+        fatigue = character.fatigue
+        if character.current_action == ActionType.REST and fatigue < LaborAllocator.REST_UNTIL:
+            return False
+        return (character.hunger > LaborAllocator.LABOR_THRESHOLD
+                and fatigue > LaborAllocator.LABOR_THRESHOLD
+                and character.mood >= LaborAllocator.MOOD_THRESHOLD)
+
+    @staticmethod
+    def select_candidates(characters: Iterable["Character"]) -> List["Character"]:
+        """按角色顺序筛选本小时会劳动的角色"""
+        return [character for character in characters if LaborAllocator.is_eligible(character)]
+
+    @staticmethod
+    def describe(candidates: List["Character"]) -> List[Tuple[int, ActionType]]:
+        """提取分配所需的角色信息：(背包物品位掩码, 当前行动)"""
+        return [(character.inventory.item_mask, character.current_action) for character in candidates]
+
+    @staticmethod
+    def count_resources(inventories: Iterable["Inventory"]) -> Counter:
+        """统计各劳动产出物在一组背包中的总数"""
+        stock = Counter()
+        resource_ids = [resource_id for _, _, resource_id, _ in WorkSystem._work_options]
+        for inventory in inventories:
+            for resource_id in resource_ids:
+                stock[resource_id] += inventory.get_item_count(resource_id)
+        return stock
+
+    @staticmethod
+    def apply(candidates: List["Character"], assignments: List[Optional[ActionType]]):
+        """把分配结果交给角色（在本小时的劳动决策中使用）"""
+        for character, assignment in zip(candidates, assignments):
+            character.labor_assignment = assignment
+
+    def assign(self, candidates: List["Character"], stock: Dict[str, int]):
+        """为一组候选角色分配劳动"""
+        self.apply(candidates, self.allocate(self.describe(candidates), stock))
+
+    def _compute_quotas(self, profiles: List[Tuple[int, ActionType]], stock: Dict[str, int]) -> List[int]:
+        """按资源缺口比例计算各劳动名额（最大余数法，名额不超过持有工具的人数）"""
+        options = WorkSystem._work_options
+        count = len(profiles)
+        needs = [max(0, self.targets.get(resource_id, 0) - stock.get(resource_id, 0))
+                 for _, _, resource_id, _ in options]
+        capacities = [
+            count if tool_bit == 0 else sum(1 for mask, _ in profiles if mask & tool_bit == tool_bit)
+            for _, tool_bit, _, _ in options
+        ]
+
+        quotas = [0] * len(options)
+        active = [index for index, need in enumerate(needs) if need > 0 and capacities[index] > 0]
+        remaining = count
+        while remaining > 0 and active:
+            total = sum(needs[index] for index in active)
+            shares = {index: remaining * needs[index] // total for index in active}
+            leftover = remaining - sum(shares.values())
+            # 余数按小数部分从大到小分配，相同时按劳动声明顺序
+            for index in sorted(active, key=lambda index: (-(remaining * needs[index] % total), index))[:leftover]:
+                shares[index] += 1
+
+            capped = False
+            for index in active:
+                granted = min(shares[index], capacities[index] - quotas[index])
+                quotas[index] += granted
+                remaining -= granted
+                capped = capped or granted < shares[index]
+            # 有劳动受工具人数限制时，把多出的名额按缺口重新分给其余劳动
+            active = [index for index in active if quotas[index] < capacities[index]]
+            if not capped:
+                break
+        return quotas
+
+    def allocate(self, profiles: List[Tuple[int, ActionType]], stock: Dict[str, int]) -> List[Optional[ActionType]]:
+        """
+        计算劳动分配
+
+        参数:
+            profiles: 候选角色的 (背包物品位掩码, 当前行动)，按角色顺序
+            stock: 全体资源总量（物品ID → 数量）
+
+        返回:
+            list: 与 profiles 对应的劳动类型，None 表示由角色自行选择
+        """
+        options = WorkSystem._work_options
+        quotas = self._compute_quotas(profiles, stock)
+        self.last_quotas = {options[index][0]: quota for index, quota in enumerate(quotas)}
+
+        assignments: List[Optional[ActionType]] = [None] * len(profiles)
+        unassigned = set(range(len(profiles)))
+        remaining = list(quotas)
+        # 需要工具的劳动先填充，避免工具持有者被分去不需要工具的劳动
+        order = sorted(
+            (index for index, quota in enumerate(quotas) if quota > 0),
+            key=lambda index: (options[index][1] == 0, index)
+        )
+        # 第一轮只保留已在从事该劳动的角色，第二轮按角色顺序填满剩余名额
+        for keep_current in (True, False):
+            for index in order:
+                work_type, tool_bit = options[index][0], options[index][1]
+                if remaining[index] == 0:
+                    continue
+                pool = sorted(
+                    row for row in unassigned
+                    if profiles[row][0] & tool_bit == tool_bit and (not keep_current or profiles[row][1] == work_type)
+                )
+                for row in pool[:remaining[index]]:
+                    assignments[row] = work_type
+                    unassigned.discard(row)
+                remaining[index] -= min(len(pool), remaining[index])
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[劳动分配] 候选 %s 人，资源 %s，名额 %s", len(profiles), dict(stock),
+                         {work_type.value: quota for work_type, quota in self.last_quotas.items()})
+        return assignments
@@ -0,0 +1,140 @@
+"""数组化需求模拟引擎模块 - 以结构数组（NumPy）批量更新角色状态"""
+from typing import TYPE_CHECKING, List, Optional
+from .enums import ActionType
+from .action_system import ActionSystem
+from .labor_allocator import LaborAllocator
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖
+    np = None
+
+if TYPE_CHECKING:
+    from .character import Character
+    from .production import ProductionBatch
+
+
+class NeedsEngine:
+    """
+    需求模拟引擎 - 把所有角色的疲劳/饥饿/心情、当前行动和特质修正列保存在 NumPy 数组中
+
+    休息、娱乐、劳动的状态变化以及饥饿/疲劳过低的心情惩罚对所有角色一次性向量化计算；
+    进食（消耗背包）和劳动进度/产出仍逐个角色执行，顺序与逐对象路径一致，因此结果完全相同。
+    绑定后 Character 的状态属性成为数组对应行的视图。
+    """
+
+    ACTIONS: List[ActionType] = list(ActionType)
+    ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+    def __init__(self, characters: List["Character"], production: Optional["ProductionBatch"] = None):
+        if np is None:
+            raise RuntimeError("NeedsEngine 需要安装 numpy")
+
+        self.characters = list(characters)
+        self.production = production  # 劳动产出批次（每个 tick 结束时提交）
+        count = len(self.characters)
+
+        # 状态列
+        self.fatigue = np.empty(count, dtype=np.float64)
+        self.hunger = np.empty(count, dtype=np.float64)
+        self.mood = np.empty(count, dtype=np.float64)
+        self.action = np.empty(count, dtype=np.int8)
+        self.action_duration = np.empty(count, dtype=np.int64)
+
+        # 由 ActionSystem 分派表编译的每小时状态变化列：行动代码 → [(属性, 变化值列, 是否为恢复), ...]
+        self._delta_columns = {
+            self.ACTION_CODES[action]: [
+                (stat, np.zeros(count, dtype=np.float64), base > 0)
+                for stat, base, _ in effect["deltas"]
+            ]
+            for action, effect in ActionSystem.ACTION_EFFECTS.items()
+        }
+        # 带逐角色处理函数（进食、劳动进度）的行动代码
+        self._handler_codes = np.array(
+            [self.ACTION_CODES[action] for action in ActionSystem.ACTION_EFFECTS if ActionSystem.has_handler(action)],
+            dtype=np.int8
+        )
+        self.mood_consumption_mod = np.ones(count, dtype=np.float64)     # 心情惩罚（工作狂、坚韧）
+        self.row_version = np.zeros(count, dtype=np.int64)  # 每行在批量更新中状态实际变化的次数（角色状态版本的一部分）
+
+        for row, character in enumerate(self.characters):
+            self.fatigue[row] = character.fatigue
+            self.hunger[row] = character.hunger
+            self.mood[row] = character.mood
+            self.action[row] = self.ACTION_CODES[character.current_action]
+            self.action_duration[row] = character.action_duration
+            self._compile_modifiers(row, character)
+            character.bind_engine(self, row)
+
+    def _compile_modifiers(self, row: int, character: "Character"):
+        """从分派表和角色的特质档案读取该行的状态变化值与特质修正值"""
+        for action in ActionSystem.ACTION_EFFECTS:
+            columns = self._delta_columns[self.ACTION_CODES[action]]
+            for (_, column, _), (_, delta, _) in zip(columns, ActionSystem.get_action_deltas(character, action)):
+                column[row] = delta
+        self.mood_consumption_mod[row] = character.trait_profile.mood_consumption
+
+    def refresh_modifiers(self, character: "Character"):
+        """角色特质变化后重新计算其修正列"""
+        self._compile_modifiers(character._row, character)
+
+    def detach(self):
+        """解除所有角色的绑定，状态复制回角色对象"""
+        for character in self.characters:
+            character.unbind_engine()
+        self.characters = []
+
+    def labor_candidates(self) -> List["Character"]:
+        """向量化筛选本小时会劳动的角色（条件与 LaborAllocator.is_eligible 相同）"""
+        fatigue = self.fatigue
+        resting = (self.action == self.ACTION_CODES[ActionType.REST]) & (fatigue < LaborAllocator.REST_UNTIL)
+        eligible = (~resting & (self.hunger > LaborAllocator.LABOR_THRESHOLD)
+                    & (fatigue > LaborAllocator.LABOR_THRESHOLD) & (self.mood >= LaborAllocator.MOOD_THRESHOLD))
+        return [self.characters[row] for row in np.flatnonzero(eligible)]
+
+    def tick(self):
+        """执行一个小时：逐个角色决策行动，然后批量更新状态并提交劳动产出"""
+        for character in self.characters:
+            character.auto_assign_action()
+        self.update_status()
+        if self.production is not None:
+            self.production.commit()
+
+    def update_status(self):
+        """批量执行所有角色的每小时状态更新（等价于逐个调用 Character.update_status）"""
+        fatigue, hunger, mood = self.fatigue, self.hunger, self.mood
+        before = (fatigue.copy(), hunger.copy(), mood.copy(), self.action.copy(), self.action_duration.copy())
+        # 以更新开始时的行动划分角色（进食中途切换为休息的角色本小时不再享受休息效果）
+        action = self.action.copy()
+        columns = {"fatigue": fatigue, "hunger": hunger, "mood": mood}
+
+        # 休息、娱乐、劳动等行动的状态变化按分派表逐列向量化计算
+        for code, deltas in self._delta_columns.items():
+            mask = action == code
+            for stat, delta, recovery in deltas:
+                column = columns[stat]
+                if recovery:
+                    column[mask] = np.minimum(100, column[mask] + delta[mask])
+                else:
+                    column[mask] = np.maximum(0, column[mask] + delta[mask])
+
+        # 进食和劳动进度涉及背包与随机产出，按角色顺序逐个执行
+        for row in np.flatnonzero(np.isin(action, self._handler_codes)):
+            character = self.characters[row]
+            ActionSystem.apply_action_handler(character, self.ACTIONS[action[row]])
+
+        # 饥饿或疲劳过低时心情额外降低（工作狂、坚韧）
+        mood_penalty = -2 * self.mood_consumption_mod
+        low_hunger = hunger < 30
+        mood[low_hunger] = np.maximum(0, mood[low_hunger] + mood_penalty[low_hunger])
+        low_fatigue = fatigue < 30
+        mood[low_fatigue] = np.maximum(0, mood[low_fatigue] + mood_penalty[low_fatigue])
+
+        # 行动持续时间增加
+        self.action_duration += 1
+
+        # 只有状态实际变化的行更新版本，其余角色的状态数据缓存保持有效
+        changed = np.zeros(len(self.characters), dtype=bool)
+        for column, old in zip((fatigue, hunger, mood, self.action, self.action_duration), before):
+            changed |= column != old
+        self.row_version[changed] += 1
@@ -0,0 +1,114 @@
+"""劳动产出模块 - 收集一个 tick 内的劳动产出事件并在 tick 结束时统一入库"""
+import random
+from collections import Counter
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from .enums import ActionType
+from .work_system import WorkSystem
+
+if TYPE_CHECKING:
+    from .character import Character
+    from .item import Inventory
+
+
+class ProductionBatch:
+    """
+    劳动产出批次
+
+    tick 内角色劳动进度达到产出条件时只记录产出事件（WorkSystem.try_produce_items），
+    tick 结束时由 commit 统一处理：按劳动类型用独立的随机数生成器批量抽取产出数量，
+    再按记录顺序放入角色背包（auto_deposit 时直接放入公共仓库，仓库放不下再放入背包），
+    背包已满的处理和产出统计都集中在这里。
+    分片进程内自动入库的产出先记录到 shard_deposits，由主进程合并；仓库放不下的部分退回分片后
+    由 store_overflow 放入角色背包。
+    """
+
+    def __init__(
+        self,
+        rng: Optional[random.Random] = None,
+        auto_deposit: bool = False,
+        public_storage: Optional["Inventory"] = None
+    ):
+        self.rng = rng if rng is not None else random.Random()
+        self.auto_deposit = auto_deposit
+        self.public_storage = public_storage
+        # 分片进程内不能直接访问公共仓库，自动入库的产出记录到该列表 (角色ID, 物品ID, 数量, 可部分入库)，由主进程合并
+        self.shard_deposits: Optional[List[tuple]] = None
+        self._events: List[Tuple["Character", ActionType]] = []
+
+        # 产出统计（物品ID → 数量）
+        self.last_produced: Counter = Counter()   # 最近一次提交的产出
+        self.last_discarded: Counter = Counter()  # 最近一次提交中放不下而丢弃的产出
+        self.total_produced: Counter = Counter()  # 累计产出
+
+    def record(self, character: "Character", action: ActionType):
+        """记录一次产出事件（数量在提交时抽取）"""
+        self._events.append((character, action))
+
+    def _draw_quantities(self, events: List[Tuple["Character", ActionType]]) -> List[int]:
+        """按劳动类型批量抽取每个事件的产出数量"""
+        quantities = [0] * len(events)
+        rows_by_action = {}
+        for row, (_, action) in enumerate(events):
+            rows_by_action.setdefault(action, []).append(row)
+        for action, rule in WorkSystem.PRODUCTION_RULES.items():
+            rows = rows_by_action.get(action)
+            if not rows:
+                continue
+            _, min_quantity, max_quantity, _, _ = rule
+            drawn = self.rng.choices(range(min_quantity, max_quantity + 1), k=len(rows))
+            for row, quantity in zip(rows, drawn):
+                quantities[row] = quantity
+        return quantities
+
+    def commit(self) -> Counter:
+        """
+        把本 tick 记录的产出放入背包或公共仓库
+
+        返回:
+            Counter: 本次提交的产出（物品ID → 数量）
+        """
+        events, self._events = self._events, []
+        self.last_produced = Counter()
+        self.last_discarded = Counter()
+        if not events:
+            return self.last_produced
+
+        for (character, action), quantity in zip(events, self._draw_quantities(events)):
+            item_id = WorkSystem.PRODUCTION_RULES[action][0]
+            item = character.all_items_ref[item_id]
+            self.last_produced[item_id] += quantity
+            remaining = quantity
+            if self.auto_deposit:
+                remaining -= self._deposit(character, item, quantity)
+            if remaining > 0:
+                remaining -= WorkSystem.store_product(character, action, item, remaining)
+            if remaining > 0:
+                self.last_discarded[item_id] += remaining
+
+        self.total_produced.update(self.last_produced)
+        return self.last_produced
+
+    def _deposit(self, character: "Character", item, quantity: int) -> int:
+        """把产出放入公共仓库（分片进程内记录到 shard_deposits，放不下的部分之后由 store_overflow 处理），返回放入的数量"""
+        if self.shard_deposits is not None:
+            self.shard_deposits.append((character.id, item.item_id, quantity, True))
+            return quantity
+        if self.public_storage is None:
+            return 0
+        before = self.public_storage.get_item_count(item.item_id)
+        self.public_storage.add_item(item, quantity)
+        return self.public_storage.get_item_count(item.item_id) - before
+
+    def store_overflow(self, character: "Character", item, quantity: int) -> int:
+        """
+        把主进程退回的产出（分片模式下公共仓库放不下的部分）放入角色背包，放不下的计入丢弃
+
+        返回:
+            int: 丢弃的数量
+        """
+        before = character.inventory.get_item_count(item.item_id)
+        character.inventory.add_item(item, quantity)
+        discarded = quantity - (character.inventory.get_item_count(item.item_id) - before)
+        if discarded > 0:
+            self.last_discarded[item.item_id] += discarded
+        return discarded
@@ -1,11 +1,50 @@
 """特质系统模块 - 负责角色特质相关逻辑"""
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Dict, Iterable, Tuple
 from .enums import TraitType
 
 if TYPE_CHECKING:
     from .character import Character
 
 
+class TraitProfile:
+    """
+    特质档案 - 一组特质编译后的固定修正值记录
+
+    在角色创建或特质变化时由 TraitSystem.compile_traits 生成，相同的特质组合共享同一个实例。
+    """
+
+    def __init__(self, traits: Tuple[TraitType, ...], modifiers: Dict[str, float], bonuses: Dict[str, float]):
+        self.traits = traits
+        self.modifiers = modifiers  # 修正类型 → 乘法叠加后的修正值
+        self.bonuses = bonuses      # 加成类型 → 加成值总和
+        self.resilient = TraitType.RESILIENT in traits
+        # 序列化用的特质值和中文名称列表（只读）
+        self.trait_values = [trait.value for trait in traits]
+        self.trait_names = [TraitSystem.get_trait_name(trait) for trait in traits]
+
+        negative = modifiers["negative_reduction"]
+        self.negative_reduction = negative
+
+        # 各场景的最终系数（计算顺序与逐次计算时相同）
+        self.fatigue_recovery = modifiers["fatigue_recovery_modifier"]
+        fatigue_consumption = modifiers["fatigue_consumption_modifier"]
+        if self.resilient:
+            fatigue_consumption *= negative
+        self.fatigue_consumption = fatigue_consumption
+        self.hunger_recovery = modifiers["hunger_recovery_modifier"]
+        self.mood_recovery = modifiers["mood_recovery_modifier"]
+        mood_consumption = modifiers["mood_consumption_modifier"]
+        if self.resilient:
+            mood_consumption *= negative
+        self.mood_consumption = mood_consumption
+        self.work_progress = modifiers["work_progress_modifier"]
+        self.mood_bonus = bonuses["mood_bonus"]
+
+    def __reduce__(self):
+        # 反序列化时重新驻留（例如发送到分片进程）
+        return TraitSystem.compile_traits, (self.traits,)
+
+
 class TraitSystem:
     """特质系统 - 处理角色特质效果"""
     
@@ -53,6 +92,61 @@ class TraitSystem:
         },
     }
     
+    # 所有修正类型和加成类型
+    MODIFIER_TYPES = (
+        "fatigue_consumption_modifier",
+        "fatigue_recovery_modifier",
+        "hunger_recovery_modifier",
+        "mood_recovery_modifier",
+        "work_progress_modifier",
+        "negative_reduction",
+        "mood_consumption_modifier",
+    )
+    BONUS_TYPES = ("mood_bonus",)
+
+    # 特质组合 → 特质档案（驻留表）
+    _profiles: Dict[Tuple[TraitType, ...], TraitProfile] = {}
+
+    @staticmethod
+    def compile_traits(traits: Iterable[TraitType]) -> TraitProfile:
+        """编译特质组合为特质档案（相同组合返回同一实例）"""
+        key = tuple(traits)
+        profile = TraitSystem._profiles.get(key)
+        if profile is None:
+            modifiers = {
+                modifier_type: TraitSystem._combine_modifier(key, modifier_type, 1.0)
+                for modifier_type in TraitSystem.MODIFIER_TYPES
+            }
+            bonuses = {
+                bonus_type: TraitSystem._combine_bonus(key, bonus_type)
+                for bonus_type in TraitSystem.BONUS_TYPES
+            }
+            profile = TraitProfile(key, modifiers, bonuses)
+            TraitSystem._profiles[key] = profile
+        return profile
+
+    @staticmethod
+    def _combine_modifier(traits: Iterable[TraitType], modifier_type: str, default: float) -> float:
+        """按特质顺序乘法叠加修正值"""
+        result = default
+        for trait in traits:
+            trait_def = TraitSystem.TRAIT_DEFINITIONS.get(trait, {})
+            if modifier_type in trait_def:
+                # 对于修正器，使用乘法叠加
+                if modifier_type.endswith("_modifier"):
+                    result *= trait_def[modifier_type]
+        return result
+
+    @staticmethod
+    def _combine_bonus(traits: Iterable[TraitType], bonus_type: str) -> float:
+        """累加加成值"""
+        total_bonus = 0
+        for trait in traits:
+            trait_def = TraitSystem.TRAIT_DEFINITIONS.get(trait, {})
+            if bonus_type in trait_def:
+                total_bonus += trait_def[bonus_type]
+        return total_bonus
+
     @staticmethod
     def get_trait_name(trait: TraitType) -> str:
         """获取特质的中文名称"""
@@ -76,14 +170,11 @@ class TraitSystem:
         返回:
             修正后的值
         """
-        result = default
-        for trait in character.traits:
-            trait_def = TraitSystem.TRAIT_DEFINITIONS.get(trait, {})
-            if modifier_type in trait_def:
-                # 对于修正器，使用乘法叠加
-                if modifier_type.endswith("_modifier"):
-                    result *= trait_def[modifier_type]
-        return result
+        if default == 1.0:
+            value = character.trait_profile.modifiers.get(modifier_type)
+            if value is not None:
+                return value
+        return TraitSystem._combine_modifier(character.traits, modifier_type, default)
     
     @staticmethod
     def get_trait_bonus(character: "Character", bonus_type: str) -> float:
@@ -97,12 +188,10 @@ class TraitSystem:
         返回:
             加成值总和
         """
-        total_bonus = 0
-        for trait in character.traits:
-            trait_def = TraitSystem.TRAIT_DEFINITIONS.get(trait, {})
-            if bonus_type in trait_def:
-                total_bonus += trait_def[bonus_type]
-        return total_bonus
+        value = character.trait_profile.bonuses.get(bonus_type)
+        if value is not None:
+            return value
+        return TraitSystem._combine_bonus(character.traits, bonus_type)
     
     @staticmethod
     def apply_fatigue_change(character: "Character", base_change: float, is_consumption: bool = False) -> float:
@@ -117,18 +206,13 @@ class TraitSystem:
         返回:
             修正后的变化值
         """
+        profile = character.trait_profile
         if is_consumption:
-            # 消耗场景：应用强壮特质和坚韧特质
-            modifier = TraitSystem.get_trait_modifier(character, "fatigue_consumption_modifier", 1.0)
-            # 坚韧特质影响所有负面效果
-            if TraitType.RESILIENT in character.traits:
-                negative_modifier = TraitSystem.get_trait_modifier(character, "negative_reduction", 1.0)
-                modifier *= negative_modifier
-            return base_change * modifier
+            # 消耗场景：强壮特质和坚韧特质
+            return base_change * profile.fatigue_consumption
         else:
-            # 恢复场景：应用高效睡眠特质
-            modifier = TraitSystem.get_trait_modifier(character, "fatigue_recovery_modifier", 1.0)
-            return base_change * modifier
+            # 恢复场景：高效睡眠特质
+            return base_change * profile.fatigue_recovery
     
     @staticmethod
     def apply_hunger_change(character: "Character", base_change: float, is_consumption: bool = False) -> float:
@@ -143,16 +227,15 @@ class TraitSystem:
         返回:
             修正后的变化值
         """
+        profile = character.trait_profile
         if is_consumption:
-            # 消耗场景：应用坚韧特质
-            if TraitType.RESILIENT in character.traits:
-                modifier = TraitSystem.get_trait_modifier(character, "negative_reduction", 1.0)
-                return base_change * modifier
+            # 消耗场景：坚韧特质
+            if profile.resilient:
+                return base_change * profile.negative_reduction
             return base_change
         else:
-            # 恢复场景（进食）：应用好胃口特质
-            modifier = TraitSystem.get_trait_modifier(character, "hunger_recovery_modifier", 1.0)
-            return base_change * modifier
+            # 恢复场景（进食）：好胃口特质
+            return base_change * profile.hunger_recovery
     
     @staticmethod
     def apply_mood_change(character: "Character", base_change: float, is_consumption: bool = False, is_entertainment: bool = False, is_eating: bool = False) -> float:
@@ -169,23 +252,14 @@ class TraitSystem:
         返回:
             修正后的变化值
         """
-        result = base_change
-        
+        profile = character.trait_profile
         if is_entertainment:
-            # 娱乐场景：应用开朗特质
-            modifier = TraitSystem.get_trait_modifier(character, "mood_recovery_modifier", 1.0)
-            result *= modifier
+            # 娱乐场景：开朗特质
+            return base_change * profile.mood_recovery
         elif is_consumption:
-            # 劳动场景：应用工作狂特质和坚韧特质
-            modifier = TraitSystem.get_trait_modifier(character, "mood_consumption_modifier", 1.0)
-            if TraitType.RESILIENT in character.traits:
-                negative_modifier = TraitSystem.get_trait_modifier(character, "negative_reduction", 1.0)
-                modifier *= negative_modifier
-            result *= modifier
+            # 劳动场景：工作狂特质和坚韧特质
+            return base_change * profile.mood_consumption
         elif is_eating:
-            # 进食场景：应用美食家特质的额外加成
-            bonus = TraitSystem.get_trait_bonus(character, "mood_bonus")
-            result += bonus
-        
-        return result
-
+            # 进食场景：美食家特质的额外加成
+            return base_change + profile.mood_bonus
+        return base_change
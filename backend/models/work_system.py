@@ -1,146 +1,186 @@
 """劳动系统模块 - 负责角色劳动相关逻辑"""
+import logging
 import random
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Tuple
+from game_logging import get_logger
 from .enums import ActionType
+from .item import get_item_bit
 
 if TYPE_CHECKING:
     from .character import Character
 
+logger = get_logger("work")
+
 
 class WorkSystem:
     """劳动系统 - 处理角色的劳动工具检查、劳动选择和物品产出"""
 
+    # 劳动所需工具（未列出的劳动不需要工具）
+    TOOL_REQUIREMENTS = {
+        ActionType.LUMBERING: "axe",
+        ActionType.MINING: "pickaxe",
+    }
+
+    # 产出规则：劳动类型 → (物品ID, 最少数量, 最多数量, 日志描述, 日志物品名)
+    PRODUCTION_RULES = {
+        ActionType.LUMBERING: ("wood", 2, 4, "伐木产出", "木材"),      # 伐木产出 2-4 个木材
+        ActionType.MINING: ("stone", 2, 3, "采石产出", "石头"),        # 采石产出 2-3 个石头
+        ActionType.GATHERING: ("berry", 3, 5, "采集浆果产出", "浆果"),  # 采集浆果产出 3-5 个浆果
+        ActionType.FARMING: ("wheat", 1, 2, "种植产出", "小麦"),       # 种植产出 1-2 个小麦
+    }
+
+    # 劳动选择的基础优先级（实际优先级 = 基础优先级 - 背包中该劳动产出物的数量）
+    # 优先级：基础资源（木材、石头）> 食物（浆果）> 农作物（小麦），相同时按声明顺序
+    WORK_PRIORITIES = {
+        ActionType.LUMBERING: 100,
+        ActionType.MINING: 100,
+        ActionType.GATHERING: 80,
+        ActionType.FARMING: 70,
+    }
+
+    # 编译后的劳动选项：((劳动类型, 所需工具位, 产出物品ID, 基础优先级), ...)
+    _work_options: tuple = ()
+
+    @staticmethod
+    def compile_work_options():
+        """把工具需求、产出规则和优先级编译为劳动选项表（模块加载时执行一次）"""
+        WorkSystem._work_options = tuple(
+            (
+                work_type,
+                get_item_bit(WorkSystem.TOOL_REQUIREMENTS[work_type]) if work_type in WorkSystem.TOOL_REQUIREMENTS else 0,
+                WorkSystem.PRODUCTION_RULES[work_type][0],
+                base_priority,
+            )
+            for work_type, base_priority in WorkSystem.WORK_PRIORITIES.items()
+        )
+
     @staticmethod
     def has_tool_for_work(character: "Character", work_type: ActionType) -> bool:
         """检查角色是否拥有执行特定劳动所需的工具"""
-        if work_type == ActionType.LUMBERING:
-            return character.inventory.has_item("axe")
-        elif work_type == ActionType.MINING:
-            return character.inventory.has_item("pickaxe")
-        elif work_type in [ActionType.GATHERING, ActionType.FARMING]:
-            return True  # 采集和种植不需要工具
+        for option_type, tool_bit, _, _ in WorkSystem._work_options:
+            if option_type == work_type:
+                return character.inventory.item_mask & tool_bit == tool_bit
         return False
 
+    @staticmethod
+    def _select_work(character: "Character") -> Tuple[ActionType, int]:
+        """按工具位掩码和产出物数量选出优先级最高的劳动（相同时取先声明的）"""
+        inventory = character.inventory
+        mask = inventory.item_mask
+        best_work = None
+        best_priority = 0
+        for work_type, tool_bit, resource_id, base_priority in WorkSystem._work_options:
+            if mask & tool_bit != tool_bit:
+                continue
+            priority = base_priority - inventory.get_item_count(resource_id)
+            if best_work is None or priority > best_priority:
+                best_work = work_type
+                best_priority = priority
+        return best_work, best_priority
+
+    @staticmethod
+    def _log_work_options(character: "Character"):
+        """输出劳动选择的详细过程（仅 DEBUG）"""
+        inventory = character.inventory
+        logger.debug("[劳动系统] %s - 背包资源: %s", character.name,
+                     ", ".join(f"{resource_id}={inventory.get_item_count(resource_id)}"
+                               for _, _, resource_id, _ in WorkSystem._work_options))
+        # 显示各工作进度
+        logger.debug("[劳动系统] %s - 工作进度: %s", character.name,
+                     ", ".join(f"{work_type.value}={character.work_progress[work_type]}"
+                               for work_type, _, _, _ in WorkSystem._work_options))
+        for work_type, tool_bit, resource_id, base_priority in WorkSystem._work_options:
+            if inventory.item_mask & tool_bit != tool_bit:
+                logger.debug("[劳动系统] %s - 无法%s：缺少 %s", character.name, work_type.value, WorkSystem.TOOL_REQUIREMENTS[work_type])
+            else:
+                priority = base_priority - inventory.get_item_count(resource_id)
+                logger.debug("[劳动系统] %s - 选项：%s（优先级 %s）", character.name, work_type.value, priority)
+
     @staticmethod
     def choose_work_action(character: "Character"):
         """智能选择劳动类型"""
         from .action_system import ActionSystem
-        
-        # 检查背包中的资源数量
-        wood_count = character.inventory.get_item_count("wood")
-        stone_count = character.inventory.get_item_count("stone")
-        berry_count = character.inventory.get_item_count("berry")
-        wheat_count = character.inventory.get_item_count("wheat")
-        
-        print(f"[劳动系统] {character.name} - 背包资源: 木材={wood_count}, 石头={stone_count}, 浆果={berry_count}, 小麦={wheat_count}")
-        
-        # 显示各工作进度
-        print(f"[劳动系统] {character.name} - 工作进度: "
-              f"伐木={character.work_progress[ActionType.LUMBERING]}, "
-              f"采石={character.work_progress[ActionType.MINING]}, "
-              f"采集={character.work_progress[ActionType.GATHERING]}, "
-              f"种植={character.work_progress[ActionType.FARMING]}")
-        
-        # 优先级：基础资源（木材、石头）> 食物（浆果）> 农作物（小麦）
-        work_options = []
-        
-        # 如果有斧头，可以考虑伐木
-        if WorkSystem.has_tool_for_work(character, ActionType.LUMBERING):
-            priority = 100 - wood_count  # 木材越少，优先级越高
-            work_options.append((priority, ActionType.LUMBERING))
-            print(f"[劳动系统] {character.name} - 选项：伐木（优先级 {priority}）")
-        else:
-            print(f"[劳动系统] {character.name} - 无法伐木：缺少斧头")
-        
-        # 如果有镐子，可以考虑采石
-        if WorkSystem.has_tool_for_work(character, ActionType.MINING):
-            priority = 100 - stone_count  # 石头越少，优先级越高
-            work_options.append((priority, ActionType.MINING))
-            print(f"[劳动系统] {character.name} - 选项：采石（优先级 {priority}）")
-        else:
-            print(f"[劳动系统] {character.name} - 无法采石：缺少镐子")
-        
-        # 采集浆果（不需要工具）
-        priority = 80 - berry_count  # 浆果优先级略低
-        work_options.append((priority, ActionType.GATHERING))
-        print(f"[劳动系统] {character.name} - 选项：采集浆果（优先级 {priority}）")
-        
-        # 种植小麦（不需要工具）
-        priority = 70 - wheat_count  # 小麦优先级最低
-        work_options.append((priority, ActionType.FARMING))
-        print(f"[劳动系统] {character.name} - 选项：种植（优先级 {priority}）")
-        
+
+        # 全局劳动分配器已为本小时分配劳动时直接使用
+        assignment = character.labor_assignment
+        if assignment is not None:
+            character.labor_assignment = None
+            logger.debug("[劳动系统] %s - 按全局分配：%s", character.name, assignment.value)
+            ActionSystem.assign_action(character, assignment)
+            return
+
+        if logger.isEnabledFor(logging.DEBUG):
+            WorkSystem._log_work_options(character)
+
         # 选择优先级最高的劳动类型
-        if work_options:
-            work_options.sort(key=lambda x: x[0], reverse=True)
-            chosen_work = work_options[0][1]
-            print(f"[劳动系统] {character.name} - 最终选择：{chosen_work.value}（最高优先级 {work_options[0][0]}）")
-            ActionSystem.assign_action(character, chosen_work)
+        chosen_work, priority = WorkSystem._select_work(character)
+        logger.debug("[劳动系统] %s - 最终选择：%s（最高优先级 %s）", character.name, chosen_work.value, priority)
+        ActionSystem.assign_action(character, chosen_work)
+
+    @staticmethod
+    def get_preferred_work_action(character: "Character") -> ActionType:
+        """计算 choose_work_action 会选择的劳动类型（不输出日志、不修改角色）"""
+        return WorkSystem._select_work(character)[0]
 
     @staticmethod
     def try_produce_items(character: "Character"):
-        """尝试产出物品"""
+        """尝试产出物品（绑定产出批次时只记录产出事件，在 tick 结束时统一入库）"""
+        action = character.current_action
         # 获取当前劳动类型的进度
-        current_progress = character.work_progress.get(character.current_action, 0)
+        current_progress = character.work_progress.get(action, 0)
         
         # 每4小时产出一次
         if current_progress < 4:
-            print(f"[劳动系统] {character.name} - {character.current_action.value} 进度: {current_progress}/4 (未达到产出条件)")
+            logger.debug("[劳动系统] %s - %s 进度: %s/4 (未达到产出条件)", character.name, action.value, current_progress)
             return
         
-        print(f"[劳动系统] {character.name} - 达到产出条件！进度: {current_progress}/4")
+        logger.debug("[劳动系统] %s - 达到产出条件！进度: %s/4", character.name, current_progress)
         
         # 如果没有设置物品字典引用，则无法产出
         if character.all_items_ref is None:
-            print(f"[劳动系统] {character.name} - 错误：all_items_ref 未设置，无法产出物品")
+            logger.error("[劳动系统] %s - 错误：all_items_ref 未设置，无法产出物品", character.name)
             return
-        
-        item_id = None
-        quantity = 0
-        
-        if character.current_action == ActionType.LUMBERING:
-            # 伐木产出 2-4 个木材
-            item_id = "wood"
-            quantity = random.randint(2, 4)
-            print(f"[劳动系统] {character.name} - 伐木产出：{quantity} 个木材")
-            
-        elif character.current_action == ActionType.MINING:
-            # 采石产出 2-3 个石头
-            item_id = "stone"
-            quantity = random.randint(2, 3)
-            print(f"[劳动系统] {character.name} - 采石产出：{quantity} 个石头")
-            
-        elif character.current_action == ActionType.GATHERING:
-            # 采集浆果产出 3-5 个浆果
-            item_id = "berry"
-            quantity = random.randint(3, 5)
-            print(f"[劳动系统] {character.name} - 采集浆果产出：{quantity} 个浆果")
-            
-        elif character.current_action == ActionType.FARMING:
-            # 种植产出 1-2 个小麦
-            item_id = "wheat"
-            quantity = random.randint(1, 2)
-            print(f"[劳动系统] {character.name} - 种植产出：{quantity} 个小麦")
-        
-        # 尝试添加物品到背包
-        if item_id and item_id in character.all_items_ref:
-            item = character.all_items_ref[item_id]
-            success = character.inventory.add_item(item, quantity)
-            if success:
-                print(f"[劳动系统] ✅ {character.name} - 成功添加 {quantity} 个 {item.name} 到背包")
-                used_slots = len(character.inventory.items)
-                print(f"[劳动系统] {character.name} - 当前背包使用: {used_slots}/{character.inventory.max_slots} 格")
-                # 产出后重置该工作类型的进度
-                character.work_progress[character.current_action] = 0
-                print(f"[劳动系统] {character.name} - {character.current_action.value} 进度已重置为 0/4")
-            else:
-                print(f"[劳动系统] ❌ {character.name} - 背包已满，无法添加 {quantity} 个 {item.name}")
-                # 背包满了也重置进度，避免卡住
-                character.work_progress[character.current_action] = 0
-                print(f"[劳动系统] {character.name} - {character.current_action.value} 进度已重置为 0/4（背包已满）")
+
+        rule = WorkSystem.PRODUCTION_RULES.get(action)
+        if rule is None:
+            logger.error("[劳动系统] %s - 未识别的劳动类型，无法产出", character.name)
+            return
+        item_id, min_quantity, max_quantity, _, _ = rule
+        if item_id not in character.all_items_ref:
+            logger.error("[劳动系统] %s - 物品 %s 不在物品字典中", character.name, item_id)
+            return
+
+        # 产出后重置该工作类型的进度（背包满了也重置，避免卡住）
+        character.work_progress[action] = 0
+        logger.debug("[劳动系统] %s - %s 进度已重置为 0/4", character.name, action.value)
+
+        batch = character.production_batch
+        if batch is not None:
+            batch.record(character, action)
         else:
-            if not item_id:
-                print(f"[劳动系统] {character.name} - 未识别的劳动类型，无法产出")
-            else:
-                print(f"[劳动系统] {character.name} - 物品 {item_id} 不在物品字典中")
+            WorkSystem.store_product(character, action, character.all_items_ref[item_id],
+                                     random.randint(min_quantity, max_quantity))
+
+    @staticmethod
+    def store_product(character: "Character", action: ActionType, item, quantity: int) -> int:
+        """
+        把产出放入角色背包
+
+        返回:
+            int: 实际放入的数量（背包已满时可能少于 quantity）
+        """
+        _, _, _, description, item_label = WorkSystem.PRODUCTION_RULES[action]
+        logger.debug("[劳动系统] %s - %s：%s 个%s", character.name, description, quantity, item_label)
+
+        before = character.inventory.get_item_count(item.item_id)
+        success = character.inventory.add_item(item, quantity)
+        if success:
+            logger.info("[劳动系统] ✅ %s - 成功添加 %s 个 %s 到背包", character.name, quantity, item.name)
+            logger.debug("[劳动系统] %s - 当前背包使用: %s/%s 格",
+                         character.name, len(character.inventory.items), character.inventory.max_slots)
+        else:
+            logger.info("[劳动系统] ❌ %s - 背包已满，无法添加 %s 个 %s", character.name, quantity, item.name)
+        return character.inventory.get_item_count(item.item_id) - before
+
 
+WorkSystem.compile_work_options()
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, HTTPException
 from typing import List, Dict
 from pydantic import BaseModel
-from models import Character, Gender, ActionType, Item, Inventory
-from core import GameTime, ConnectionManager
+from models import Character, Gender, ActionType, Item, Inventory, TransferMove, TransferError, transfer_items
+from core import GameTime, ConnectionManager, TickScheduler, GameWorld, TickWorker
 
 router = APIRouter(prefix="/api", tags=["api"])
 
@@ -12,6 +12,9 @@ manager: ConnectionManager = None
 characters: List[Character] = []
 all_items: Dict[str, Item] = {}
 public_storage: Inventory = None
+scheduler: TickScheduler = None
+world: GameWorld = None
+tick_worker: TickWorker = None
 
 
 def init_game_state(
@@ -19,21 +22,43 @@ def init_game_state(
     manager_instance: ConnectionManager, 
     characters_list: List[Character],
     items_dict: Dict[str, Item],
-    public_storage_instance: Inventory
+    public_storage_instance: Inventory,
+    scheduler_instance: TickScheduler = None,
+    world_instance: GameWorld = None,
+    tick_worker_instance: TickWorker = None
 ):
     """初始化游戏状态"""
-    global game_time, manager, characters, all_items, public_storage
+    global game_time, manager, characters, all_items, public_storage, scheduler, world, tick_worker
     game_time = game_time_instance
     manager = manager_instance
     characters = characters_list
     all_items = items_dict
     public_storage = public_storage_instance
+    scheduler = scheduler_instance
+    world = world_instance
+    tick_worker = tick_worker_instance
+
+
+async def run_command(fn, *args):
+    """在 tick 边界执行读写世界状态的命令（未启用 tick 工作线程时直接执行）"""
+    if tick_worker is None:
+        return fn(*args)
+    return await tick_worker.call(fn, *args)
+
+
+def get_sharded_character_id(character_id: str) -> str:
+    """分片模式下校验角色是否存在"""
+    if not world.sharded.has_character(character_id):
+        raise HTTPException(status_code=404, detail="Character not found")
+    return character_id
 
 
 def get_character_by_id(character_id: str) -> Character:
     """根据UUID查找角色"""
     for char in characters:
         if char.id == character_id:
+            # 角色可能被修改，通知事件驱动调度器下一个 tick 重新决策
+            char.wake()
             return char
     raise HTTPException(status_code=404, detail="Character not found")
 
@@ -47,6 +72,21 @@ class UseItemRequest(BaseModel):
     item_id: str
 
 
+# 批量转移中表示公共仓库的来源/目标
+PUBLIC_STORAGE_ID = "public_storage"
+
+
+class TransferRequest(BaseModel):
+    item_id: str
+    quantity: int = 1
+    source: str       # 角色ID 或 "public_storage"
+    destination: str  # 角色ID 或 "public_storage"
+
+
+class BatchTransferRequest(BaseModel):
+    transfers: List[TransferRequest]
+
+
 @router.get("/time")
 async def get_time():
     """获取当前游戏时间"""
@@ -57,23 +97,46 @@ async def get_time():
 async def get_characters():
     """获取所有角色信息"""
     return {
-        "characters": [char.get_status_dict() for char in characters]
+        "characters": await run_command(world.get_character_status_dicts)
     }
 
 
 @router.get("/game-state")
 async def get_game_state():
     """获取完整游戏状态"""
+    return await run_command(world.get_snapshot_dict)
+
+
+@router.get("/time/scheduler")
+async def get_scheduler_stats():
+    """获取 tick 调度器统计（延迟、跳过的 tick 数）"""
+    if scheduler is None:
+        raise HTTPException(status_code=404, detail="Scheduler not available")
+    return scheduler.get_stats_dict()
+
+
+@router.get("/connections")
+async def get_connection_stats():
+    """获取 WebSocket 连接统计（各客户端的发送队列深度、丢弃消息数、空闲时间）"""
     return {
-        "time": game_time.get_time_dict(),
-        "characters": [char.get_status_dict() for char in characters],
-        "public_storage": public_storage.get_dict()
+        "connections": manager.get_stats(),
+        "evicted": manager.evicted,
+        "state_stream": manager.state_stream.get_stats_dict(),
+        "subscriptions": manager.get_subscription_stats()
     }
 
 
+def reset_scheduler():
+    """时间恢复运行或速度变化后重新计时（丢弃已累积的延迟，不作为追赶 tick 补跑）"""
+    if scheduler is not None:
+        scheduler.reset()
+
+
 @router.post("/time/start")
 async def start_time():
     """启动时间系统"""
+    if not game_time.running:
+        reset_scheduler()
     game_time.running = True
     return {"status": "started", "time": game_time.get_time_dict()}
 
@@ -89,6 +152,7 @@ async def stop_time():
 async def set_speed(speed: int):
     """设置时间流速"""
     if game_time.set_speed(speed):
+        reset_scheduler()
         # 广播速度变化
         await manager.broadcast({
             "type": "speed_update",
@@ -103,6 +167,8 @@ async def set_speed(speed: int):
 async def toggle_time():
     """切换时间运行状态（暂停/继续）"""
     game_time.running = not game_time.running
+    if game_time.running:
+        reset_scheduler()
     status = "started" if game_time.running else "stopped"
     # 广播状态变化
     await manager.broadcast({
@@ -115,36 +181,46 @@ async def toggle_time():
 @router.post("/characters/{character_id}/action")
 async def set_character_action(character_id: str, action: str):
     """手动设置角色行动"""
-    # 查找角色
-    character = get_character_by_id(character_id)
-
     # 验证行动类型
     try:
         action_type = ActionType(action)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid action type")
 
-    # 设置行动
-    character.assign_action(action_type)
+    def command():
+        # 分片模式下命令在下一个 tick 由角色所属分片执行
+        if world.sharded is not None:
+            world.sharded.submit(get_sharded_character_id(character_id), "assign_action", action_type.value)
+            return None
+
+        # 查找角色并设置行动
+        character = get_character_by_id(character_id)
+        character.assign_action(action_type)
+        return character.get_status_dict(world.normalized_items)
+
+    character_status = await run_command(command)
+    if character_status is None:
+        return {"status": "queued"}
 
     # 广播更新
     await manager.broadcast({
         "type": "character_action_update",
         "data": {
-            "character": character.get_status_dict()
+            "character": character_status
         }
     })
 
-    return {"status": "success", "character": character.get_status_dict()}
+    return {"status": "success", "character": character_status}
 
 
 # ==================== 物品系统API ====================
 
 @router.get("/items")
 async def get_all_items():
-    """获取所有可用物品"""
+    """获取所有可用物品（附带物品目录版本）"""
     return {
-        "items": [item.get_dict() for item in all_items.values()]
+        "items": [item.get_dict() for item in all_items.values()],
+        "version": world.item_catalog["version"] if world is not None else None
     }
 
 
@@ -159,112 +235,189 @@ async def get_item(item_id: str):
 @router.get("/public-storage")
 async def get_public_storage():
     """获取公共仓库信息"""
-    return public_storage.get_dict()
+    return await run_command(public_storage.get_dict, world.normalized_items)
 
 
 @router.get("/characters/{character_id}/inventory")
 async def get_character_inventory(character_id: str):
     """获取角色背包信息"""
-    character = get_character_by_id(character_id)
-    return character.inventory.get_dict()
+    def command():
+        if world.sharded is not None:
+            get_sharded_character_id(character_id)
+            for status in world.get_character_status_dicts():
+                if status["id"] == character_id:
+                    return status["inventory"]
+        character = get_character_by_id(character_id)
+        return character.inventory.get_dict(world.normalized_items)
+
+    return await run_command(command)
 
 
 @router.post("/characters/{character_id}/use-item")
 async def use_item(character_id: str, request: UseItemRequest):
     """角色使用物品"""
-    character = get_character_by_id(character_id)
-
     if request.item_id not in all_items:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    if character.use_item(request.item_id):
-        # 广播更新
-        await manager.broadcast({
-            "type": "game_update",
-            "data": {
-                "time": game_time.get_time_dict(),
-                "characters": [char.get_status_dict() for char in characters],
-                "public_storage": public_storage.get_dict()
-            }
-        })
-        return {"status": "success", "character": character.get_status_dict()}
-    else:
-        raise HTTPException(status_code=400, detail="Failed to use item")
+    def command():
+        if world.sharded is not None:
+            world.sharded.submit(get_sharded_character_id(character_id), "use_item", request.item_id)
+            return None, None
+
+        character = get_character_by_id(character_id)
+        if not character.use_item(request.item_id):
+            raise HTTPException(status_code=400, detail="Failed to use item")
+        return character.get_status_dict(world.normalized_items), world.get_snapshot_dict()
+
+    character_status, game_state = await run_command(command)
+    if character_status is None:
+        return {"status": "queued"}
+
+    # 广播更新
+    await manager.broadcast_state(game_state)
+    return {"status": "success", "character": character_status}
 
 
 @router.post("/characters/{character_id}/take-from-storage")
 async def take_from_storage(character_id: str, request: TransferItemRequest):
     """从公共仓库取出物品到角色背包"""
-    character = get_character_by_id(character_id)
-
     if request.item_id not in all_items:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    # 检查公共仓库是否有足够的物品
-    if not public_storage.has_item(request.item_id, request.quantity):
-        raise HTTPException(status_code=400, detail="Not enough items in public storage")
-
-    # 从公共仓库移除
-    item = all_items[request.item_id]
-    if public_storage.remove_item(request.item_id, request.quantity):
-        # 添加到角色背包
-        if character.inventory.add_item(item, request.quantity):
-            # 广播更新
-            await manager.broadcast({
-                "type": "game_update",
-                "data": {
-                    "time": game_time.get_time_dict(),
-                    "characters": [char.get_status_dict() for char in characters],
-                    "public_storage": public_storage.get_dict()
-                }
-            })
-            return {
-                "status": "success",
-                "character": character.get_status_dict(),
-                "public_storage": public_storage.get_dict()
-            }
-        else:
-            # 如果添加失败，回退到公共仓库
-            public_storage.add_item(item, request.quantity)
-            raise HTTPException(status_code=400, detail="Character inventory is full")
-    else:
-        raise HTTPException(status_code=400, detail="Failed to remove item from storage")
+    def command():
+        # 检查公共仓库是否有足够的物品
+        if not public_storage.has_item(request.item_id, request.quantity):
+            raise HTTPException(status_code=400, detail="Not enough items in public storage")
+
+        # 分片模式下物品立即从仓库预扣，角色背包放不下时在 tick 合并阶段退回
+        if world.sharded is not None:
+            get_sharded_character_id(character_id)
+            if not world.sharded.take_from_storage(character_id, request.item_id, request.quantity):
+                raise HTTPException(status_code=400, detail="Failed to remove item from storage")
+            return None, public_storage.get_dict(world.normalized_items), None
+
+        character = get_character_by_id(character_id)
+        try:
+            transfer_items([TransferMove(all_items[request.item_id], request.quantity, public_storage, character.inventory)])
+        except TransferError as e:
+            if e.reason == TransferError.FULL:
+                raise HTTPException(status_code=400, detail="Character inventory is full")
+            raise HTTPException(status_code=400, detail="Failed to remove item from storage")
+
+        return character.get_status_dict(world.normalized_items), public_storage.get_dict(world.normalized_items), world.get_snapshot_dict()
+
+    character_status, storage, game_state = await run_command(command)
+    if character_status is None:
+        return {"status": "queued", "public_storage": storage}
+
+    # 广播更新
+    await manager.broadcast_state(game_state)
+    return {
+        "status": "success",
+        "character": character_status,
+        "public_storage": storage
+    }
 
 
 @router.post("/characters/{character_id}/put-to-storage")
 async def put_to_storage(character_id: str, request: TransferItemRequest):
     """从角色背包放入物品到公共仓库"""
-    character = get_character_by_id(character_id)
-
     if request.item_id not in all_items:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    # 检查角色是否有足够的物品
-    if not character.inventory.has_item(request.item_id, request.quantity):
-        raise HTTPException(status_code=400, detail="Not enough items in character inventory")
-
-    # 从角色背包移除
-    item = all_items[request.item_id]
-    if character.inventory.remove_item(request.item_id, request.quantity):
-        # 添加到公共仓库
-        if public_storage.add_item(item, request.quantity):
-            # 广播更新
-            await manager.broadcast({
-                "type": "game_update",
-                "data": {
-                    "time": game_time.get_time_dict(),
-                    "characters": [char.get_status_dict() for char in characters],
-                    "public_storage": public_storage.get_dict()
-                }
-            })
-            return {
-                "status": "success",
-                "character": character.get_status_dict(),
-                "public_storage": public_storage.get_dict()
+    def command():
+        # 分片模式下由角色所属分片扣除物品，在 tick 合并阶段入库
+        if world.sharded is not None:
+            world.sharded.put_to_storage(get_sharded_character_id(character_id), request.item_id, request.quantity)
+            return None, None, None
+
+        character = get_character_by_id(character_id)
+        try:
+            transfer_items([TransferMove(all_items[request.item_id], request.quantity, character.inventory, public_storage)])
+        except TransferError as e:
+            if e.reason == TransferError.FULL:
+                raise HTTPException(status_code=400, detail="Public storage is full")
+            raise HTTPException(status_code=400, detail="Not enough items in character inventory")
+
+        return character.get_status_dict(world.normalized_items), public_storage.get_dict(world.normalized_items), world.get_snapshot_dict()
+
+    character_status, storage, game_state = await run_command(command)
+    if character_status is None:
+        return {"status": "queued"}
+
+    # 广播更新
+    await manager.broadcast_state(game_state)
+    return {
+        "status": "success",
+        "character": character_status,
+        "public_storage": storage
+    }
+
+
+@router.post("/transfers")
+async def batch_transfer(request: BatchTransferRequest):
+    """
+    批量转移物品（公共仓库与角色背包、角色与角色之间）
+
+    所有转移先整体校验，任意一项失败时不执行任何转移；全部成功后只广播一次游戏状态更新。
+    """
+    for transfer in request.transfers:
+        if transfer.item_id not in all_items:
+            raise HTTPException(status_code=404, detail=f"Item not found: {transfer.item_id}")
+
+    def get_inventory(owner_id: str) -> Inventory:
+        if owner_id == PUBLIC_STORAGE_ID:
+            return public_storage
+        return get_character_by_id(owner_id).inventory
+
+    def sharded_command():
+        # 分片模式下只支持仓库与角色之间的转移：取出的物品整体预扣，放入的物品在合并阶段入库
+        takes = {}
+        for index, transfer in enumerate(request.transfers):
+            if (transfer.source == PUBLIC_STORAGE_ID) == (transfer.destination == PUBLIC_STORAGE_ID):
+                raise HTTPException(status_code=400, detail=f"Transfer #{index}: only public storage transfers are supported in sharded mode")
+            get_sharded_character_id(transfer.destination if transfer.source == PUBLIC_STORAGE_ID else transfer.source)
+            if transfer.source == PUBLIC_STORAGE_ID:
+                takes[transfer.item_id] = takes.get(transfer.item_id, 0) + transfer.quantity
+        for item_id, quantity in takes.items():
+            if not public_storage.has_item(item_id, quantity):
+                raise HTTPException(status_code=400, detail=f"Not enough {item_id} in public storage")
+
+        for transfer in request.transfers:
+            if transfer.source == PUBLIC_STORAGE_ID:
+                world.sharded.take_from_storage(transfer.destination, transfer.item_id, transfer.quantity)
+            else:
+                world.sharded.put_to_storage(transfer.source, transfer.item_id, transfer.quantity)
+        return None, public_storage.get_dict(world.normalized_items)
+
+    def command():
+        if world.sharded is not None:
+            return sharded_command()
+
+        moves = [
+            TransferMove(all_items[transfer.item_id], transfer.quantity, get_inventory(transfer.source), get_inventory(transfer.destination))
+            for transfer in request.transfers
+        ]
+        try:
+            transfer_items(moves)
+        except TransferError as e:
+            messages = {
+                TransferError.INVALID: "Invalid quantity",
+                TransferError.NOT_ENOUGH: "Not enough items in source",
+                TransferError.FULL: "Destination is full",
             }
-        else:
-            # 如果添加失败，回退到角色背包
-            character.inventory.add_item(item, request.quantity)
-            raise HTTPException(status_code=400, detail="Public storage is full")
-    else:
-        raise HTTPException(status_code=400, detail="Failed to remove item from inventory")
+            raise HTTPException(status_code=400, detail=f"Transfer #{e.index}: {messages[e.reason]}")
+        game_state = world.get_snapshot_dict()
+        return game_state, game_state["public_storage"]
+
+    game_state, storage = await run_command(command)
+    if game_state is None:
+        return {"status": "queued", "public_storage": storage}
+
+    # 整批转移只广播一次
+    await manager.broadcast_state(game_state)
+    return {
+        "status": "success",
+        "transfers": len(request.transfers),
+        "public_storage": storage
+    }
@@ -1,7 +1,8 @@
+import json
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import List, Dict
 from models import Character, Item, Inventory
-from core import GameTime, ConnectionManager
+from core import GameTime, ConnectionManager, GameWorld, TickWorker, Interest
 
 router = APIRouter(tags=["websocket"])
 
@@ -11,6 +12,8 @@ manager: ConnectionManager = None
 characters: List[Character] = []
 all_items: Dict[str, Item] = {}
 public_storage: Inventory = None
+world: GameWorld = None
+tick_worker: TickWorker = None
 
 
 def init_websocket_state(
@@ -18,15 +21,50 @@ def init_websocket_state(
     manager_instance: ConnectionManager, 
     characters_list: List[Character],
     items_dict: Dict[str, Item],
-    public_storage_instance: Inventory
+    public_storage_instance: Inventory,
+    world_instance: GameWorld = None,
+    tick_worker_instance: TickWorker = None
 ):
     """初始化WebSocket状态"""
-    global game_time, manager, characters, all_items, public_storage
+    global game_time, manager, characters, all_items, public_storage, world, tick_worker
     game_time = game_time_instance
     manager = manager_instance
     characters = characters_list
     all_items = items_dict
     public_storage = public_storage_instance
+    world = world_instance
+    tick_worker = tick_worker_instance
+
+
+async def read_game_state() -> dict:
+    """在 tick 边界读取完整游戏状态（未启用 tick 工作线程时直接读取）"""
+    if tick_worker is None:
+        return world.get_snapshot_dict()
+    return await tick_worker.call(world.get_snapshot_dict)
+
+
+async def resume_state(websocket: WebSocket) -> bool:
+    """按连接参数 stream / last_seq 为重连的客户端补发增量"""
+    params = websocket.query_params
+    try:
+        last_seq = int(params["last_seq"])
+    except (KeyError, ValueError):
+        return False
+    return await manager.resume(websocket, params.get("stream"), last_seq)
+
+
+async def handle_client_message(websocket: WebSocket, data: str):
+    """处理客户端发来的 JSON 消息（目前只有 subscribe：修改订阅范围后发送新范围的完整状态）"""
+    try:
+        message = json.loads(data)
+        if not isinstance(message, dict) or message.get("type") != "subscribe":
+            raise ValueError("未知的消息类型")
+        interest = Interest.from_message(message)
+    except ValueError as e:
+        await manager.send(websocket, {"type": "error", "message": f"无效的消息: {e}"})
+        return
+    manager.subscribe(websocket, interest)
+    await manager.send_state(websocket, await read_game_state())
 
 
 @router.websocket("/ws")
@@ -34,28 +72,29 @@ async def websocket_endpoint(websocket: WebSocket):
     """WebSocket连接端点"""
     await manager.connect(websocket)
     try:
-        # 发送当前游戏状态
-        await websocket.send_json({
-            "type": "game_update",
-            "data": {
-                "time": game_time.get_time_dict(),
-                "characters": [char.get_status_dict() for char in characters],
-                "public_storage": public_storage.get_dict()
-            }
-        })
+        # 物品目录模式下先发送物品目录（之后的状态数据只引用物品ID）
+        if world.normalized_items:
+            await manager.send(websocket, {
+                "type": "item_catalog",
+                "data": world.item_catalog
+            })
+
+        # 重连的客户端带上状态流ID和最后收到的序号时只补发缺少的增量，否则发送当前游戏状态
+        if not await resume_state(websocket):
+            await manager.send_state(websocket, await read_game_state())
 
         # 保持连接
         while True:
             data = await websocket.receive_text()
+            # 任何客户端消息（包括对 ping 的 pong 回复）都刷新空闲计时
+            manager.touch(websocket)
             # 可以处理客户端发来的消息
             if data == "get_state":
-                await websocket.send_json({
-                    "type": "game_update",
-                    "data": {
-                        "time": game_time.get_time_dict(),
-                        "characters": [char.get_status_dict() for char in characters],
-                        "public_storage": public_storage.get_dict()
-                    }
-                })
+                await manager.send_state(websocket, await read_game_state())
+            elif data.startswith("{"):
+                await handle_client_message(websocket, data)
     except WebSocketDisconnect:
+        pass
+    finally:
+        # 连接可能已因写入失败或空闲超时被自动移除，disconnect 可重复调用
         manager.disconnect(websocket)
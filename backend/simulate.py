@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+无头模拟命令行入口
+不启动服务器，以最快速度模拟游戏并输出汇总统计
+stdout 只输出 JSON 汇总；配置信息、初始化输出和日志写到 stderr
+
+用法:
+    python simulate.py --days 100 --characters 500 --seed 42
+    python simulate.py --days 10 --characters 100000 --shards 8
+"""
+import argparse
+import contextlib
+import json
+import sys
+
+# 加载配置时打印的配置信息写到 stderr
+with contextlib.redirect_stdout(sys.stderr):
+    from config import GameConfig
+from core.headless import run_headless
+from game_logging import setup_logging, setup_logging_from_config, shutdown_logging
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="无头快进模拟")
+    parser.add_argument("--days", type=int, default=10, help="模拟天数")
+    parser.add_argument("--hours", type=int, default=0, help="额外模拟的小时数")
+    parser.add_argument("--characters", type=int, default=None, help="角色数量（默认使用配置）")
+    parser.add_argument("--engine", choices=["object", "numpy", "event"], default=None, help="模拟引擎（默认使用配置）")
+    parser.add_argument("--shards", type=int, default=None, help="分片进程数（默认使用配置）")
+    parser.add_argument("--inventory", choices=["object", "compact"], default=None, help="背包存储后端（默认使用配置）")
+    parser.add_argument("--labor", choices=["individual", "colony"], default=None, help="劳动分配方式（默认使用配置）")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("--verbose", action="store_true", help="显示模拟过程输出（日志级别使用配置）")
+    args = parser.parse_args()
+
+    if args.verbose:
+        setup_logging_from_config(GameConfig, stream=sys.stderr)
+    else:
+        setup_logging(level="ERROR", stream=sys.stderr)
+
+    # 世界初始化等模拟过程输出写到 stderr（非 verbose 时由 run_headless 屏蔽）
+    with contextlib.redirect_stdout(sys.stderr):
+        summary = run_headless(
+            GameConfig,
+            days=args.days,
+            hours=args.hours,
+            character_count=args.characters,
+            engine=args.engine,
+            seed=args.seed,
+            shards=args.shards,
+            inventory=args.inventory,
+            labor=args.labor,
+            quiet=not args.verbose
+        )
+    shutdown_logging()
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
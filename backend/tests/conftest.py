@@ -0,0 +1,7 @@
+"""测试公共设置 - 后端模块以 backend 目录为根导入（与 main.py 运行方式相同）"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
@@ -0,0 +1,58 @@
+"""HTTP 接口测试 - 各模拟引擎下的读取接口"""
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from config import GameConfig  # noqa: E402
+from core import ConnectionManager, create_world  # noqa: E402
+from routers import api_router  # noqa: E402
+from routers.api import init_game_state  # noqa: E402
+
+
+@pytest.fixture(params=["object", "numpy", "event", "sharded"])
+def world(request):
+    if request.param == "sharded":
+        world = create_world(GameConfig, character_count=6, seed=2, shards=2)
+    else:
+        world = create_world(GameConfig, character_count=6, seed=2, engine=request.param, shards=1)
+    world.tick()
+    yield world
+    world.close()
+
+
+@pytest.fixture
+def client(world):
+    init_game_state(
+        world.game_time, ConnectionManager(), world.characters, world.all_items, world.public_storage,
+        world_instance=world
+    )
+    app = FastAPI()
+    app.include_router(api_router)
+    return TestClient(app)
+
+
+def test_get_characters(client, world):
+    response = client.get("/api/characters")
+    assert response.status_code == 200
+    assert response.json()["characters"] == world.get_character_status_dicts()
+
+
+def test_get_game_state(client, world):
+    response = client.get("/api/game-state")
+    assert response.status_code == 200
+    state = response.json()
+    assert [status["id"] for status in state["characters"]] == [character.id for character in world.characters]
+    assert state["public_storage"] == world.public_storage.get_dict(world.normalized_items)
+
+
+def test_get_character_inventory(client, world):
+    character_id = world.characters[0].id
+    response = client.get(f"/api/characters/{character_id}/inventory")
+    assert response.status_code == 200
+    status = next(status for status in world.get_character_status_dicts() if status["id"] == character_id)
+    assert response.json() == status["inventory"]
+    assert client.get("/api/characters/missing/inventory").status_code == 404
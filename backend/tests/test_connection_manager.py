@@ -0,0 +1,62 @@
+"""连接管理测试 - delta 模式下单个客户端请求完整状态不影响其他客户端"""
+import asyncio
+import contextlib
+import io
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from config import GameConfig  # noqa: E402
+from core import StateStream, create_world  # noqa: E402
+from core.connection_manager import ConnectionManager  # noqa: E402
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.scope = {}
+        self.received = []
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text: str):
+        self.received.append(json.loads(text))
+
+
+def test_send_state_leaves_shared_delta_stream_alone():
+    with contextlib.redirect_stdout(io.StringIO()):
+        world = create_world(GameConfig, character_count=6, seed=3)
+    manager = ConnectionManager(max_queue=100, state_stream=StateStream(StateStream.MODE_DELTA, keyframe_interval=50))
+    stream = manager.state_stream
+
+    async def run():
+        watcher, requester = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(watcher)
+        await manager.send_state(watcher, world.get_snapshot_dict())
+        await manager.connect(requester)
+        for _ in range(3):
+            world.tick()
+            await manager.broadcast_state(world.get_snapshot_dict())
+            await asyncio.sleep(0.01)
+
+        # 重连风暴：多次请求完整状态不推进序号，也不给其他客户端发送消息
+        seq, watcher_messages = stream.seq, len(watcher.received)
+        for _ in range(5):
+            world.tick()
+            await manager.send_state(requester, world.get_snapshot_dict())
+        await asyncio.sleep(0.01)
+        assert stream.seq == seq
+        assert len(watcher.received) == watcher_messages
+        assert requester.received[-1] == json.loads(json.dumps(stream.keyframe()))
+
+        # 关键帧之后的增量可以直接应用
+        await manager.broadcast_state(world.get_snapshot_dict())
+        await asyncio.sleep(0.01)
+        delta = requester.received[-1]
+        assert delta["type"] == "game_delta" and delta["base_seq"] == seq
+        for websocket in (watcher, requester):
+            manager.disconnect(websocket)
+
+    asyncio.run(run())
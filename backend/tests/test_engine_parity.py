@@ -0,0 +1,43 @@
+"""模拟引擎一致性测试 - 相同种子下逐对象、NumPy 和事件驱动引擎的结果完全相同"""
+import random
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("numpy")
+
+from config import GameConfig  # noqa: E402
+from core import create_world  # noqa: E402
+
+DAYS = 30
+# 初始食物不足，使角色经历进食、断粮、疲劳和低心情等各个分支
+SCARCE_FOOD = {"apple": 2}
+
+
+def run(engine: str, labor: str) -> list:
+    """随机设置初始状态后运行 DAYS 天，返回每天结束时的角色状态数据（不含随机生成的角色ID）"""
+    world = create_world(GameConfig, character_count=60, seed=7, engine=engine, shards=1, labor=labor)
+    assert (world.needs_engine is not None) == (engine == "numpy")
+    assert (world.decision_scheduler is not None) == (engine == "event")
+    rng = random.Random(7)
+    for character in world.characters:
+        character.fatigue = rng.randint(0, 100)
+        character.hunger = rng.randint(0, 100)
+        character.mood = rng.randint(0, 100)
+    days = []
+    for _ in range(DAYS):
+        for _ in range(24):
+            world.tick()
+        days.append([{key: value for key, value in status.items() if key != "id"}
+                     for status in world.get_character_status_dicts()])
+    return days
+
+
+@pytest.mark.parametrize("scarce", [False, True])
+@pytest.mark.parametrize("labor", ["individual", "colony"])
+def test_engines_produce_identical_state(labor, scarce, monkeypatch):
+    if scarce:
+        monkeypatch.setattr(GameConfig, "INITIAL_CHARACTER_ITEMS", SCARCE_FOOD)
+    expected = run("object", labor)
+    assert run("numpy", labor) == expected
+    assert run("event", labor) == expected
@@ -0,0 +1,50 @@
+"""进食测试 - 没有食物与没有值得吃的食物的区别"""
+import pytest
+
+from models import ActionSystem, ActionType, Character, FoodSystem, Gender, create_default_items
+
+
+@pytest.fixture
+def all_items():
+    return create_default_items()
+
+
+def eating_character(hunger: float, inventory_backend: str) -> Character:
+    character = Character("测试", Gender.MALE, inventory_backend=inventory_backend)
+    character.hunger = hunger
+    character.current_action = ActionType.EAT
+    return character
+
+
+@pytest.mark.parametrize("inventory_backend", ["object", "compact"])
+def test_no_food_switches_to_rest(inventory_backend):
+    character = eating_character(30, inventory_backend)
+    assert FoodSystem.select_food_to_eat(character, 70) is None
+
+    ActionSystem.apply_eat_effects(character)
+    assert character.current_action == ActionType.REST
+
+
+@pytest.mark.parametrize("inventory_backend", ["object", "compact"])
+def test_nothing_worth_eating_keeps_eating(all_items, inventory_backend):
+    # 缺口 15，一块熟肉恢复 40：吃了比不吃更偏离缺口
+    character = eating_character(85, inventory_backend)
+    character.inventory.add_item(all_items["cooked_meat"], 1)
+    assert FoodSystem.select_food_to_eat(character, 15) == []
+
+    ActionSystem.apply_eat_effects(character)
+    assert character.current_action == ActionType.EAT
+    assert character.inventory.get_item_count("cooked_meat") == 1
+    assert character.hunger == 85
+
+
+@pytest.mark.parametrize("inventory_backend", ["object", "compact"])
+def test_food_closest_to_gap_is_eaten(all_items, inventory_backend):
+    character = eating_character(30, inventory_backend)
+    character.inventory.add_item(all_items["cooked_meat"], 2)
+    character.inventory.add_item(all_items["apple"], 5)
+
+    ActionSystem.apply_eat_effects(character)
+    assert character.current_action == ActionType.EAT
+    assert character.hunger == 100
+    assert character.inventory.get_item_count("cooked_meat") + character.inventory.get_item_count("apple") < 7
@@ -0,0 +1,86 @@
+"""全局劳动分配测试 - 按资源缺口分配名额，未分到名额的角色自行选择劳动"""
+from collections import Counter
+
+import pytest
+
+from models import ActionType, Character, Gender, LaborAllocator, WorkSystem, create_default_items
+
+
+@pytest.fixture(scope="module")
+def all_items():
+    return create_default_items()
+
+
+def make_characters(all_items, tools: list) -> list:
+    """每个元素为一个角色持有的工具ID列表"""
+    characters = []
+    for held in tools:
+        character = Character("测试", Gender.MALE)
+        for item_id in held:
+            character.inventory.add_item(all_items[item_id], 1)
+        characters.append(character)
+    return characters
+
+
+def choose(characters: list) -> list:
+    for character in characters:
+        WorkSystem.choose_work_action(character)
+    return [character.current_action for character in characters]
+
+
+def test_quotas_follow_resource_gaps(all_items):
+    allocator = LaborAllocator({"wood": 100, "berry": 100, "wheat": 20})
+    characters = make_characters(all_items, [["axe"]] * 6)
+    allocator.assign(characters, {"wood": 0, "berry": 50, "wheat": 20})
+
+    # 缺口 木材 100 : 浆果 50 → 6 人分为 4 : 2，小麦已达标
+    assert allocator.last_quotas[ActionType.LUMBERING] == 4
+    assert allocator.last_quotas[ActionType.GATHERING] == 2
+    assert allocator.last_quotas[ActionType.FARMING] == 0
+    assert Counter(choose(characters)) == {ActionType.LUMBERING: 4, ActionType.GATHERING: 2}
+
+
+def test_tool_shortage_leaves_others_to_choose(all_items):
+    allocator = LaborAllocator({"wood": 100})
+    characters = make_characters(all_items, [[], ["axe"], [], []])
+    characters[2].inventory.add_item(all_items["berry"], 90)
+    preferred = [WorkSystem.get_preferred_work_action(character) for character in characters]
+    allocator.assign(characters, {"wood": 0})
+
+    # 只有一人持有斧头，其余角色没有名额，仍按自己的背包选择
+    assert allocator.last_quotas[ActionType.LUMBERING] == 1
+    assert [character.labor_assignment for character in characters] == [None, ActionType.LUMBERING, None, None]
+    assert choose(characters) == [preferred[0], ActionType.LUMBERING, preferred[2], preferred[3]]
+    assert preferred[2] == ActionType.FARMING
+
+
+def test_current_workers_keep_their_work(all_items):
+    allocator = LaborAllocator({"wood": 10, "stone": 10})
+    characters = make_characters(all_items, [["axe", "pickaxe"]] * 4)
+    characters[3].current_action = ActionType.MINING
+    allocator.assign(characters, {"wood": 0, "stone": 0})
+
+    actions = choose(characters)
+    assert Counter(actions) == {ActionType.LUMBERING: 2, ActionType.MINING: 2}
+    assert actions[3] == ActionType.MINING
+
+
+def test_met_targets_leave_everyone_to_choose(all_items):
+    allocator = LaborAllocator({"wood": 10})
+    characters = make_characters(all_items, [["axe"], []])
+    preferred = [WorkSystem.get_preferred_work_action(character) for character in characters]
+    allocator.assign(characters, {"wood": 10})
+
+    assert all(character.labor_assignment is None for character in characters)
+    assert choose(characters) == preferred
+
+
+def test_assignment_is_used_once(all_items):
+    allocator = LaborAllocator({"wheat": 10})
+    (character,) = make_characters(all_items, [[]])
+    allocator.assign([character], {})
+
+    WorkSystem.choose_work_action(character)
+    assert character.current_action == ActionType.FARMING
+    WorkSystem.choose_work_action(character)
+    assert character.current_action == WorkSystem.get_preferred_work_action(character) == ActionType.GATHERING
@@ -0,0 +1,82 @@
+"""分片模拟测试 - 公共仓库合并"""
+import pytest
+
+pytest.importorskip("fastapi")
+
+from config import GameConfig  # noqa: E402
+from core import create_world  # noqa: E402
+
+
+def fill_storage(storage, all_items):
+    """把公共仓库的格子和已有堆叠全部填满"""
+    storage.add_item(all_items["stone"], storage.max_slots * all_items["stone"].max_stack)
+    for item_id, item in all_items.items():
+        if storage.get_item_count(item_id):
+            storage.add_item(item, item.max_stack)
+    assert not storage.add_item(all_items["axe"], 1)
+
+
+def axe_holder(world):
+    """随机分配工具后持有斧头的角色 (角色ID, 斧头数量)"""
+    character = next(character for character in world.characters if character.inventory.get_item_count("axe"))
+    return character.id, character.inventory.get_item_count("axe")
+
+
+@pytest.fixture
+def sharded_world():
+    world = create_world(GameConfig, character_count=4, seed=1, shards=2)
+    yield world
+    world.close()
+
+
+def test_deposit_into_full_storage_returns_items_to_character(sharded_world):
+    world = sharded_world
+    storage = world.public_storage
+    fill_storage(storage, world.all_items)
+    stored_axes = storage.get_item_count("axe")
+    character_id, carried_axes = axe_holder(world)
+
+    world.sharded.put_to_storage(character_id, "axe", 1)
+    world.tick()
+    world.sync_characters()
+
+    assert storage.get_item_count("axe") == stored_axes
+    character = next(character for character in world.characters if character.id == character_id)
+    assert character.inventory.get_item_count("axe") == carried_axes
+
+
+def test_deposit_with_free_storage_is_stored(sharded_world):
+    world = sharded_world
+    storage = world.public_storage
+    stored_axes = storage.get_item_count("axe")
+    character_id, carried_axes = axe_holder(world)
+
+    world.sharded.put_to_storage(character_id, "axe", 1)
+    world.tick()
+    world.sync_characters()
+
+    assert storage.get_item_count("axe") == stored_axes + 1
+    character = next(character for character in world.characters if character.id == character_id)
+    assert character.inventory.get_item_count("axe") == carried_axes - 1
+
+
+def test_auto_deposit_overflow_goes_to_character_inventory(monkeypatch):
+    monkeypatch.setattr(GameConfig, "PRODUCTION_AUTO_DEPOSIT", True)
+    world = create_world(GameConfig, character_count=8, seed=2, shards=2)
+    try:
+        storage = world.public_storage
+        fill_storage(storage, world.all_items)
+        stored = {item_id: storage.get_item_count(item_id) for item_id in ("wood", "stone")}
+
+        for _ in range(48):
+            world.tick()
+        world.sync_characters()
+
+        produced = world.sharded.total_produced
+        assert produced["wood"] + produced["stone"] > 0
+        for item_id in ("wood", "stone"):
+            assert storage.get_item_count(item_id) == stored[item_id]
+            carried = sum(character.inventory.get_item_count(item_id) for character in world.characters)
+            assert carried == produced[item_id]
+    finally:
+        world.close()
@@ -0,0 +1,22 @@
+"""无头模拟命令行测试"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("extra", [[], ["--verbose"], ["--shards", "2"]])
+def test_stdout_is_json_summary(extra):
+    result = subprocess.run(
+        [sys.executable, "simulate.py", "--days", "1", "--characters", "10", "--seed", "1", *extra],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    summary = json.loads(result.stdout)
+    assert summary["characters"] == 10
+    assert "[配置]" in result.stderr
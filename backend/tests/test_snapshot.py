@@ -0,0 +1,52 @@
+"""双缓冲快照测试 - 广播读取到最近完成的 tick 的状态"""
+import pytest
+
+pytest.importorskip("fastapi")
+
+from core import SnapshotBuffer  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_read_swaps_in_latest_snapshot():
+    snapshots = SnapshotBuffer()
+    assert snapshots.read() == (0, None)
+    snapshots.publish({"tick": 1})
+    snapshots.publish({"tick": 2})
+    assert snapshots.read() == (2, {"tick": 2})
+    assert snapshots.read() == (2, {"tick": 2})
+
+
+def test_broadcast_reads_state_of_last_tick():
+    """tick 间隔 2、广播间隔 5（整数时间单位）：每次读取都得到读取前最后一个 tick 的状态，且不为每个 tick 构建快照"""
+    clock = FakeClock()
+    snapshots = SnapshotBuffer(clock)
+    tick_interval, broadcast_interval = 2, 5
+    built = []
+    reads = 0
+    read_at = broadcast_interval
+    snapshots.schedule_read(broadcast_interval)
+
+    for tick in range(1, 51):
+        clock.now = tick * tick_interval
+        while read_at < clock.now:
+            # 广播侧在两个 tick 之间读取
+            clock.now, now = read_at, clock.now
+            _, snapshot = snapshots.read()
+            assert snapshot == {"tick": int(read_at // tick_interval)}
+            reads += 1
+            read_at += broadcast_interval
+            snapshots.schedule_read(broadcast_interval)
+            clock.now = now
+        if snapshots.wants_snapshot(clock.now + tick_interval):
+            snapshots.publish({"tick": tick})
+            built.append(tick)
+
+    # 读取时刻恰好有 tick 时该 tick 也构建，其余每次读取只构建一次
+    assert reads <= len(built) <= 2 * reads < 50
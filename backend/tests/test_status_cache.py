@@ -0,0 +1,36 @@
+"""角色状态数据缓存测试"""
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("numpy")
+
+from config import GameConfig  # noqa: E402
+from core import create_world  # noqa: E402
+
+
+def fresh_status(character):
+    """不经缓存构建的状态数据"""
+    character._status_cache.clear()
+    return character.get_status_dict()
+
+
+@pytest.mark.parametrize("engine", ["object", "numpy", "event"])
+def test_cached_status_matches_fresh_build(engine):
+    world = create_world(GameConfig, character_count=30, seed=5, engine=engine)
+    for _ in range(30):
+        world.tick()
+        cached = [character.get_status_dict() for character in world.characters]
+        assert cached == [fresh_status(character) for character in world.characters]
+
+
+def test_numpy_cache_is_per_row():
+    world = create_world(GameConfig, character_count=10, seed=5, engine="numpy")
+    world.tick()
+    first, second = world.characters[:2]
+    first_status, second_status = first.get_status_dict(), second.get_status_dict()
+
+    # 其他行的状态变化不影响该角色的缓存
+    world.needs_engine.mood[first._row] -= 1
+    world.needs_engine.row_version[first._row] += 1
+    assert first.get_status_dict() is not first_status
+    assert second.get_status_dict() is second_status
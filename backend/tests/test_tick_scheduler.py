@@ -0,0 +1,61 @@
+"""Tick 调度器测试 - 使用可控时钟"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from core import tick_scheduler  # noqa: E402
+from core.tick_scheduler import TickScheduler  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.on_sleep = None
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float):
+        self.now += delay
+        if self.on_sleep is not None:
+            self.on_sleep()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tick_scheduler.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def make_scheduler(clock) -> TickScheduler:
+    return TickScheduler(lambda: 1.0, policy=TickScheduler.POLICY_CATCH_UP, max_catch_up_ticks=5, clock=clock)
+
+
+def test_lag_is_caught_up_without_reset(clock):
+    scheduler = make_scheduler(clock)
+    assert asyncio.run(scheduler.wait_for_next_tick()) == 1
+    clock.now += 10
+    assert asyncio.run(scheduler.wait_for_next_tick()) == 6
+
+
+def test_reset_discards_accumulated_lag(clock):
+    scheduler = make_scheduler(clock)
+    asyncio.run(scheduler.wait_for_next_tick())
+    clock.now += 10
+    scheduler.reset()
+    assert asyncio.run(scheduler.wait_for_next_tick()) == 1
+    assert scheduler.ticks_skipped == 0
+
+
+def test_reset_while_waiting(clock):
+    scheduler = make_scheduler(clock)
+    asyncio.run(scheduler.wait_for_next_tick())
+    clock.on_sleep = scheduler.reset
+    assert asyncio.run(scheduler.wait_for_next_tick()) == 1
+    clock.on_sleep = None
+    start = clock.now
+    assert asyncio.run(scheduler.wait_for_next_tick()) == 1
+    assert clock.now == start + 1.0
@@ -0,0 +1,28 @@
+"""特质变化测试 - 绑定引擎或调度器的角色修改特质后与逐对象路径结果一致"""
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("numpy")
+
+from config import GameConfig  # noqa: E402
+from core import create_world  # noqa: E402
+from models import TraitType  # noqa: E402
+
+NEW_TRAITS = [TraitType.STRONG, TraitType.EFFICIENT_SLEEPER, TraitType.QUICK_LEARNER]
+
+
+def run_with_trait_change(engine: str) -> list:
+    """运行 10 小时后修改部分角色的特质，再运行 60 小时，返回状态数据（不含随机生成的角色ID）"""
+    world = create_world(GameConfig, character_count=12, seed=11, engine=engine, shards=1)
+    for _ in range(10):
+        world.tick()
+    for character in world.characters[::3]:
+        character.traits = NEW_TRAITS
+    for _ in range(60):
+        world.tick()
+    return [{key: value for key, value in status.items() if key != "id"} for status in world.get_character_status_dicts()]
+
+
+@pytest.mark.parametrize("engine", ["numpy", "event"])
+def test_trait_change_matches_object_engine(engine):
+    assert run_with_trait_change(engine) == run_with_trait_change("object")
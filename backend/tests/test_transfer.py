@@ -0,0 +1,62 @@
+"""批量物品转移测试 - 任何一步失败时不修改任何背包"""
+import pytest
+
+from models import TransferError, TransferMove, create_default_items, create_inventory, transfer_items
+
+
+@pytest.fixture
+def all_items():
+    return create_default_items()
+
+
+def full_inventory(all_items, backend: str):
+    """所有格子都是满堆叠石头的背包"""
+    inventory = create_inventory(2, backend)
+    stone = all_items["stone"]
+    assert inventory.add_item(stone, 2 * stone.max_stack)
+    return inventory
+
+
+@pytest.mark.parametrize("backend", ["object", "compact"])
+def test_transfer_into_full_destination_changes_nothing(all_items, backend):
+    source = create_inventory(5, backend)
+    source.add_item(all_items["wood"], 10)
+    destination = full_inventory(all_items, backend)
+    before = (source.get_dict(), destination.get_dict())
+
+    with pytest.raises(TransferError) as error:
+        transfer_items([TransferMove(all_items["wood"], 4, source, destination)])
+
+    assert (error.value.index, error.value.reason) == (0, TransferError.FULL)
+    assert (source.get_dict(), destination.get_dict()) == before
+
+
+@pytest.mark.parametrize("backend", ["object", "compact"])
+def test_failed_move_rolls_back_earlier_moves(all_items, backend):
+    source = create_inventory(5, backend)
+    source.add_item(all_items["wood"], 10)
+    source.add_item(all_items["apple"], 3)
+    free = create_inventory(5, backend)
+    full = full_inventory(all_items, backend)
+    before = (source.get_dict(), free.get_dict(), full.get_dict())
+
+    with pytest.raises(TransferError) as error:
+        transfer_items([
+            TransferMove(all_items["wood"], 4, source, free),
+            TransferMove(all_items["apple"], 3, source, full),
+        ])
+
+    assert (error.value.index, error.value.reason) == (1, TransferError.FULL)
+    assert (source.get_dict(), free.get_dict(), full.get_dict()) == before
+
+
+@pytest.mark.parametrize("backend", ["object", "compact"])
+def test_successful_batch_is_applied(all_items, backend):
+    source = create_inventory(5, backend)
+    source.add_item(all_items["wood"], 10)
+    destination = create_inventory(5, backend)
+
+    transfer_items([TransferMove(all_items["wood"], 4, source, destination)])
+
+    assert source.get_item_count("wood") == 6
+    assert destination.get_item_count("wood") == 4
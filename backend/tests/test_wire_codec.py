@@ -0,0 +1,71 @@
+"""MessagePack 协议测试 - 订阅部分字段的二进制客户端连续接收广播"""
+import asyncio
+import contextlib
+import io
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+msgpack = pytest.importorskip("msgpack")
+
+from config import GameConfig  # noqa: E402
+from core import Interest, MessagePackCodec, StateStream, create_world  # noqa: E402
+from core.connection_manager import ConnectionManager  # noqa: E402
+
+
+class FakeWebSocket:
+    def __init__(self, subprotocols=()):
+        self.scope = {"subprotocols": list(subprotocols)}
+        self.received = []
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, text: str):
+        self.received.append(json.loads(text))
+
+    async def send_bytes(self, data: bytes):
+        self.received.append(msgpack.unpackb(data))
+
+
+def states(websocket: FakeWebSocket) -> list:
+    return [message["data"] for message in websocket.received if message["type"] == "game_update"]
+
+
+@pytest.mark.parametrize("mode", [StateStream.MODE_FULL, StateStream.MODE_DELTA])
+def test_msgpack_field_subscription_survives_repeated_broadcasts(mode):
+    with contextlib.redirect_stdout(io.StringIO()):
+        world = create_world(GameConfig, character_count=6, seed=1)
+    manager = ConnectionManager(
+        max_queue=100, state_stream=StateStream(mode, keyframe_interval=1),
+        codec=MessagePackCodec(world.all_items)
+    )
+    interests = [Interest(fields=["hunger"], public_storage=False), Interest()]
+
+    async def run():
+        # 完整订阅的客户端使用 JSON，订阅部分字段的二进制客户端是编码器的唯一使用者
+        clients = [FakeWebSocket(["msgpack"]), FakeWebSocket()]
+        for websocket, interest in zip(clients, interests):
+            await manager.connect(websocket)
+            manager.subscribe(websocket, interest)
+        # 状态不变时第二次广播命中编码缓存
+        snapshot = world.get_snapshot_dict()
+        for _ in range(3):
+            await manager.broadcast_state(snapshot)
+            await asyncio.sleep(0.01)
+        world.tick()
+        await manager.broadcast_state(world.get_snapshot_dict())
+        await asyncio.sleep(0.01)
+        for websocket in clients:
+            manager.disconnect(websocket)
+        return clients
+
+    filtered, everything = asyncio.run(run())
+    filtered_states = states(filtered)
+    assert len(filtered_states) >= 3
+    expected = [{"id": status["id"], "hunger": status["hunger"]} for status in world.get_character_status_dicts()]
+    assert filtered_states[-1]["characters"] == expected
+    assert "public_storage" not in filtered_states[-1]
+    assert len(states(everything)) == len(filtered_states)
+    assert all("inventory" in status for status in states(everything)[-1]["characters"])
@@ -0,0 +1,55 @@
+"""劳动选择测试 - 工具位掩码实现与原有逐项判断的选择（包括优先级相同时的顺序）一致"""
+import itertools
+
+import pytest
+
+from models import ActionType, Character, Gender, WorkSystem, create_default_items
+
+COUNTS = (0, 10, 20, 30)
+
+
+def baseline_choice(tools: set, wood: int, stone: int, berry: int, wheat: int) -> ActionType:
+    """原有实现：按伐木、采石、采集、种植的顺序列出可选劳动，按优先级稳定排序取第一个"""
+    options = []
+    if "axe" in tools:
+        options.append((100 - wood, ActionType.LUMBERING))
+    if "pickaxe" in tools:
+        options.append((100 - stone, ActionType.MINING))
+    options.append((80 - berry, ActionType.GATHERING))
+    options.append((70 - wheat, ActionType.FARMING))
+    options.sort(key=lambda option: option[0], reverse=True)
+    return options[0][1]
+
+
+@pytest.fixture(scope="module")
+def all_items():
+    return create_default_items()
+
+
+@pytest.mark.parametrize("inventory_backend", ["object", "compact"])
+@pytest.mark.parametrize("tools", [set(), {"axe"}, {"pickaxe"}, {"axe", "pickaxe"}])
+def test_work_choice_matches_baseline(all_items, inventory_backend, tools):
+    for wood, stone, berry, wheat in itertools.product(COUNTS, repeat=4):
+        character = Character("测试", Gender.FEMALE, inventory_backend=inventory_backend)
+        for item_id in tools:
+            character.inventory.add_item(all_items[item_id], 1)
+        for item_id, quantity in (("wood", wood), ("stone", stone), ("berry", berry), ("wheat", wheat)):
+            if quantity:
+                character.inventory.add_item(all_items[item_id], quantity)
+
+        assert WorkSystem.has_tool_for_work(character, ActionType.LUMBERING) == ("axe" in tools)
+        assert WorkSystem.has_tool_for_work(character, ActionType.MINING) == ("pickaxe" in tools)
+        assert WorkSystem.has_tool_for_work(character, ActionType.GATHERING)
+
+        expected = baseline_choice(tools, wood, stone, berry, wheat)
+        assert WorkSystem.get_preferred_work_action(character) == expected
+        WorkSystem.choose_work_action(character)
+        assert character.current_action == expected
+
+
+def test_tool_removal_updates_choice(all_items):
+    character = Character("测试", Gender.MALE)
+    character.inventory.add_item(all_items["axe"], 1)
+    assert WorkSystem.get_preferred_work_action(character) == ActionType.LUMBERING
+    character.inventory.remove_item("axe", 1)
+    assert WorkSystem.get_preferred_work_action(character) == ActionType.GATHERING
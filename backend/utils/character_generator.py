@@ -77,13 +77,14 @@ class CharacterGenerator:
         return selected_traits
     
     @staticmethod
-    def generate_characters(count: int, inventory_slots: int = 20) -> List[Character]:
+    def generate_characters(count: int, inventory_slots: int = 20, inventory_backend: str = "object") -> List[Character]:
         """
         生成指定数量的随机角色
         
         参数:
             count: 生成数量
             inventory_slots: 背包大小
+            inventory_backend: 背包存储后端（object / compact）
         
         返回:
             List[Character]: 角色列表
@@ -107,7 +108,7 @@ class CharacterGenerator:
             traits = CharacterGenerator.generate_random_traits()
             
             # 创建角色
-            character = Character(name, gender, inventory_slots, age_years, age_days, traits)
+            character = Character(name, gender, inventory_slots, age_years, age_days, traits, inventory_backend)
             characters.append(character)
             
             trait_names = ", ".join([t.value for t in traits]) if traits else "无"
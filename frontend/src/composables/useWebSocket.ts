@@ -1,5 +1,7 @@
 import { ref, onMounted, onUnmounted } from 'vue'
-import type { GameUpdate, GameTime, WebSocketMessage, Inventory } from '@/types/game'
+import type {
+  GameUpdate, GameDelta, GameDeltaMessage, GameTime, WebSocketMessage, Inventory, InventoryDelta, Character, ItemCatalog, NormalizedItemStack
+} from '@/types/game'
 
 export function useWebSocket() {
   const timeString = ref<string>('第1天 0时')
@@ -10,24 +12,144 @@ export function useWebSocket() {
   const publicStorage = ref<Inventory>({ max_slots: 0, used_slots: 0, items: [] })
 
   let ws: WebSocket | null = null
+  let catalog: ItemCatalog | null = null
+  // 服务器最近一次发送的完整状态（未还原物品目录）及其序号，增量在此基础上应用
+  let state: GameUpdate | null = null
+  let seq: number | null = null
+  let streamId: string | null = null  // 状态流ID，重连时与序号一起发送以便服务器只补发缺少的增量
+  let awaitingKeyframe = false
+
+  // 物品目录模式下把只含 item_id 的堆叠还原为完整物品数据
+  const resolveInventory = (inventory: Inventory): Inventory => {
+    if (!catalog) {
+      return inventory
+    }
+    const items = catalog.items
+    return {
+      ...inventory,
+      items: (inventory.items as unknown as NormalizedItemStack[]).map((stack) => ({
+        item: items[stack.item_id],
+        quantity: stack.quantity
+      }))
+    }
+  }
+
+  // 目录版本变化时（例如服务器重启）重新获取物品目录
+  const fetchCatalog = async () => {
+    const response = await fetch('http://localhost:8000/api/items')
+    const data = await response.json()
+    catalog = {
+      version: data.version,
+      items: Object.fromEntries(data.items.map((item: ItemCatalog['items'][string]) => [item.item_id, item]))
+    }
+  }
+
+  const applyInventoryDelta = (inventory: Inventory, delta: InventoryDelta): Inventory => {
+    const { items_length, items_set, ...fields } = delta
+    let items = inventory.items
+    if (items_length !== undefined) {
+      items = items.slice(0, items_length)
+      for (const [index, stack] of items_set ?? []) {
+        items[index] = stack
+      }
+    }
+    return { ...inventory, ...fields, items }
+  }
+
+  const applyDelta = (base: GameUpdate, delta: GameDelta): GameUpdate => {
+    const characters = [...base.characters]
+    const rows = new Map(characters.map((char, row) => [char.id, row]))
+    for (const change of delta.characters) {
+      const row = rows.get(change.id)
+      if (row === undefined) {
+        // 新角色为完整状态
+        characters.push(change as Character)
+        continue
+      }
+      const { inventory, ...fields } = change
+      const char = characters[row]
+      characters[row] = {
+        ...char,
+        ...fields,
+        inventory: inventory ? applyInventoryDelta(char.inventory, inventory) : char.inventory
+      }
+    }
+    const removed = new Set(delta.removed_characters ?? [])
+    return {
+      time: delta.time,
+      characters: removed.size ? characters.filter((char) => !removed.has(char.id)) : characters,
+      public_storage: delta.public_storage ? applyInventoryDelta(base.public_storage, delta.public_storage) : base.public_storage,
+      catalog_version: delta.catalog_version
+    }
+  }
+
+  const render = async (data: GameUpdate) => {
+    timeString.value = data.time.time_string
+    isRunning.value = data.time.running
+    currentSpeed.value = data.time.speed
+    if (data.catalog_version === undefined) {
+      characters.value = data.characters
+      publicStorage.value = data.public_storage
+      return
+    }
+    if (!catalog || catalog.version !== data.catalog_version) {
+      await fetchCatalog()
+    }
+    characters.value = data.characters.map((char) => ({ ...char, inventory: resolveInventory(char.inventory) }))
+    publicStorage.value = resolveInventory(data.public_storage)
+  }
+
+  // 请求完整状态（每次只请求一次，直到收到关键帧）
+  const requestKeyframe = () => {
+    if (!awaitingKeyframe) {
+      awaitingKeyframe = true
+      ws?.send('get_state')
+    }
+  }
 
   const connectWebSocket = () => {
-    ws = new WebSocket('ws://localhost:8000/ws')
+    const resume = state && streamId && seq !== null ? `?stream=${streamId}&last_seq=${seq}` : ''
+    ws = new WebSocket(`ws://localhost:8000/ws${resume}`)
 
     ws.onopen = () => {
+      awaitingKeyframe = false
       isConnected.value = true
       console.log('WebSocket连接成功')
     }
 
-    ws.onmessage = (event) => {
+    ws.onmessage = async (event) => {
       const message: WebSocketMessage = JSON.parse(event.data)
-      if (message.type === 'game_update') {
-        const data = message.data as GameUpdate
-        timeString.value = data.time.time_string
-        isRunning.value = data.time.running
-        currentSpeed.value = data.time.speed
-        characters.value = data.characters
-        publicStorage.value = data.public_storage
+      if (message.type === 'ping') {
+        // 回复心跳，避免被服务器判定为空闲连接
+        ws?.send('pong')
+      } else if (message.type === 'item_catalog') {
+        catalog = message.data as ItemCatalog
+      } else if (message.type === 'game_update') {
+        state = message.data as GameUpdate
+        seq = message.seq ?? null
+        streamId = message.stream ?? null
+        awaitingKeyframe = false
+        await render(state)
+      } else if (message.type === 'game_delta') {
+        if (!state || seq === null || message.base_seq !== seq) {
+          // 序号不连续（例如慢连接丢弃了消息），请求完整状态
+          requestKeyframe()
+          return
+        }
+        state = applyDelta(state, message.data as GameDelta)
+        seq = message.seq ?? null
+        await render(state)
+      } else if (message.type === 'game_catch_up') {
+        // 重连后服务器补发的增量，按顺序应用
+        if (!state || seq === null || message.base_seq !== seq) {
+          requestKeyframe()
+          return
+        }
+        for (const delta of message.data as GameDeltaMessage[]) {
+          state = applyDelta(state, delta.data)
+        }
+        seq = message.seq ?? null
+        await render(state)
       } else if (message.type === 'speed_update' || message.type === 'status_update') {
         const data = message.data as GameTime
         isRunning.value = data.running
@@ -24,6 +24,17 @@ export interface ItemStack {
   quantity: number
 }
 
+// 物品目录模式下服务器发送的堆叠（物品定义见物品目录）
+export interface NormalizedItemStack {
+  item_id: string
+  quantity: number
+}
+
+export interface ItemCatalog {
+  version: string
+  items: Record<string, Item>
+}
+
 export interface Inventory {
   max_slots: number
   used_slots: number
@@ -52,9 +63,43 @@ export interface GameUpdate {
   time: GameTime
   characters: Character[]
   public_storage: Inventory
+  catalog_version?: string  // 物品目录模式下存在，堆叠只包含 item_id
+}
+
+// 背包增量：变化的字段，堆叠列表变化时给出新长度和按位置变化的堆叠
+export interface InventoryDelta {
+  max_slots?: number
+  used_slots?: number
+  items_length?: number
+  items_set?: [number, ItemStack][]
+}
+
+// 角色增量：只包含变化的字段（未知角色为完整状态）
+export type CharacterDelta = Partial<Omit<Character, 'inventory'>> & {
+  id: string
+  inventory?: InventoryDelta
+}
+
+export interface GameDelta {
+  time: GameTime
+  characters: CharacterDelta[]
+  removed_characters?: string[]
+  public_storage?: InventoryDelta
+  catalog_version?: string
+}
+
+// game_catch_up 中按顺序排列的增量消息
+export interface GameDeltaMessage {
+  type: 'game_delta'
+  seq: number
+  base_seq: number
+  data: GameDelta
 }
 
 export interface WebSocketMessage {
-  type: 'game_update' | 'speed_update' | 'status_update'
-  data: GameUpdate | GameTime
+  type: 'game_update' | 'game_delta' | 'game_catch_up' | 'speed_update' | 'status_update' | 'item_catalog' | 'ping'
+  seq?: number       // game_update / game_delta / game_catch_up 的状态序号
+  base_seq?: number  // game_delta / game_catch_up 所基于的状态序号
+  stream?: string    // game_update 的状态流ID
+  data: GameUpdate | GameDelta | GameDeltaMessage[] | GameTime | ItemCatalog
 }